@@ -0,0 +1,31 @@
+// abogus_worker.js
+// 常驻 a_bogus 计算进程：由 signer.ABogusEngine 启动
+// 协议：stdin 每行一个 JSON 批次 [[id, params, ua], ...]
+//       stdout 每行返回对应批次 [[id, a_bogus], ...]
+const readline = require('readline');
+const path = require('path');
+
+const abogusFile = process.argv[2] || path.join(__dirname, 'a_bogus.js');
+const { get_ab } = require(path.resolve(abogusFile));
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+rl.on('line', (line) => {
+    if (!line) return;
+    let batch;
+    try {
+        batch = JSON.parse(line);
+    } catch (error) {
+        return;
+    }
+    const results = batch.map(([id, params, ua]) => {
+        try {
+            return [id, get_ab(params, ua)];
+        } catch (error) {
+            return [id, ""];
+        }
+    });
+    process.stdout.write(JSON.stringify(results) + "\n");
+});
+
+rl.on('close', () => process.exit(0));
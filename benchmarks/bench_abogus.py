@@ -0,0 +1,67 @@
+# benchmarks/bench_abogus.py
+"""
+a_bogus 计算耗时对比：
+  legacy : 每次请求 execute_js(a_bogus.js) + ctx.call (旧的 get_a_bogus 路径)
+  engine : 常驻 ABogusEngine (串行调用 / 并发批量调用)
+
+用法 (在项目根目录):
+    python benchmarks/bench_abogus.py [次数]
+"""
+import asyncio
+import os
+import sys
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from signer import ABogusEngine  # noqa: E402
+
+UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def make_params(i):
+    return urllib.parse.urlencode({
+        'aid': '6383', 'app_name': 'douyin_web', 'live_id': '1', 'device_platform': 'web',
+        'web_rid': str(100000 + i), 'msToken': 'x' * 182,
+    })
+
+
+def report(name, n, cost):
+    print(f"{name:<20} {n:>6} 次  总计 {cost * 1000:>9.1f} ms  平均 {cost * 1000 / n:>8.3f} ms/次")
+
+
+def bench_legacy(n):
+    try:
+        from liveMan_utils import execute_js
+    except ImportError as e:
+        print(f"{'legacy (execjs)':<20} 跳过: {e}")
+        return
+    start = time.perf_counter()
+    for i in range(n):
+        ctx = execute_js('a_bogus.js')
+        ctx.call("get_ab", make_params(i), UA)
+    report('legacy (execjs)', n, time.perf_counter() - start)
+
+
+async def bench_engine(n):
+    engine = ABogusEngine('a_bogus.js')
+    await engine.sign(make_params(0), UA)  # 预热 (启动 Node)
+
+    start = time.perf_counter()
+    for i in range(n):
+        await engine.sign(make_params(i), UA)
+    report('engine (serial)', n, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[engine.sign(make_params(i), UA) for i in range(n)])
+    report('engine (batched)', n, time.perf_counter() - start)
+    print(f"engine stats: {engine.stats()}")
+    await engine.close()
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    bench_legacy(count)
+    asyncio.run(bench_engine(count))
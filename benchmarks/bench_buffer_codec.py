@@ -0,0 +1,122 @@
+# benchmarks/bench_buffer_codec.py
+"""
+Redis 缓冲区编码对比 (json / msgpack / compact)
+
+对每种编码统计：
+  - 编码 / 解码耗时 (微秒/条)
+  - 平均条目字节数，以及折算到 100 万条弹幕的负载大小
+  - 指定 --redis 时，把样本 XADD 进临时 stream，用 MEMORY USAGE 实测并折算 100 万条弹幕占用的 Redis 内存
+并逐条校验 解码(编码(doc)) == doc。
+
+语料为随机构造的弹幕 (字段与 MessageHandler._build_chat 一致，昵称 / 内容为中文)。
+
+用法 (在项目根目录):
+    python benchmarks/bench_buffer_codec.py [--count N] [--redis redis://localhost:6379/0]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from buffer_codec import get_codec, decode_payload, CODEC_JSON, CODEC_MSGPACK, CODEC_COMPACT  # noqa: E402
+from stream_buffer import FIELD  # noqa: E402
+
+MILLION = 1_000_000
+CHARS = "的一是了我不人在他有这个上们来到时大地为子中你说生国年着就那和要她出也得里后自以会家可下而过天去能对小多然于心学么之都好看起发当没成只如事把还用第样道想作种开美总从无情己面最女但现前些所同日手又行意动方期它头经长儿回位分爱老因很给名法间斯知世什两次使身者被高已亲其进此话常与活正感"
+
+
+def _text(lo, hi):
+    return ''.join(random.choice(CHARS) for _ in range(random.randint(lo, hi)))
+
+
+def make_chat():
+    user_id = random.getrandbits(56)
+    return {
+        'web_rid': str(random.randint(10 ** 11, 10 ** 12)),
+        'room_id': str(random.getrandbits(62)),
+        'user_id': str(user_id),
+        'user_name': _text(2, 8),
+        'gender': random.randint(0, 2),
+        'content': _text(2, 30),
+        'sec_uid': 'MS4wLjABAAAA' + ''.join(random.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-')
+                                             for _ in range(55)),
+        'avatar_url': f"https://p3.douyinpic.com/aweme/100x100/aweme-avatar/tos-cn-i-0813_{user_id:x}.jpeg",
+        'pay_grade': random.randint(0, 60),
+        'pay_grade_icon': random.choice(['', f"https://p3-webcast.douyinpic.com/img/webcast/new_user_grade_level_v1_{random.randint(1, 60)}.png~tplv-obj.image"]),
+        'fans_club_icon': random.choice(['', "https://p3-webcast.douyinpic.com/img/webcast/fansclub_level_v6_1.png~tplv-obj.image"]),
+        'fans_club_level': random.randint(0, 20),
+        'event_time': (datetime(2024, 1, 1) + timedelta(seconds=random.randint(0, 10 ** 7))).strftime('%Y-%m-%d %H:%M:%S'),
+        'created_at': datetime(2024, 1, 1) + timedelta(microseconds=random.getrandbits(40)),
+    }
+
+
+def measure(codec, docs):
+    start = time.perf_counter()
+    payloads = [codec.encode(doc) for doc in docs]
+    encode_us = (time.perf_counter() - start) / len(docs) * 1e6
+
+    start = time.perf_counter()
+    decoded = [decode_payload(payload) for payload in payloads]
+    decode_us = (time.perf_counter() - start) / len(docs) * 1e6
+
+    mismatches = sum(1 for doc, back in zip(docs, decoded) if back != doc)
+    return payloads, encode_us, decode_us, mismatches
+
+
+async def redis_memory(url, payloads):
+    """临时 stream 的 MEMORY USAGE (字节)"""
+    import redis.asyncio as redis
+    client = redis.from_url(url, decode_responses=False)
+    key = f"bench:buffer_codec:{os.getpid()}"
+    try:
+        await client.delete(key)
+        for i in range(0, len(payloads), 1000):
+            pipe = client.pipeline(transaction=False)
+            for payload in payloads[i:i + 1000]:
+                pipe.xadd(key, {FIELD: payload})
+            await pipe.execute()
+        return await client.memory_usage(key, samples=0)
+    finally:
+        await client.delete(key)
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=20000, help="样本条数")
+    parser.add_argument('--redis', default=None, help="实测 Redis 内存用的连接串 (会写入并删除一个临时 key)")
+    args = parser.parse_args()
+
+    random.seed(7)
+    docs = [make_chat() for _ in range(args.count)]
+
+    codecs = []
+    for name in (CODEC_JSON, CODEC_MSGPACK, CODEC_COMPACT):
+        codec = get_codec(name)
+        if codec.name != name:
+            print(f"⚠️ {name} 不可用 (未安装 msgpack?)，跳过")
+            continue
+        codecs.append(codec)
+
+    print(f"样本 {args.count} 条弹幕\n")
+    print(f"  {'编码':<10}{'编码 us/条':>12}{'解码 us/条':>12}{'字节/条':>10}{'负载 MB/百万条':>16}{'Redis MB/百万条':>18}  不一致")
+    ok = True
+    for codec in codecs:
+        payloads, encode_us, decode_us, mismatches = measure(codec, docs)
+        ok = ok and mismatches == 0
+        size = sum(len(p) for p in payloads) / len(payloads)
+        memory = '-'
+        if args.redis:
+            used = asyncio.run(redis_memory(args.redis, payloads))
+            memory = f"{used / len(payloads) * MILLION / 2 ** 20:.0f}"
+        print(f"  {codec.name:<10}{encode_us:>12.2f}{decode_us:>12.2f}{size:>10.0f}"
+              f"{size * MILLION / 2 ** 20:>16.0f}{memory:>18}  {mismatches}")
+
+    if not args.redis:
+        print("\n(未指定 --redis：只统计负载字节数，不含 stream 节点 / 条目 ID 的开销)")
+    sys.exit(0 if ok else 1)
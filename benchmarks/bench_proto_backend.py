@@ -0,0 +1,124 @@
+# benchmarks/bench_proto_backend.py
+"""
+protobuf 解码后端吞吐对比 (betterproto vs upb)
+
+按消息类型分别统计：
+  - 全量解析 (proto_backend.parse) 的 条/秒
+  - Chat / Gift 的投影结果 (含 fast_decoder) 的 条/秒，并逐条比对 betterproto 与 upb 的投影是否一致
+
+语料用 betterproto 随机构造 (Chat / Gift 复用 check_fast_decoder 的生成器)，不含截断样本：
+upb 对损坏数据直接报错，而 betterproto 会尽量解出部分字段，二者本来就不同。
+
+用法 (在项目根目录):
+    python benchmarks/bench_proto_backend.py [--count N]
+"""
+import argparse
+import gzip
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protobuf.douyin import (  # noqa: E402
+    PushFrame, Response, Message, RoomUserSeqMessage, RoomUserSeqMessageContributor,
+    LikeMessage, ControlMessage, Common,
+)
+from proto_backend import get_backend, BACKEND_BETTERPROTO, BACKEND_UPB  # noqa: E402
+from fast_decoder import DECODERS  # noqa: E402
+from check_fast_decoder import make_chat, make_gift, _rand_user  # noqa: E402
+
+
+def make_user_seq():
+    return bytes(RoomUserSeqMessage(
+        common=Common(method='WebcastRoomUserSeqMessage'),
+        ranks_list=[RoomUserSeqMessageContributor(score=random.randint(0, 99999), user=_rand_user(), rank=i + 1)
+                    for i in range(3)],
+        total=random.randint(0, 99999), total_user=random.randint(0, 9999999),
+    ))
+
+
+def make_like():
+    return bytes(LikeMessage(common=Common(method='WebcastLikeMessage'),
+                             count=random.randint(1, 20), total=random.getrandbits(32), user=_rand_user()))
+
+
+def make_control():
+    return bytes(ControlMessage(common=Common(method='WebcastControlMessage'), status=random.randint(1, 3)))
+
+
+def make_response():
+    messages = [Message(method='WebcastChatMessage', payload=make_chat(), msg_id=random.getrandbits(63))
+                for _ in range(random.randint(1, 20))]
+    return bytes(Response(messages_list=messages, cursor=str(random.getrandbits(60)), fetch_interval=1000,
+                          now=int(time.time() * 1000), internal_ext="internal_src:dim|wss_push_room_id:1",
+                          need_ack=True))
+
+
+def make_push_frame():
+    return bytes(PushFrame(seq_id=random.getrandbits(32), log_id=random.getrandbits(63), service=1, method=1,
+                           payload_encoding='gzip', payload_type='msg', payload=gzip.compress(make_response())))
+
+
+GENERATORS = {
+    'PushFrame': make_push_frame,
+    'Response': make_response,
+    'ChatMessage': make_chat,
+    'GiftMessage': make_gift,
+    'RoomUserSeqMessage': make_user_seq,
+    'LikeMessage': make_like,
+    'ControlMessage': make_control,
+}
+
+
+def rate(func, payloads):
+    start = time.perf_counter()
+    for payload in payloads:
+        func(payload)
+    elapsed = time.perf_counter() - start
+    return len(payloads) / max(elapsed, 1e-9)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--count', type=int, default=2000, help="每种消息的样本条数")
+    args = parser.parse_args()
+
+    random.seed(7)
+    corpus = {name: [gen() for _ in range(args.count)] for name, gen in GENERATORS.items()}
+
+    backends = [get_backend(BACKEND_BETTERPROTO)]
+    upb = get_backend(BACKEND_UPB)
+    if upb.name != BACKEND_UPB:
+        print("⚠️ upb 后端不可用 (需要 protobuf 运行时与 protobuf/douyin_pb2.py)，只测 betterproto")
+    else:
+        print(f"google.protobuf 实现: {upb.implementation}")
+        backends.append(upb)
+
+    print(f"\n全量解析 (条/秒, 每种 {args.count} 条)")
+    for name, payloads in corpus.items():
+        line = f"  {name:<20}"
+        rates = {}
+        for backend in backends:
+            rates[backend.name] = rate(lambda p, b=backend, n=name: b.parse(n, p), payloads)
+            line += f"  {backend.name} {rates[backend.name]:>10.0f}"
+        if len(rates) == 2:
+            line += f"  (x{rates[BACKEND_UPB] / rates[BACKEND_BETTERPROTO]:.1f})"
+        print(line)
+
+    print("\n投影 (条/秒) 与一致性")
+    ok = True
+    for method, name in (('WebcastChatMessage', 'ChatMessage'), ('WebcastGiftMessage', 'GiftMessage')):
+        payloads = corpus[name]
+        decoders = DECODERS[method]
+        line = f"  {method:<20}"
+        for key in ['fast'] + [b.name for b in backends]:
+            line += f"  {key} {rate(decoders[key], payloads):>10.0f}"
+        if len(backends) == 2:
+            mismatches = sum(1 for p in payloads if decoders[BACKEND_BETTERPROTO](p) != decoders[BACKEND_UPB](p))
+            ok = ok and mismatches == 0
+            line += f"  不一致 {mismatches}"
+        print(line)
+
+    sys.exit(0 if ok else 1)
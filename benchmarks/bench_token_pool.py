@@ -0,0 +1,72 @@
+# benchmarks/bench_token_pool.py
+"""
+get_room_status 请求前准备 (msToken + __ac_nonce + __ac_signature) 的耗时对比：
+  legacy : 逐字符 += 拼接 msToken / nonce，每次完整计算 __ac_signature
+  pool   : TokenPool.get() (预生成 + 按秒缓存的 AcSigner)
+
+用法 (在项目根目录):
+    python benchmarks/bench_token_pool.py [次数]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ac_signature import get__ac_signature  # noqa: E402
+from token_pool import TokenPool  # noqa: E402
+
+SITE = "live.douyin.com/"
+UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def legacy_ms_token(length=182):
+    random_str = ''
+    base_str = string.ascii_letters + string.digits + '-_'
+    _len = len(base_str) - 1
+    for _ in range(length):
+        random_str += base_str[random.randint(0, _len)]
+    return random_str
+
+
+def legacy_nonce():
+    chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    return ''.join(random.choice(chars) for _ in range(21))
+
+
+def legacy_prep():
+    ms_token = legacy_ms_token()
+    nonce = legacy_nonce()
+    return ms_token, nonce, get__ac_signature(SITE, nonce, UA, int(time.time()))
+
+
+def report(name, n, cost):
+    print(f"{name:<24} {n:>7} 次  总计 {cost * 1000:>9.1f} ms  平均 {cost * 1e6 / n:>8.2f} µs/次")
+
+
+def bench(n):
+    start = time.perf_counter()
+    for _ in range(n):
+        legacy_prep()
+    report('legacy', n, time.perf_counter() - start)
+
+    # 池子足够大：模拟后台已补满时请求路径上的开销
+    pool = TokenPool(SITE, UA, size=n)
+    pool.refill()
+    start = time.perf_counter()
+    for _ in range(n):
+        pool.get()
+    report('pool (prefilled)', n, time.perf_counter() - start)
+
+    # 池子为空：每次现场生成，仍享受按秒缓存
+    pool = TokenPool(SITE, UA, size=0)
+    start = time.perf_counter()
+    for _ in range(n):
+        pool.get()
+    report('pool (empty, inline)', n, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,214 @@
+# benchmarks/check_fast_decoder.py
+"""
+投影解码器 (fast_decoder) 与 betterproto 的一致性校验 + 解码耗时对比
+(另含 ResponseScanner 与 Response().parse 的比对：只在随机语料模式下执行)
+
+语料:
+  - 指定目录时读取 <目录>/<method>/*.bin (每个文件是一条 Message.payload 原始字节)
+  - 不指定时用 betterproto 随机构造 ChatMessage / GiftMessage (含大量无关字段)，
+    其中约 5% 随机截断，用于确认两条路径对损坏数据的处理一致
+
+用法 (在项目根目录):
+    python benchmarks/check_fast_decoder.py [语料目录] [--count N]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from protobuf.douyin import (  # noqa: E402
+    ChatMessage, GiftMessage, User, Image, PayGrade, FansClub, FansClubData, UserBadge,
+    GiftStruct, Common, FollowInfo, Text, TextEffect, MemberMessage, SocialMessage, Response, Message,
+)
+from fast_decoder import DECODERS  # noqa: E402
+from message_handler import HANDLED_METHODS, get_response_scanner  # noqa: E402
+from resume_cursor import MsgIdWindow  # noqa: E402
+
+
+def _rand_str(n=12):
+    return ''.join(random.choices(string.ascii_letters + "弹幕礼物直播间", k=random.randint(0, n)))
+
+
+def _rand_image():
+    return Image(url_list_list=[f"https://p3.douyinpic.com/{_rand_str(40)}.png" for _ in range(random.randint(0, 3))],
+                 uri=_rand_str(30), width=random.randint(0, 500), height=random.randint(0, 500))
+
+
+def _rand_user():
+    user = User(
+        id=random.getrandbits(63), short_id=random.getrandbits(40), nick_name=_rand_str(),
+        gender=random.randint(0, 2), signature=_rand_str(50), level=random.randint(0, 60),
+        avatar_thumb=_rand_image(), avatar_medium=_rand_image(), avatar_large=_rand_image(),
+        badge_image_list=[_rand_image() for _ in range(random.randint(0, 4))],
+        follow_info=FollowInfo(following_count=random.randint(0, 999), follower_count=random.randint(0, 99999)),
+        sec_uid="MS4wLjAB" + _rand_str(50), medal=_rand_image(),
+        real_time_icons_list=[_rand_image() for _ in range(random.randint(0, 2))],
+    )
+    if random.random() < 0.8:
+        user.pay_grade = PayGrade(level=random.randint(-5, 75), name=_rand_str(),
+                                  new_im_icon_with_level=_rand_image(), icon=_rand_image())
+    if random.random() < 0.7:
+        icons = {k: _rand_image() for k in random.sample(range(8), random.randint(0, 6))}
+        user.fans_club = FansClub(data=FansClubData(club_name=_rand_str(), level=random.randint(-3, 25),
+                                                    badge=UserBadge(icons=icons, title=_rand_str())))
+    return user
+
+
+def make_chat():
+    msg = ChatMessage(common=Common(method='WebcastChatMessage', msg_id=random.getrandbits(63)),
+                      content=_rand_str(60), event_time=random.choice([0, random.getrandbits(31)]),
+                      background_image=_rand_image(), rtf_content=Text(key=_rand_str(), default_patter=_rand_str(30)))
+    if random.random() < 0.98:
+        msg.user = _rand_user()
+    return bytes(msg)
+
+
+def make_gift():
+    msg = GiftMessage(common=Common(method='WebcastGiftMessage', msg_id=random.getrandbits(63)),
+                      gift_id=random.getrandbits(20), group_count=random.randint(0, 10),
+                      repeat_count=random.randint(0, 99), combo_count=random.randint(0, 99),
+                      to_user=_rand_user(), repeat_end=random.randint(0, 1), group_id=random.getrandbits(60),
+                      text_effect=TextEffect(), trace_id=_rand_str(30),
+                      send_time=random.choice([0, random.getrandbits(41)]), log_id=_rand_str(20))
+    if random.random() < 0.98:
+        msg.user = _rand_user()
+    if random.random() < 0.95:
+        msg.gift = GiftStruct(id=random.getrandbits(20), name=_rand_str(), diamond_count=random.randint(0, 30000),
+                              icon=_rand_image(), image=_rand_image(), describe=_rand_str(40))
+    return bytes(msg)
+
+
+def make_response():
+    """混合有处理器与无处理器 (Member / Social) 的消息，模拟真实帧"""
+    messages = []
+    for _ in range(random.randint(1, 30)):
+        kind = random.random()
+        if kind < 0.3:
+            messages.append(Message(method='WebcastChatMessage', payload=make_chat(), msg_id=random.getrandbits(63)))
+        elif kind < 0.4:
+            messages.append(Message(method='WebcastGiftMessage', payload=make_gift(), msg_id=random.getrandbits(63)))
+        elif kind < 0.8:
+            messages.append(Message(method='WebcastMemberMessage', msg_id=random.getrandbits(63),
+                                    payload=bytes(MemberMessage(user=_rand_user(), member_count=random.randint(0, 9999)))))
+        else:
+            messages.append(Message(method='WebcastSocialMessage', msg_id=random.getrandbits(63),
+                                    payload=bytes(SocialMessage(user=_rand_user(), action=1))))
+    return bytes(Response(messages_list=messages, cursor=_rand_str(20), internal_ext="internal_src:dim|" + _rand_str(40),
+                          need_ack=random.random() < 0.9, now=random.getrandbits(41)))
+
+
+def check_scanner(frames):
+    scanner = get_response_scanner()
+    mismatches = 0
+    for frame in frames:
+        response = Response().parse(frame)
+        expected = (response.need_ack, response.internal_ext.encode('utf-8'),
+                    [(m.method, m.payload) for m in response.messages_list if m.method in HANDLED_METHODS])
+        need_ack, internal_ext, messages = scanner.scan(frame)
+        actual = (need_ack, internal_ext, [(method, bytes(payload)) for method, payload in messages])
+        if expected != actual or scanner.split(frame)[2] != response.cursor:
+            mismatches += 1
+
+    # 同一帧重放两次 (模拟重连回放)：第二次应全部被 msg_id 窗口丢弃
+    window = MsgIdWindow(100000)
+    replay_leaks = 0
+    for frame in frames:
+        _, _, _, buf, spans = scanner.split(frame)
+        scanner.select(buf, spans, window)
+        replay_leaks += len(scanner.select(buf, spans, window))
+    mismatches += replay_leaks
+
+    timings = {}
+    start = time.perf_counter()
+    for frame in frames:
+        Response().parse(frame)
+    timings['parse'] = (time.perf_counter() - start) * 1e6 / len(frames)
+    start = time.perf_counter()
+    for frame in frames:
+        scanner.scan(frame)
+    timings['scan'] = (time.perf_counter() - start) * 1e6 / len(frames)
+    print(f"{'Response':<22} {len(frames):>6} 帧  不一致 {mismatches:>3}  "
+          f"Response().parse {timings['parse']:>8.1f} µs/帧  scan {timings['scan']:>7.1f} µs/帧  "
+          f"(x{timings['parse'] / max(timings['scan'], 1e-9):.1f})")
+    print(f"  预筛统计: {scanner.stats()}")
+    return mismatches == 0
+
+
+def load_corpus(directory):
+    corpus = {}
+    for method in DECODERS:
+        path = os.path.join(directory, method)
+        if not os.path.isdir(path):
+            continue
+        corpus[method] = []
+        for name in sorted(os.listdir(path)):
+            with open(os.path.join(path, name), 'rb') as f:
+                corpus[method].append(f.read())
+    return corpus
+
+
+def check(corpus):
+    ok = True
+    for method, payloads in corpus.items():
+        fast = DECODERS[method]['fast']
+        slow = DECODERS[method]['betterproto']
+        mismatches = 0
+        for payload in payloads:
+            try:
+                expected = slow(payload)
+            except Exception as e:
+                expected = f"<error {type(e).__name__}>"
+            try:
+                actual = fast(payload)
+            except Exception as e:
+                actual = f"<error {type(e).__name__}>"
+            # betterproto 失败时 handler 本来就会丢弃这条消息；
+            # 投影解码器不校验跳过的字段，可能仍能解出结果，这里不计为不一致
+            if isinstance(expected, str):
+                continue
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 3:
+                    print(f"❌ {method} 不一致:\n  betterproto={expected}\n  fast       ={actual}")
+        ok = ok and mismatches == 0
+
+        timings = {}
+        for name, decoder in (('betterproto', slow), ('fast', fast)):
+            start = time.perf_counter()
+            for payload in payloads:
+                try:
+                    decoder(payload)
+                except Exception:
+                    pass
+            timings[name] = (time.perf_counter() - start) * 1e6 / max(1, len(payloads))
+        print(f"{method:<22} {len(payloads):>6} 条  不一致 {mismatches:>3}  "
+              f"betterproto {timings['betterproto']:>8.1f} µs/条  fast {timings['fast']:>7.1f} µs/条  "
+              f"(x{timings['betterproto'] / max(timings['fast'], 1e-9):.1f})")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('corpus', nargs='?', help="语料目录 (<method>/*.bin)")
+    parser.add_argument('--count', type=int, default=1000, help="随机语料条数")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        random.seed(7)
+        corpus = {
+            'WebcastChatMessage': [make_chat() for _ in range(args.count)],
+            'WebcastGiftMessage': [make_gift() for _ in range(args.count)],
+        }
+        for payloads in corpus.values():
+            for i in random.sample(range(len(payloads)), len(payloads) // 20):
+                payloads[i] = payloads[i][:random.randint(1, len(payloads[i]))]
+    ok = check(corpus)
+    if not args.corpus:
+        ok = check_scanner([make_response() for _ in range(max(1, args.count // 10))]) and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,206 @@
+# buffer_codec.py
+"""
+Redis 缓冲区 (stream:chats / stream:gifts) 的编解码
+
+- json (默认)：原来的格式，json.dumps + ISO 时间字符串，解码时只还原 created_at
+- msgpack：二进制 map，datetime 用扩展类型 (int64 微秒) 原生编码，需要安装可选依赖 msgpack
+- compact：固定字段表，只存值不存键 (弹幕 / 礼物的键名占了 JSON 的一大半)，
+  datetime 存为整数微秒，中文不转义；字段集合与已知表不一致的文档退回 json
+
+编码结果带格式标记 (json 以 '{' 开头，msgpack 以 'M'、compact 以 'C' 开头)，
+解码按标记自动识别，切换 BUFFER_CODEC 时 stream 里已有的旧条目照常消费。
+compact 的字段表一旦上线就不能修改，增删字段请新增一个表号。
+
+配置: BUFFER_CODEC=json|msgpack|compact
+"""
+import json
+import logging
+import os
+import struct
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger("BufferCodec")
+
+CODEC_JSON = 'json'
+CODEC_MSGPACK = 'msgpack'
+CODEC_COMPACT = 'compact'
+
+TAG_MSGPACK = b'M'
+TAG_COMPACT = b'C'
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_EXT_DATETIME = 1
+_INT64 = struct.Struct('>q')
+
+
+def datetime_serializer(obj):
+    """JSON 序列化时处理 datetime 对象"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def datetime_deserializer(data: dict) -> dict:
+    """将 ISO 格式字符串还原为 datetime 对象"""
+    if 'created_at' in data and isinstance(data['created_at'], str):
+        try:
+            data['created_at'] = datetime.fromisoformat(data['created_at'])
+        except ValueError:
+            data['created_at'] = datetime.now()
+    return data
+
+
+def datetime_to_us(dt: datetime) -> int:
+    """datetime -> 1970 起的微秒数；naive 时间按字面值，带时区的先转成 UTC (与 pymongo 写入 Mongo 的结果一致)"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _MICROSECOND
+
+
+def us_to_datetime(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=us)
+
+
+class JsonCodec:
+    name = CODEC_JSON
+
+    def encode(self, doc: dict) -> bytes:
+        return json.dumps(doc, default=datetime_serializer).encode()
+
+    def decode(self, raw) -> dict:
+        return datetime_deserializer(json.loads(raw))
+
+
+class MsgpackCodec:
+    name = CODEC_MSGPACK
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError as e:
+            raise ImportError("msgpack 编码需要安装可选依赖 msgpack (pip install msgpack)") from e
+        self._msgpack = msgpack
+        self._packer = msgpack.Packer(default=self._default, use_bin_type=True)
+
+    def _default(self, obj):
+        if isinstance(obj, datetime):
+            return self._msgpack.ExtType(_EXT_DATETIME, _INT64.pack(datetime_to_us(obj)))
+        raise TypeError(f"Type {type(obj)} not serializable")
+
+    @staticmethod
+    def _ext_hook(code, data):
+        if code == _EXT_DATETIME:
+            return us_to_datetime(_INT64.unpack(data)[0])
+        raise ValueError(f"未知的 msgpack 扩展类型: {code}")
+
+    def encode(self, doc: dict) -> bytes:
+        return TAG_MSGPACK + self._packer.pack(doc)
+
+    def decode(self, raw) -> dict:
+        return self._msgpack.unpackb(memoryview(raw)[1:], ext_hook=self._ext_hook, raw=False)
+
+
+# compact 字段表: 表号 -> 字段顺序 (与 MessageHandler._build_chat / _build_gift + 礼物去重后的字段一致)
+CHAT_SCHEMA = ('web_rid', 'room_id', 'user_id', 'user_name', 'gender', 'content', 'sec_uid', 'avatar_url',
+               'pay_grade', 'pay_grade_icon', 'fans_club_icon', 'fans_club_level', 'event_time', 'created_at')
+GIFT_SCHEMA = ('web_rid', 'room_id', 'user_id', 'user_name', 'gender', 'sec_uid', 'avatar_url', 'pay_grade',
+               'pay_grade_icon', 'fans_club_level', 'fans_club_icon', 'gift_icon_url', 'gift_id', 'gift_name',
+               'diamond_count', 'combo_count', 'group_count', 'group_id', 'repeat_end', 'trace_id', 'send_time',
+               'created_at', 'total_diamond_count')
+COMPACT_SCHEMAS = {
+    1: CHAT_SCHEMA,
+    2: GIFT_SCHEMA,
+}
+_DATETIME_FIELDS = ('created_at',)
+
+
+class CompactCodec:
+    name = CODEC_COMPACT
+
+    def __init__(self, schemas=None):
+        self.schemas = schemas or COMPACT_SCHEMAS
+        self._by_fields = {frozenset(fields): schema_id for schema_id, fields in self.schemas.items()}
+        self._by_keys = {}       # 文档键顺序 -> 表号 (None 表示没有匹配的表)
+        self._datetime_index = {schema_id: [i for i, field in enumerate(fields) if field in _DATETIME_FIELDS]
+                                for schema_id, fields in self.schemas.items()}
+        self._fallback = JsonCodec()
+        self.fallbacks = 0
+
+    def _schema_id(self, doc):
+        keys = tuple(doc)
+        try:
+            return self._by_keys[keys]
+        except KeyError:
+            schema_id = self._by_keys[keys] = self._by_fields.get(frozenset(keys))
+            return schema_id
+
+    def encode(self, doc: dict) -> bytes:
+        schema_id = self._schema_id(doc)
+        if schema_id is None:
+            self.fallbacks += 1
+            return self._fallback.encode(doc)
+        values = [doc[field] for field in self.schemas[schema_id]]
+        for i in self._datetime_index[schema_id]:
+            if isinstance(values[i], datetime):
+                values[i] = datetime_to_us(values[i])
+        values.insert(0, schema_id)
+        return TAG_COMPACT + json.dumps(values, ensure_ascii=False, separators=(',', ':'),
+                                        default=datetime_serializer).encode()
+
+    def decode(self, raw) -> dict:
+        values = json.loads(memoryview(raw)[1:].tobytes())
+        fields = self.schemas.get(values[0]) if isinstance(values, list) and values else None
+        if fields is None or len(values) != len(fields) + 1:
+            raise ValueError("compact 条目与字段表不匹配")
+        doc = dict(zip(fields, values[1:]))
+        for field in _DATETIME_FIELDS:
+            if isinstance(doc.get(field), int):
+                doc[field] = us_to_datetime(doc[field])
+        return doc
+
+
+_CODEC_CLASSES = {
+    CODEC_JSON: JsonCodec,
+    CODEC_MSGPACK: MsgpackCodec,
+    CODEC_COMPACT: CompactCodec,
+}
+_codecs = {}
+
+
+def get_codec(name=None):
+    """
+    获取编码器；name 为空时读取环境变量 BUFFER_CODEC (默认 json)
+    msgpack 未安装时退回 json
+    """
+    name = (name or os.environ.get('BUFFER_CODEC') or CODEC_JSON).lower()
+    codec = _codecs.get(name)
+    if codec is not None:
+        return codec
+    if name not in _CODEC_CLASSES:
+        logger.warning(f"⚠️ 未知的缓冲区编码 {name}，使用 {CODEC_JSON}")
+        return get_codec(CODEC_JSON)
+    try:
+        codec = _CODEC_CLASSES[name]()
+    except ImportError as e:
+        logger.error(f"❌ 缓冲区编码 {name} 不可用，退回 {CODEC_JSON}: {e}")
+        return get_codec(CODEC_JSON)
+    _codecs[name] = codec
+    logger.info(f"✅ 缓冲区编码: {name}")
+    return codec
+
+
+def decode_payload(raw) -> dict:
+    """按格式标记解码 stream 条目 (bytes；旧版 List 迁移过来的条目可能是 str)"""
+    if isinstance(raw, str):
+        return get_codec(CODEC_JSON).decode(raw)
+    tag = raw[:1]
+    if tag == TAG_COMPACT:
+        return get_codec(CODEC_COMPACT).decode(raw)
+    if tag == TAG_MSGPACK:
+        codec = _codecs.get(CODEC_MSGPACK)
+        if codec is None:
+            # 未安装 msgpack 时抛 ImportError：消费者把条目移入死信 stream，装好 msgpack 后可从死信重放
+            codec = _codecs[CODEC_MSGPACK] = MsgpackCodec()
+        return codec.decode(raw)
+    return get_codec(CODEC_JSON).decode(raw)
@@ -0,0 +1,155 @@
+# connection_manager.py
+"""
+WebSocket / HTTP 分池
+
+原来 monitor 和所有 fetcher 共用一个默认 connector 的 ClientSession (limit=100)：
+每个直播间的 ws_connect 会长期占住一个连接，直播间多了以后 get_room_status、关注列表扫描这些短请求就排不上队，直至超时。
+
+现在拆成两个 session (共享同一个 cookie jar)：
+- http: 短请求，limit / limit_per_host 限流，keep-alive 复用连接
+- ws:   长连接，默认不限连接数 (直播间数量不再受 connector 上限约束)
+两者都开启 DNS 缓存，并通过 TraceConfig 统计排队次数 / 排队等待时间 (池饱和度)、新建与复用连接数。
+
+配置: HTTP_POOL_LIMIT (默认 100)、HTTP_POOL_PER_HOST (默认 20)、WS_POOL_LIMIT (默认 0 = 不限)、
+      HTTP_KEEPALIVE (默认 30s)、DNS_CACHE_TTL (默认 300s)
+"""
+import logging
+import os
+import time
+from types import SimpleNamespace
+
+import aiohttp
+
+logger = logging.getLogger("Connections")
+
+
+class PoolStats:
+    """通过 aiohttp TraceConfig 收集单个连接池的指标"""
+
+    def __init__(self, name):
+        self.name = name
+        self.connector = None
+        self.queued = 0          # 因连接池满而排队的次数
+        self.created = 0
+        self.reused = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self._wait_sum = 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig(trace_config_ctx_factory=SimpleNamespace)
+        trace.on_connection_queued_start.append(self._queued_start)
+        trace.on_connection_queued_end.append(self._queued_end)
+        trace.on_connection_create_end.append(self._created)
+        trace.on_connection_reuseconn.append(self._reused)
+        return trace
+
+    async def _queued_start(self, session, ctx, params):
+        ctx.queued_at = time.perf_counter()
+        self.queued += 1
+
+    async def _queued_end(self, session, ctx, params):
+        wait = time.perf_counter() - ctx.queued_at
+        self.last_wait = wait
+        self._wait_sum += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+    async def _created(self, session, ctx, params):
+        self.created += 1
+
+    async def _reused(self, session, ctx, params):
+        self.reused += 1
+
+    def stats(self) -> dict:
+        connector = self.connector
+        # _acquired 是 aiohttp 内部字段，取不到时只缺这一项
+        in_use = len(getattr(connector, '_acquired', ())) if connector else 0
+        limit = connector.limit if connector else 0
+        return {
+            'limit': limit or '∞',
+            'in_use': in_use,
+            'saturation': round(in_use / limit, 2) if limit else 0,
+            'queued': self.queued,
+            'wait_ms': round(self.last_wait * 1000, 1),
+            'avg_wait_ms': round(self._wait_sum * 1000 / max(1, self.queued), 1),
+            'max_wait_ms': round(self.max_wait * 1000, 1),
+            'created': self.created,
+            'reused': self.reused,
+        }
+
+
+class ConnectionManager:
+    """
+    用法:
+        async with ConnectionManager(timeout=...) as conns:
+            conns.http.get(...)      # 短请求
+            conns.ws.ws_connect(...) # 长连接
+    进入后注册为进程当前实例，fetcher 通过 get_connections() 取 ws session
+    """
+
+    def __init__(self, timeout=None, http_limit=None, http_per_host=None, ws_limit=None):
+        self.timeout = timeout or aiohttp.ClientTimeout(total=15, connect=10)
+        self.http_limit = http_limit if http_limit is not None else int(os.environ.get('HTTP_POOL_LIMIT', 100))
+        self.http_per_host = http_per_host if http_per_host is not None else int(os.environ.get('HTTP_POOL_PER_HOST', 20))
+        self.ws_limit = ws_limit if ws_limit is not None else int(os.environ.get('WS_POOL_LIMIT', 0))
+        self.keepalive = float(os.environ.get('HTTP_KEEPALIVE', 30))
+        self.dns_ttl = int(os.environ.get('DNS_CACHE_TTL', 300))
+
+        self.http = None
+        self.ws = None
+        self.http_stats = PoolStats('http')
+        self.ws_stats = PoolStats('ws')
+
+    async def open(self):
+        cookie_jar = aiohttp.CookieJar()
+        http_connector = aiohttp.TCPConnector(
+            limit=self.http_limit, limit_per_host=self.http_per_host,
+            ttl_dns_cache=self.dns_ttl, keepalive_timeout=self.keepalive,
+        )
+        ws_connector = aiohttp.TCPConnector(limit=self.ws_limit, ttl_dns_cache=self.dns_ttl)
+        self.http_stats.connector = http_connector
+        self.ws_stats.connector = ws_connector
+
+        self.http = aiohttp.ClientSession(
+            connector=http_connector, timeout=self.timeout, cookie_jar=cookie_jar,
+            trace_configs=[self.http_stats.trace_config()],
+        )
+        # WS 只限制建连时间，连上后的读写不受 total 超时约束
+        self.ws = aiohttp.ClientSession(
+            connector=ws_connector, timeout=aiohttp.ClientTimeout(total=None, connect=self.timeout.connect),
+            cookie_jar=cookie_jar, trace_configs=[self.ws_stats.trace_config()],
+        )
+        logger.info(f"✅ 连接池已初始化: http limit={self.http_limit}/host {self.http_per_host} | "
+                    f"ws limit={self.ws_limit or '∞'}")
+        return self
+
+    async def close(self):
+        if self.http:
+            await self.http.close()
+        if self.ws:
+            await self.ws.close()
+
+    async def __aenter__(self):
+        global _current
+        await self.open()
+        _current = self
+        return self
+
+    async def __aexit__(self, *exc):
+        global _current
+        if _current is self:
+            _current = None
+        await self.close()
+
+    def stats(self) -> dict:
+        return {'http': self.http_stats.stats(), 'ws': self.ws_stats.stats()}
+
+
+# --- 进程当前实例 (由 async with 注册) ---
+_current = None
+
+
+def get_connections():
+    """未初始化时返回 None (fetcher 回退到自己的 session)"""
+    return _current
@@ -1,32 +1,26 @@
 # db.py
-import time
 import asyncio
-import json
+import os
 from datetime import datetime
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import PyMongoError, BulkWriteError, CollectionInvalid
-from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo import IndexModel, ASCENDING, DESCENDING, ReturnDocument
 from redis_client import get_redis
+from redis_batcher import RedisStreamBatcher
+from stream_buffer import StreamConsumer, PartialWriteError, ensure_group
+from room_counters import RoomCounterWriter
+from room_stats import RoomStatsCoalescer, room_stats_fields
+from room_state_cache import RoomStateCache, PROJECTION as ROOM_CACHE_PROJECTION
+from buffer_codec import get_codec, decode_payload
+from user_profiles import UserProfileStore, normalize_users, COL_USERS
 from datetime import datetime,timedelta
 logger = logging.getLogger("DB")
 
 
-def datetime_serializer(obj):
-    """JSON 序列化时处理 datetime 对象"""
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    raise TypeError(f"Type {type(obj)} not serializable")
-
-
-def datetime_deserializer(data: dict) -> dict:
-    """将 ISO 格式字符串还原为 datetime 对象"""
-    if 'created_at' in data and isinstance(data['created_at'], str):
-        try:
-            data['created_at'] = datetime.fromisoformat(data['created_at'])
-        except ValueError:
-            data['created_at'] = datetime.now()
-    return data
+def external_sink() -> bool:
+    """EXTERNAL_SINK=1 时由独立的 sink.py 落库，采集进程只写 Redis 缓冲区"""
+    return os.environ.get('EXTERNAL_SINK') == '1'
 
 
 class AsyncMongoDBHandler:
@@ -36,14 +30,31 @@ class AsyncMongoDBHandler:
             self.client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
             self.db = self.client[db_name]
             
-            # Redis 缓冲区 Key
-            self.REDIS_CHAT_KEY = "buffer:chats"
-            self.REDIS_GIFT_KEY = "buffer:gifts"
+            # Redis 缓冲区 Key (Stream，消费者组负责落库)
+            self.REDIS_CHAT_KEY = "stream:chats"
+            self.REDIS_GIFT_KEY = "stream:gifts"
+            # 旧版 List 缓冲区，启动时迁移残留数据
+            self.LEGACY_CHAT_KEY = "buffer:chats"
+            self.LEGACY_GIFT_KEY = "buffer:gifts"
             
             # 配置
             self.BATCH_SIZE = 500
-            self.LAST_WRITE_TIME = time.time()
             self.BUFFER_TIMEOUT = 5  # 缩短写入间隔，适应时序数据
+
+            # 所有直播间的 XADD 合并成微批发送，积压条数在本地跟踪 (独立 sink 落库时本进程不消费，不跟踪)
+            self.batcher = RedisStreamBatcher(track_depth=not external_sink())
+            # 缓冲区条目编码 (BUFFER_CODEC=json|msgpack|compact)；消费端按格式标记自动识别
+            self.codec = get_codec()
+            self.consumers = []
+            self._wake = {self.REDIS_CHAT_KEY: asyncio.Event(), self.REDIS_GIFT_KEY: asyncio.Event()}
+            # rooms 计数增量合并后一次 bulk_write
+            self.room_counters = RoomCounterWriter(lambda: self.db['rooms'])
+            # 在线人数 / 点赞 / 灯牌等实时统计：内存合并，定时批量写回
+            self.room_stats = RoomStatsCoalescer(lambda: self.db['rooms'])
+            # rooms 热字段 (live_status / start_follower_count) 的直写缓存
+            self.room_cache = RoomStateCache()
+            # NORMALIZE_USERS=1：用户资料拆到 users 集合，事件文档只保留 user_id
+            self.users = UserProfileStore(lambda: self.db[COL_USERS]) if normalize_users() else None
             
             # 定义时序集合名称
             self.COL_GIFT = "live_gifts"
@@ -117,11 +128,30 @@ class AsyncMongoDBHandler:
             await self.db[self.COL_CHAT].create_index([("sec_uid", ASCENDING)]) # 用于精准搜ID
             
             await self.db['pk_history'].create_index([("room_id", ASCENDING), ("created_at", DESCENDING)])
+
+            # 用户维度表 (NORMALIZE_USERS=1 时才使用)
+            if self.users:
+                await self.db[COL_USERS].create_index("user_id", unique=True)
+                await self.db[COL_USERS].create_index([("sec_uid", ASCENDING)])
+                await self.db[COL_USERS].create_index([("user_name", ASCENDING)])
+                await self.db[self.COL_GIFT].create_index([("room_id", ASCENDING), ("user_id", ASCENDING)])
             
             logger.info("✅ 数据库集合与索引检查完成")
         except Exception as e:
             logger.error(f"❌ 索引/集合初始化失败: {e}")
 
+    async def warm_room_cache(self):
+        """预热直播中房间的热字段缓存 (启动时调用)"""
+        try:
+            count = 0
+            async for doc in self.db['rooms'].find({"live_status": {"$in": [1, 2]}}, ROOM_CACHE_PROJECTION):
+                if doc.get('room_id'):
+                    self.room_cache.put(doc['room_id'], doc)
+                    count += 1
+            logger.info(f"✅ [DB] 直播间缓存预热完成: {count} 个")
+        except PyMongoError as e:
+            logger.error(f"❌ [DB] 直播间缓存预热失败: {e}")
+
     async def save_room_info(self, data: dict):
         """保存直播间基础信息 (常规集合)"""
         if not data: return
@@ -139,14 +169,18 @@ class AsyncMongoDBHandler:
             else:
                 insert_fields['start_follower_count'] = 0
 
-            await self.db['rooms'].update_one(
+            # 同一次往返取回写入后的热字段 (含 $setOnInsert 的 start_follower_count)，直接填充缓存
+            doc = await self.db['rooms'].find_one_and_update(
                 {"room_id": data['room_id']}, 
                 {
                     "$set": update_fields,
                     "$setOnInsert": insert_fields
                 },
-                upsert=True
+                projection=ROOM_CACHE_PROJECTION,
+                upsert=True,
+                return_document=ReturnDocument.AFTER
             )
+            self.room_cache.put(data['room_id'], doc)
         except PyMongoError as e:
             logger.error(f"❌ [DB] 保存直播间信息失败: {e}")
 
@@ -165,6 +199,7 @@ class AsyncMongoDBHandler:
                     }
                 }
             )
+            self.room_cache.update(room_id, live_status=4)
             logger.info(f"🏁 [DB] 直播间 {room_id} 已标记为结束")
         except PyMongoError as e:
             logger.error(f"❌ [DB] 标记结束失败: {e}")
@@ -179,13 +214,17 @@ class AsyncMongoDBHandler:
             }
             if current_follower_count > 0:
                 update_fields["current_follower_count"] = current_follower_count
-                room = await self.db['rooms'].find_one({"room_id": room_id}, {"start_follower_count": 1})
+                room = self.room_cache.get(room_id)
+                if room is None:
+                    room = self.room_cache.put(
+                        room_id, await self.db['rooms'].find_one({"room_id": room_id}, ROOM_CACHE_PROJECTION))
                 if room:
                     start_count = room.get('start_follower_count', 0)
                     if start_count > 0:
                         update_fields["follower_diff"] = current_follower_count - start_count
 
             await self.db['rooms'].update_one({"room_id": room_id}, {"$set": update_fields})
+            self.room_cache.update(room_id, live_status=live_status)
         except PyMongoError as e:
             logger.error(f"❌ [DB] 更新实时数据失败: {e}")
 
@@ -210,187 +249,170 @@ class AsyncMongoDBHandler:
         异步保存礼物信息 (Redis 缓冲 + 批量写入时序集合)
         """
         if not data: return
-        try:
-            if isinstance(data.get('created_at'), str):
-                try:
-                    data['created_at'] = datetime.now() 
-                except:
-                    data['created_at'] = datetime.now()
-            elif not data.get('created_at'):
-                data['created_at'] = datetime.now()
-            
-            redis_client = get_redis()
-            json_data = json.dumps(data, default=datetime_serializer)
-            await redis_client.rpush(self.REDIS_GIFT_KEY, json_data)
-            
-            current_time = time.time()
-            buffer_size = await redis_client.llen(self.REDIS_GIFT_KEY)
-            
-            if buffer_size >= self.BATCH_SIZE or (current_time - self.LAST_WRITE_TIME > self.BUFFER_TIMEOUT):
-                await self.flush_gift_buffer()
+        await self.insert_gifts([data])
 
+    async def insert_gifts(self, items: list):
+        """批量保存礼物：并入微批 XADD，积压到阈值时唤醒消费者落库"""
+        if not items: return
+        try:
+            buffer_size = await self._push_buffer(self.REDIS_GIFT_KEY, items)
+            self._maybe_flush(self.REDIS_GIFT_KEY, buffer_size)
         except Exception as e:
             logger.error(f"❌ [DB] 缓冲礼物失败: {e}")
 
-    async def flush_gift_buffer(self):
-        """刷新礼物缓冲区 -> live_gifts (TimeSeries) [安全版]"""
-        try:
-            redis_client = get_redis()
-            BATCH_COUNT = 1000
-            
-            raw_data_list = await redis_client.lpop(self.REDIS_GIFT_KEY, count=BATCH_COUNT)
-            
+    async def _push_buffer(self, key: str, items: list) -> int:
+        """编码后并入微批 XADD，返回本地跟踪的积压条数"""
+        payloads = []
+        for data in items:
+            if isinstance(data.get('created_at'), str) or not data.get('created_at'):
+                data['created_at'] = datetime.now()
+            payloads.append(self.codec.encode(data))
+        return await self.batcher.push(key, payloads)
+
+    def _maybe_flush(self, key, buffer_size):
+        """积压达到 BATCH_SIZE 时提前唤醒消费者 (否则消费者每 BUFFER_TIMEOUT 秒自行消费)，调用方不等待 Mongo 写入"""
+        if buffer_size >= self.BATCH_SIZE:
+            self._wake[key].set()
+
+    async def start_flushers(self, consumers=None):
+        """启动 Stream 消费者 (需在 init_redis 之后调用)；只写入不落库的进程不需要调用"""
+        count = consumers or int(os.environ.get('BUFFER_CONSUMERS', 2))
+        for key, legacy_key, handler in ((self.REDIS_CHAT_KEY, self.LEGACY_CHAT_KEY, self._write_chat_batch),
+                                         (self.REDIS_GIFT_KEY, self.LEGACY_GIFT_KEY, self._write_gift_batch)):
+            await ensure_group(key)
+            await self._migrate_legacy_buffer(legacy_key, key)
+            for i in range(count):
+                consumer = StreamConsumer(key, i, handler, decode_payload, self.BATCH_SIZE, self.BUFFER_TIMEOUT,
+                                          wake=self._wake[key], on_drained=self.batcher.drained)
+                consumer.start()
+                self.consumers.append(consumer)
+        logger.info(f"✅ [DB] Stream 缓冲区消费者已启动: 每个 stream {count} 个")
+
+    async def _migrate_legacy_buffer(self, legacy_key, key):
+        """旧版 List 缓冲区中的残留数据搬进 stream (启动时执行一次)"""
+        redis_client = get_redis()
+        moved = 0
+        while True:
+            raw_data_list = await redis_client.lpop(legacy_key, count=1000)
             if not raw_data_list:
+                break
+            await self.batcher.push(key, raw_data_list)
+            moved += len(raw_data_list)
+        if moved:
+            logger.info(f"📦 [DB] 已将 {legacy_key} 中的 {moved} 条残留数据迁移到 {key}")
+
+    async def _drain(self, key):
+        for consumer in self.consumers:
+            if consumer.key == key:
+                await consumer.drain()
                 return
 
-            current_batch = []
-            for raw in raw_data_list:
-                try:
-                    data = json.loads(raw)
-                    data = datetime_deserializer(data)
-                    current_batch.append(data)
-                except: pass
-            
-            if not current_batch:
-                return
-            
-            try:
-                await self.db[self.COL_GIFT].insert_many(current_batch, ordered=False)
-                
-                room_diamond_sum = {}
-                for gift in current_batch:
-                    room_id = gift.get('room_id')
-                    diamond = gift.get('total_diamond_count', 0)
-                    
-                    if diamond == 0:
-                        d = gift.get('diamond_count', 0)
-                        c = gift.get('combo_count', 1)
-                        g = gift.get('group_count', 1)
-                        diamond = d * c * g
-    
-                    if room_id and diamond > 0:
-                        room_diamond_sum[room_id] = room_diamond_sum.get(room_id, 0) + diamond
-                
-                for room_id, diamond_inc in room_diamond_sum.items():
-                    await self.db['rooms'].update_one(
-                        {"room_id": str(room_id)}, 
-                        {
-                            "$inc": {"total_diamond_count": diamond_inc},
-                            "$set": {"updated_at": datetime.now()}
-                        },
-                        upsert=True
-                    )
-
-            except Exception as e:
-                logger.error(f"❌ [DB] 批量写入礼物失败: {e}")
-                if raw_data_list:
-                     await redis_client.rpush(self.REDIS_GIFT_KEY, *raw_data_list)
+    async def flush_gift_buffer(self):
+        """立即消费礼物 stream -> live_gifts (TimeSeries)"""
+        await self._drain(self.REDIS_GIFT_KEY)
 
-        except Exception as e:
-            logger.error(f"❌ [DB] 刷新礼物异常: {e}")
+    async def _insert_events(self, collection, batch):
+        """
+        insert_many (ordered=False)，返回 (已写入的文档, 失败文档的下标)
+        没有逐条错误的 BulkWriteError (如只有 writeConcernError) 与其他异常照常抛出，整批重试
+        """
+        try:
+            await self.db[collection].insert_many(batch, ordered=False)
+            return batch, set()
+        except BulkWriteError as e:
+            failed = {err['index'] for err in e.details.get('writeErrors', [])}
+            if not failed:
+                raise
+            return [doc for i, doc in enumerate(batch) if i not in failed], failed
+
+    async def _write_gift_batch(self, current_batch):
+        """写入一批礼物；insert_many 失败时抛出 (部分失败时抛 PartialWriteError)，由消费者保留失败的条目稍后重试"""
+        if self.users:
+            await self.users.normalize(current_batch)
+        current_batch, failed = await self._insert_events(self.COL_GIFT, current_batch)
+
+        room_diamond_sum = {}
+        for gift in current_batch:
+            room_id = gift.get('room_id')
+            diamond = gift.get('total_diamond_count', 0)
+            
+            if diamond == 0:
+                d = gift.get('diamond_count', 0)
+                c = gift.get('combo_count', 1)
+                g = gift.get('group_count', 1)
+                diamond = d * c * g
+
+            if room_id and diamond > 0:
+                room_diamond_sum[room_id] = room_diamond_sum.get(room_id, 0) + diamond
+        
+        # 明细已写入；计数由 RoomCounterWriter 合并批量写入，失败时自行重试，不再整批重放明细
+        await self.room_counters.add("total_diamond_count", room_diamond_sum)
+        if failed:
+            raise PartialWriteError(failed)
 
     async def insert_chat(self, data: dict):
         """
         异步保存弹幕信息 (Redis 缓冲 + 批量写入时序集合)
         """
         if not data: return
-        try:
-            if isinstance(data.get('created_at'), str) or not data.get('created_at'):
-                data['created_at'] = datetime.now()
+        await self.insert_chats([data])
 
-            redis_client = get_redis()
-            json_data = json.dumps(data, default=datetime_serializer)
-            await redis_client.rpush(self.REDIS_CHAT_KEY, json_data)
-            
-            current_time = time.time()
-            buffer_size = await redis_client.llen(self.REDIS_CHAT_KEY)
-            
-            if buffer_size >= self.BATCH_SIZE or (current_time - self.LAST_WRITE_TIME > self.BUFFER_TIMEOUT):
-                await self.flush_chat_buffer()
+    async def insert_chats(self, items: list):
+        """批量保存弹幕：并入微批 XADD，积压到阈值时唤醒消费者落库"""
+        if not items: return
+        try:
+            buffer_size = await self._push_buffer(self.REDIS_CHAT_KEY, items)
+            self._maybe_flush(self.REDIS_CHAT_KEY, buffer_size)
         except Exception as e:
             logger.error(f"❌ [DB] 缓冲弹幕失败: {e}")
 
     async def flush_chat_buffer(self):
-        """刷新弹幕缓冲区 -> live_chats (TimeSeries)"""
-        try:
-            redis_client = get_redis()
-            buffer_size = await redis_client.llen(self.REDIS_CHAT_KEY)
-            if buffer_size == 0:
-                return
-        except RuntimeError as e:
-            logger.warning(f"⚠️ [DB] Redis 不可用，跳过弹幕缓冲刷新: {e}")
-            return
-        except Exception as e:
-            logger.error(f"❌ [DB] 检查 Redis 缓冲区失败: {e}")
-            return
+        """立即消费弹幕 stream -> live_chats (TimeSeries)"""
+        await self._drain(self.REDIS_CHAT_KEY)
+
+    async def _write_chat_batch(self, current_batch):
+        """写入一批弹幕；insert_many 失败时抛出 (部分失败时抛 PartialWriteError)，由消费者保留失败的条目稍后重试"""
+        if self.users:
+            await self.users.normalize(current_batch)
+        current_batch, failed = await self._insert_events(self.COL_CHAT, current_batch)
         
-        self.LAST_WRITE_TIME = time.time()
-
-        try:
-            pipe = redis_client.pipeline()
-            pipe.lrange(self.REDIS_CHAT_KEY, 0, -1)
-            pipe.delete(self.REDIS_CHAT_KEY)
-            results = await pipe.execute()
-            
-            raw_data_list = results[0]
-            if not raw_data_list:
-                return
-            
-            current_batch = []
-            for raw in raw_data_list:
-                try:
-                    data = json.loads(raw)
-                    data = datetime_deserializer(data)
-                    current_batch.append(data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"❌ [DB] JSON 解析失败: {e}")
-            
-            if not current_batch:
-                return
-            
-            await self.db[self.COL_CHAT].insert_many(current_batch, ordered=False)
-            
-            room_chat_count = {}
-            for chat in current_batch:
-                room_id = chat.get('room_id')
-                if room_id:
-                    room_chat_count[room_id] = room_chat_count.get(room_id, 0) + 1
-            
-            for room_id, chat_inc in room_chat_count.items():
-                await self.db['rooms'].update_one(
-                    {"room_id": room_id},
-                    {
-                        "$inc": {"total_chat_count": chat_inc},
-                        "$set": {"updated_at": datetime.now()}
-                    },
-                    upsert=True
-                )
-            
-            logger.debug(f"📦 [DB] 已写入 {len(current_batch)} 条弹幕记录")
-                
-        except Exception as e:
-            logger.error(f"❌ [DB] 刷新弹幕异常: {e}")
+        room_chat_count = {}
+        for chat in current_batch:
+            room_id = chat.get('room_id')
+            if room_id:
+                room_chat_count[room_id] = room_chat_count.get(room_id, 0) + 1
+        
+        await self.room_counters.add("total_chat_count", room_chat_count)
+        
+        logger.debug(f"📦 [DB] 已写入 {len(current_batch)} 条弹幕记录")
+        if failed:
+            raise PartialWriteError(failed)
+
+    def buffer_stats(self) -> dict:
+        return {
+            'batcher': self.batcher.stats(),
+            'consumers': {f"{c.key}#{c.index}": c.stats() for c in self.consumers},
+            'room_counters': self.room_counters.stats(),
+            'room_stats': self.room_stats.stats(),
+            'room_cache': self.room_cache.stats(),
+            'codec': self.codec.name,
+            'users': self.users.stats() if self.users else None,
+        }
 
     async def update_room_stats(self, room_id, stats: dict):
-        """更新房间状态 (仍保留，因为是更新 rooms 表)"""
+        """立即更新房间状态 (高频统计请用 self.room_stats.set 合并写回)"""
         if not room_id or not stats: return
         try:
-            update_fields = {"updated_at": datetime.now()}
-            
-            if 'user_count' in stats: update_fields['user_count'] = stats['user_count']
-            if 'total_user' in stats: update_fields['total_user_count'] = stats['total_user']
-            if 'like_count' in stats: update_fields['like_count'] = stats['like_count']
-            if 'live_status' in stats: 
-                update_fields['live_status'] = stats['live_status']
-                update_fields['room_status'] = stats['live_status']
-            if 'ranks' in stats: 
-                update_fields['ranks'] = stats['ranks']
+            update_fields, max_fields = room_stats_fields(stats)
+            update_fields["updated_at"] = datetime.now()
 
             pipeline = {"$set": update_fields}
-            if 'user_count' in stats:
-                pipeline["$max"] = {"max_viewers": stats['user_count']}
+            if max_fields:
+                pipeline["$max"] = max_fields
                 
             await self.db['rooms'].update_one({"room_id": room_id}, pipeline, upsert=True)
+            if 'live_status' in update_fields:
+                self.room_cache.update(room_id, live_status=update_fields['live_status'])
         except PyMongoError:
             pass
 
@@ -410,6 +432,7 @@ class AsyncMongoDBHandler:
             logger.error(f"❌ [DB] 保存PK数据失败: {e}")
 
     async def increment_room_stats(self, room_id: str, inc_data: dict):
+        """立即递增统计 (高频统计请用 self.room_stats.incr 合并写回)"""
         if not room_id or not inc_data: return
         try:
             await self.db['rooms'].update_one(
@@ -425,22 +448,31 @@ class AsyncMongoDBHandler:
 
     async def close(self):
         logger.info("💾 正在将 Redis 缓冲区数据写入 MongoDB...")
+        await self.batcher.flush()
         await self.flush_chat_buffer()
         await self.flush_gift_buffer()
+        for consumer in self.consumers:
+            await consumer.stop()
+        # 消费者停止后不会再有新增量，写完 rooms 计数再关闭连接
+        await self.room_counters.flush()
+        await self.room_stats.stop()
         # 移除了 flush_stat_buffer
         self.client.close()
         logger.info("👋 MongoDB 连接已关闭")
 
-    async def get_room_live_status(self, room_id: str):
+    async def get_room_live_status(self, room_id: str, fresh=False):
         """
         【新增】获取指定房间的当前数据库状态
-        用于 main.py 判断是否需要重启录制
+        用于 main.py 判断是否需要重启录制 (优先读缓存)
+        :param fresh: 跳过缓存直接读 Mongo (结算 / 重连等决策用，其他进程或节点可能已改写)
         """
         try:
-            res = await self.db['rooms'].find_one(
-                {"room_id": room_id}, 
-                {"live_status": 1}
-            )
+            if fresh:
+                self.room_cache.invalidate(room_id)
+            res = self.room_cache.get(room_id)
+            if res is None:
+                res = self.room_cache.put(
+                    room_id, await self.db['rooms'].find_one({"room_id": room_id}, ROOM_CACHE_PROJECTION))
             if res:
                 return res.get('live_status', 0)
         except Exception:
@@ -498,7 +530,14 @@ class AsyncMongoDBHandler:
                 }
             ]
             
+            # 先取出要清理的房间号，更新后让它们的缓存失效
+            room_ids = [doc['room_id'] async for doc in self.db['rooms'].find(query, {"_id": 0, "room_id": 1})
+                        if doc.get('room_id')]
+            if not room_ids:
+                return
+            query["room_id"] = {"$in": room_ids}
             result = await self.db['rooms'].update_many(query, update_pipeline)
+            self.room_cache.invalidate(*room_ids)
             
             if result.modified_count > 0:
                 logger.warning(f"🧟‍♂️ [DB] 清理了 {result.modified_count} 个僵尸直播间 (判定结束时间为最后活跃时刻)")
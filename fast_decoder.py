@@ -0,0 +1,491 @@
+# fast_decoder.py
+"""
+ChatMessage / GiftMessage 投影解码器
+
+betterproto 的 ChatMessage().parse / GiftMessage().parse 会把整棵 User 树
+(徽章列表、FollowInfo、勋章、rtf_content、Text 特效…) 全部实例化，
+而 MessageHandler 只用到其中十几个字段。
+
+这里直接在 protobuf wire format 上按字段号扫描：只读取需要的字段，
+其余字段 (包括嵌套消息) 仅移动游标跳过，不创建任何对象。
+输出为扁平的投影字典，betterproto 路径通过 project_chat / project_gift
+产出完全相同结构的字典，二者可以逐字段比对 (见 benchmarks/check_fast_decoder.py)。
+
+字段号来自 protobuf/douyin.proto
+"""
+from collections import Counter
+from functools import partial
+
+from liveMan_utils import get_safe_url
+from proto_backend import get_backend, BACKEND_BETTERPROTO, BACKEND_UPB
+
+# --- wire types ---
+WIRE_VARINT = 0
+WIRE_FIXED64 = 1
+WIRE_LEN = 2
+WIRE_FIXED32 = 5
+
+# --- 字段号 ---
+# PushFrame
+FRAME_LOG_ID, FRAME_PAYLOAD_TYPE, FRAME_PAYLOAD = 2, 7, 8
+# Response / Message
+RESPONSE_MESSAGES, RESPONSE_CURSOR, RESPONSE_INTERNAL_EXT, RESPONSE_NEED_ACK = 1, 2, 5, 9
+MESSAGE_METHOD, MESSAGE_PAYLOAD, MESSAGE_MSG_ID = 1, 2, 3
+# ChatMessage
+CHAT_USER, CHAT_CONTENT, CHAT_EVENT_TIME = 2, 3, 15
+# GiftMessage
+GIFT_GROUP_COUNT, GIFT_COMBO_COUNT, GIFT_USER, GIFT_REPEAT_END = 4, 6, 7, 9
+GIFT_GROUP_ID, GIFT_GIFT, GIFT_SEND_TIME, GIFT_TRACE_ID = 11, 15, 33, 35
+# User
+USER_ID, USER_NICK_NAME, USER_GENDER, USER_AVATAR_THUMB = 1, 3, 4, 9
+USER_PAY_GRADE, USER_FANS_CLUB, USER_SEC_UID = 23, 24, 46
+# PayGrade
+PAY_GRADE_LEVEL, PAY_GRADE_NEW_IM_ICON_WITH_LEVEL = 6, 19
+# FansClub -> FansClubData -> UserBadge -> icons (map<int32, Image>)
+FANS_CLUB_DATA = 1
+FANS_CLUB_DATA_LEVEL, FANS_CLUB_DATA_BADGE = 2, 4
+BADGE_ICONS = 1
+MAP_KEY, MAP_VALUE = 1, 2
+FANS_CLUB_ICON_KEY = 4
+# GiftStruct
+GIFT_STRUCT_ID, GIFT_STRUCT_DIAMOND_COUNT, GIFT_STRUCT_NAME, GIFT_STRUCT_ICON = 5, 12, 16, 21
+# Image
+IMAGE_URL_LIST = 1
+
+_USER_FIELDS = frozenset((USER_ID, USER_NICK_NAME, USER_GENDER, USER_AVATAR_THUMB,
+                          USER_PAY_GRADE, USER_FANS_CLUB, USER_SEC_UID))
+_PAY_GRADE_FIELDS = frozenset((PAY_GRADE_LEVEL, PAY_GRADE_NEW_IM_ICON_WITH_LEVEL))
+_FANS_CLUB_DATA_FIELDS = frozenset((FANS_CLUB_DATA_LEVEL, FANS_CLUB_DATA_BADGE))
+_GIFT_STRUCT_FIELDS = frozenset((GIFT_STRUCT_ID, GIFT_STRUCT_DIAMOND_COUNT, GIFT_STRUCT_NAME, GIFT_STRUCT_ICON))
+_CHAT_FIELDS = frozenset((CHAT_USER, CHAT_CONTENT, CHAT_EVENT_TIME))
+_GIFT_FIELDS = frozenset((GIFT_GROUP_COUNT, GIFT_COMBO_COUNT, GIFT_USER, GIFT_REPEAT_END,
+                          GIFT_GROUP_ID, GIFT_GIFT, GIFT_SEND_TIME, GIFT_TRACE_ID))
+
+
+def read_varint(buf, pos):
+    """读取 varint，返回 (值, 新位置)"""
+    b = buf[pos]
+    if b < 0x80:
+        return b, pos + 1
+    result = b & 0x7F
+    shift = 7
+    pos += 1
+    while True:
+        b = buf[pos]
+        result |= (b & 0x7F) << shift
+        pos += 1
+        if b < 0x80:
+            return result, pos
+        shift += 7
+
+
+def scan_fields(buf, pos, end, wanted):
+    """
+    扫描 buf[pos:end] 中的字段，只记录 wanted 内的字段号 (同号字段后者覆盖前者，与 betterproto 一致)
+    varint 字段记录整数值，length-delimited 字段记录 (start, end) 区间，不拷贝数据
+    越界的长度按 betterproto 的切片语义截断到 end
+    """
+    out = {}
+    while pos < end:
+        key, pos = read_varint(buf, pos)
+        wire_type = key & 7
+        field = key >> 3
+        if wire_type == WIRE_VARINT:
+            value, pos = read_varint(buf, pos)
+            if pos > end:
+                raise ValueError("varint 越界")
+        elif wire_type == WIRE_LEN:
+            length, pos = read_varint(buf, pos)
+            value = (pos, min(pos + length, end))
+            pos += length
+        elif wire_type == WIRE_FIXED64:
+            value = (pos, min(pos + 8, end))
+            pos += 8
+        elif wire_type == WIRE_FIXED32:
+            value = (pos, min(pos + 4, end))
+            pos += 4
+        elif field in wanted:
+            raise ValueError(f"不支持的 wire type: {wire_type}")
+        else:
+            continue
+        if field in wanted:
+            out[field] = value
+    return out
+
+
+def first_field(buf, pos, end, field_no):
+    """返回 repeated 字段的第一个元素区间 (没有则 None)"""
+    found = None
+    while pos < end:
+        key, pos = read_varint(buf, pos)
+        wire_type = key & 7
+        if wire_type == WIRE_VARINT:
+            _, pos = read_varint(buf, pos)
+        elif wire_type == WIRE_LEN:
+            length, pos = read_varint(buf, pos)
+            if found is None and key >> 3 == field_no:
+                found = (pos, min(pos + length, end))
+            pos += length
+        elif wire_type == WIRE_FIXED64:
+            pos += 8
+        elif wire_type == WIRE_FIXED32:
+            pos += 4
+    return found
+
+
+def _str(buf, span):
+    if span is None:
+        return ""
+    return str(buf[span[0]:span[1]], "utf-8")
+
+
+def _int32(value):
+    value &= 0xFFFFFFFF
+    return (value ^ 0x80000000) - 0x80000000
+
+
+def _int64(value):
+    value &= 0xFFFFFFFFFFFFFFFF
+    return (value ^ 0x8000000000000000) - 0x8000000000000000
+
+
+def _first_url(buf, span):
+    """Image.url_list_list[0]，没有则返回空串 (等价于 get_safe_url)"""
+    if span is None:
+        return ""
+    return _str(buf, first_field(buf, span[0], span[1], IMAGE_URL_LIST))
+
+
+def _fans_club(buf, span):
+    """
+    user.fans_club.data.badge.icons[4].url_list_list[0] 与 data.level
+    与原逻辑一致：取不到图标时等级也记为 0
+    """
+    if span is None:
+        return "", 0
+    club = scan_fields(buf, span[0], span[1], (FANS_CLUB_DATA,))
+    data_span = club.get(FANS_CLUB_DATA)
+    if data_span is None:
+        return "", 0
+    data = scan_fields(buf, data_span[0], data_span[1], _FANS_CLUB_DATA_FIELDS)
+    badge_span = data.get(FANS_CLUB_DATA_BADGE)
+    if badge_span is None:
+        return "", 0
+
+    # map<int32, Image>：逐个 entry 查找 key == 4 (后出现的覆盖先出现的)
+    icon_span = None
+    has_icon = False
+    pos, end = badge_span
+    while pos < end:
+        key, pos = read_varint(buf, pos)
+        wire_type = key & 7
+        if wire_type == WIRE_VARINT:
+            _, pos = read_varint(buf, pos)
+        elif wire_type == WIRE_LEN:
+            length, pos = read_varint(buf, pos)
+            if key >> 3 == BADGE_ICONS:
+                entry = scan_fields(buf, pos, min(pos + length, end), (MAP_KEY, MAP_VALUE))
+                if _int32(entry.get(MAP_KEY, 0)) == FANS_CLUB_ICON_KEY:
+                    has_icon = True
+                    icon_span = entry.get(MAP_VALUE)
+            pos += length
+        elif wire_type == WIRE_FIXED64:
+            pos += 8
+        elif wire_type == WIRE_FIXED32:
+            pos += 4
+
+    if not has_icon or icon_span is None:
+        return "", 0
+    url_span = first_field(buf, icon_span[0], icon_span[1], IMAGE_URL_LIST)
+    if url_span is None:
+        return "", 0
+    return _str(buf, url_span), _int32(data.get(FANS_CLUB_DATA_LEVEL, 0))
+
+
+def _user(buf, span):
+    if span is None:
+        fields = {}
+    else:
+        fields = scan_fields(buf, span[0], span[1], _USER_FIELDS)
+
+    pay_grade = 0
+    pay_grade_icon = ""
+    pay_span = fields.get(USER_PAY_GRADE)
+    if pay_span is not None:
+        grade = scan_fields(buf, pay_span[0], pay_span[1], _PAY_GRADE_FIELDS)
+        pay_grade = _int64(grade.get(PAY_GRADE_LEVEL, 0))
+        pay_grade_icon = _first_url(buf, grade.get(PAY_GRADE_NEW_IM_ICON_WITH_LEVEL))
+
+    fans_club_icon, fans_club_level = _fans_club(buf, fields.get(USER_FANS_CLUB))
+
+    return {
+        'user_id': fields.get(USER_ID, 0),
+        'user_name': _str(buf, fields.get(USER_NICK_NAME)),
+        'gender': fields.get(USER_GENDER, 0),
+        'sec_uid': _str(buf, fields.get(USER_SEC_UID)),
+        'avatar_url': _first_url(buf, fields.get(USER_AVATAR_THUMB)),
+        'pay_grade': pay_grade,
+        'pay_grade_icon': pay_grade_icon,
+        'fans_club_icon': fans_club_icon,
+        'fans_club_level': fans_club_level,
+    }
+
+
+def decode_chat(payload):
+    """ChatMessage wire 投影 -> 扁平字典"""
+    buf = payload
+    fields = scan_fields(buf, 0, len(buf), _CHAT_FIELDS)
+    proj = _user(buf, fields.get(CHAT_USER))
+    proj['content'] = _str(buf, fields.get(CHAT_CONTENT))
+    proj['event_time'] = fields.get(CHAT_EVENT_TIME, 0)
+    return proj
+
+
+def decode_gift(payload):
+    """GiftMessage wire 投影 -> 扁平字典"""
+    buf = payload
+    fields = scan_fields(buf, 0, len(buf), _GIFT_FIELDS)
+    proj = _user(buf, fields.get(GIFT_USER))
+
+    gift_span = fields.get(GIFT_GIFT)
+    gift = scan_fields(buf, gift_span[0], gift_span[1], _GIFT_STRUCT_FIELDS) if gift_span else {}
+
+    proj.update({
+        'gift_icon_url': _first_url(buf, gift.get(GIFT_STRUCT_ICON)),
+        'gift_id': gift.get(GIFT_STRUCT_ID, 0),
+        'gift_name': _str(buf, gift.get(GIFT_STRUCT_NAME)),
+        'diamond_count': gift.get(GIFT_STRUCT_DIAMOND_COUNT, 0),
+        'combo_count': fields.get(GIFT_COMBO_COUNT, 0),
+        'group_count': fields.get(GIFT_GROUP_COUNT, 0),
+        'group_id': fields.get(GIFT_GROUP_ID, 0),
+        'repeat_end': fields.get(GIFT_REPEAT_END, 0),
+        'trace_id': _str(buf, fields.get(GIFT_TRACE_ID)),
+        'send_time': fields.get(GIFT_SEND_TIME, 0),
+    })
+    return proj
+
+
+# --------------------------------------------------------------------------
+# PushFrame 手写编解码：心跳 / ACK 不经过 protobuf 库
+# 字段按字段号升序输出、默认值省略，与 betterproto 的序列化结果逐字节一致
+# --------------------------------------------------------------------------
+
+def encode_varint(value):
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _tag(field_no, wire_type):
+    return encode_varint((field_no << 3) | wire_type)
+
+
+_LOG_ID_TAG = _tag(FRAME_LOG_ID, WIRE_VARINT)
+_ACK_TYPE = _tag(FRAME_PAYLOAD_TYPE, WIRE_LEN) + b"\x03ack"
+_PAYLOAD_TAG = _tag(FRAME_PAYLOAD, WIRE_LEN)
+
+# PushFrame(payload_type='hb')
+HEARTBEAT_FRAME = _tag(FRAME_PAYLOAD_TYPE, WIRE_LEN) + b"\x02hb"
+
+
+def encode_ack(log_id, internal_ext):
+    """PushFrame(log_id=log_id, payload_type='ack', payload=internal_ext)"""
+    parts = []
+    if log_id:
+        parts.append(_LOG_ID_TAG)
+        parts.append(encode_varint(log_id))
+    parts.append(_ACK_TYPE)
+    if internal_ext:
+        parts.append(_PAYLOAD_TAG)
+        parts.append(encode_varint(len(internal_ext)))
+        parts.append(internal_ext)
+    return b"".join(parts)
+
+
+def read_push_frame(data):
+    """只取 PushFrame 的 log_id 与 payload (memoryview，零拷贝)"""
+    buf = memoryview(data)
+    fields = scan_fields(buf, 0, len(buf), (FRAME_LOG_ID, FRAME_PAYLOAD))
+    span = fields.get(FRAME_PAYLOAD)
+    return fields.get(FRAME_LOG_ID, 0), buf[span[0]:span[1]] if span else buf[0:0]
+
+
+# --------------------------------------------------------------------------
+# Response 帧预扫描：只读每条 Message 的 method，未注册的类型不解码
+# --------------------------------------------------------------------------
+
+class ResponseScanner:
+    """
+    代替 Response().parse：扫描 messages_list 时只读取 method，
+    有处理器的类型返回 payload 的 memoryview 切片 (零拷贝)，
+    其余 (Member / Social / RoomStats ...) 只计数后丢弃。
+
+    :param methods: 有处理器的 method 集合
+    """
+
+    def __init__(self, methods):
+        self.methods = frozenset(methods)
+        self.kept = Counter()
+        self.dropped = Counter()
+        self.dropped_bytes = 0
+        self.replayed = 0
+
+    def scan(self, data):
+        """返回 (need_ack, internal_ext 原始字节, [(method, payload), ...])，消息保持帧内顺序"""
+        need_ack, internal_ext, _, buf, spans = self.split(data)
+        return need_ack, internal_ext, self.select(buf, spans)
+
+    def split(self, data):
+        """
+        第一阶段：只扫顶层字段，拿到 ACK 所需的 need_ack / internal_ext，
+        messages_list 只记录区间 (先发 ACK，再用 select 挑消息)；cursor 用于断线续传
+        返回 (need_ack, internal_ext, cursor, buf, spans)
+        """
+        buf = memoryview(data)
+        need_ack = False
+        internal_ext = b""
+        cursor = ""
+        spans = []
+        pos, end = 0, len(buf)
+        while pos < end:
+            key, pos = read_varint(buf, pos)
+            wire_type = key & 7
+            field = key >> 3
+            if wire_type == WIRE_VARINT:
+                value, pos = read_varint(buf, pos)
+                if field == RESPONSE_NEED_ACK:
+                    need_ack = value != 0
+            elif wire_type == WIRE_LEN:
+                length, pos = read_varint(buf, pos)
+                stop = min(pos + length, end)
+                if field == RESPONSE_MESSAGES:
+                    spans.append((pos, stop))
+                elif field == RESPONSE_INTERNAL_EXT:
+                    internal_ext = bytes(buf[pos:stop])
+                elif field == RESPONSE_CURSOR:
+                    cursor = str(buf[pos:stop], 'utf-8', 'ignore')
+                pos += length
+            elif wire_type == WIRE_FIXED64:
+                pos += 8
+            elif wire_type == WIRE_FIXED32:
+                pos += 4
+        return need_ack, internal_ext, cursor, buf, spans
+
+    def select(self, buf, spans, seen=None):
+        """
+        第二阶段：读取每条 Message 的 method，返回有处理器的 [(method, payload), ...]
+        :param seen: 直播间的 msg_id 窗口 (resume_cursor.MsgIdWindow)，重连回放的重复消息在这里丢弃
+        """
+        messages = []
+        for start, stop in spans:
+            self._peek(buf, start, stop, messages, seen)
+        return messages
+
+    def _peek(self, buf, pos, end, messages, seen=None):
+        fields = scan_fields(buf, pos, end, (MESSAGE_METHOD, MESSAGE_PAYLOAD, MESSAGE_MSG_ID))
+        method = _str(buf, fields.get(MESSAGE_METHOD))
+        if method not in self.methods:
+            self.dropped[method] += 1
+            self.dropped_bytes += end - pos
+            return
+        if seen is not None and seen.seen(fields.get(MESSAGE_MSG_ID, 0)):
+            self.replayed += 1
+            return
+        self.kept[method] += 1
+        span = fields.get(MESSAGE_PAYLOAD)
+        messages.append((method, buf[span[0]:span[1]] if span else buf[0:0]))
+
+    def stats(self) -> dict:
+        return {
+            'kept': sum(self.kept.values()),
+            'dropped': sum(self.dropped.values()),
+            'dropped_kb': round(self.dropped_bytes / 1024, 1),
+            'replayed': self.replayed,
+            'top_dropped': dict(self.dropped.most_common(5)),
+        }
+
+
+# --------------------------------------------------------------------------
+# 全量解析路径 (betterproto / upb)：产出与 decode_* 完全相同结构的投影 (作为基准/回退)
+# --------------------------------------------------------------------------
+
+def _project_user(user):
+    pay_grade = 0
+    pay_grade_icon = ""
+    try:
+        if hasattr(user, 'pay_grade'):
+            pay_grade = user.pay_grade.level
+            pay_grade_icon = get_safe_url(user.pay_grade.new_im_icon_with_level)
+    except: pass
+
+    fans_club_icon = ""
+    fans_club_level = 0
+    try:
+        fans_club_icon = user.fans_club.data.badge.icons[4].url_list_list[0]
+        fans_club_level = user.fans_club.data.level
+    except: pass
+
+    return {
+        'user_id': user.id,
+        'user_name': user.nick_name,
+        'gender': getattr(user, 'gender', 0),
+        'sec_uid': getattr(user, 'sec_uid', ''),
+        'avatar_url': get_safe_url(user.avatar_thumb),
+        'pay_grade': pay_grade,
+        'pay_grade_icon': pay_grade_icon,
+        'fans_club_icon': fans_club_icon,
+        'fans_club_level': fans_club_level,
+    }
+
+
+def project_chat(payload, backend=BACKEND_BETTERPROTO):
+    """ChatMessage 全量解析 -> 扁平字典"""
+    message = get_backend(backend).parse('ChatMessage', payload)
+    proj = _project_user(message.user)
+    proj['content'] = message.content
+    proj['event_time'] = getattr(message, 'event_time', 0)
+    return proj
+
+
+def project_gift(payload, backend=BACKEND_BETTERPROTO):
+    """GiftMessage 全量解析 -> 扁平字典"""
+    message = get_backend(backend).parse('GiftMessage', payload)
+    proj = _project_user(message.user)
+    gift = message.gift
+
+    gift_icon_url = ""
+    try:
+        gift_icon_url = message.gift.icon.url_list_list[0]
+    except: pass
+
+    proj.update({
+        'gift_icon_url': gift_icon_url,
+        'gift_id': gift.id,
+        'gift_name': gift.name,
+        'diamond_count': gift.diamond_count,
+        'combo_count': message.combo_count,
+        'group_count': message.group_count,
+        'group_id': getattr(message, 'group_id', ''),
+        'repeat_end': getattr(message, 'repeat_end', 0),
+        'trace_id': getattr(message, 'trace_id', ''),
+        'send_time': getattr(message, 'send_time', 0),
+    })
+    return proj
+
+
+# 每种消息可选的解码器
+DECODERS = {
+    'WebcastChatMessage': {
+        'fast': decode_chat,
+        BACKEND_BETTERPROTO: project_chat,
+        BACKEND_UPB: partial(project_chat, backend=BACKEND_UPB),
+    },
+    'WebcastGiftMessage': {
+        'fast': decode_gift,
+        BACKEND_BETTERPROTO: project_gift,
+        BACKEND_UPB: partial(project_gift, backend=BACKEND_UPB),
+    },
+}
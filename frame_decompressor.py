@@ -0,0 +1,121 @@
+# frame_decompressor.py
+"""
+PushFrame 载荷的 gzip 解压
+
+绝大多数帧只有几 KB，直接在事件循环里解压最快；
+历史回放、PK 结算这类大帧解压要几毫秒，会拖慢同进程所有直播间，
+超过 inline_limit (压缩后字节数) 的帧改到线程池里用 zlib 解压 (zlib 解压期间释放 GIL)。
+
+同时记录解压后大小 / 耗时直方图，并对解压后大小设硬上限 (防止压缩炸弹撑爆内存)。
+配置: DECOMPRESS_INLINE_LIMIT (默认 16KB)、DECOMPRESS_MAX_SIZE (默认 32MB)
+"""
+import asyncio
+import bisect
+import logging
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("Decompressor")
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)          # 字节
+TIME_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50)                          # 毫秒
+
+
+class FrameTooLarge(ValueError):
+    """解压后超过大小上限"""
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {label: count for label, count in zip(labels, self.counts) if count}
+
+
+def inflate(data, max_size):
+    """解压单个 gzip 成员，超过 max_size 抛 FrameTooLarge；返回 (数据, 耗时秒)"""
+    start = time.perf_counter()
+    d = zlib.decompressobj(GZIP_WBITS)
+    out = d.decompress(data, max_size)
+    if d.unconsumed_tail or (len(out) >= max_size and not d.eof):
+        raise FrameTooLarge(f"解压后超过 {max_size} 字节")
+    if not d.eof:
+        raise EOFError("gzip 数据不完整")
+    return out, time.perf_counter() - start
+
+
+class FrameDecompressor:
+    """
+    :param inline_limit: 压缩后不超过该字节数的帧在事件循环内解压
+    :param max_size: 解压后大小上限
+    :param max_workers: 线程池大小
+    """
+
+    def __init__(self, inline_limit=None, max_size=None, max_workers=2):
+        self.inline_limit = inline_limit or int(os.environ.get('DECOMPRESS_INLINE_LIMIT', 16 * 1024))
+        self.max_size = max_size or int(os.environ.get('DECOMPRESS_MAX_SIZE', 32 * 1024 * 1024))
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inflate")
+
+        # --- 统计 ---
+        self.inline = 0
+        self.offloaded = 0
+        self.rejected = 0
+        self.size_hist = Histogram(SIZE_BUCKETS)
+        self.time_hist = Histogram(TIME_BUCKETS_MS)
+
+    async def decompress(self, data):
+        try:
+            if len(data) <= self.inline_limit:
+                self.inline += 1
+                out, elapsed = inflate(data, self.max_size)
+            else:
+                self.offloaded += 1
+                loop = asyncio.get_running_loop()
+                out, elapsed = await loop.run_in_executor(self.executor, inflate, data, self.max_size)
+        except FrameTooLarge as e:
+            self.rejected += 1
+            logger.warning(f"⚠️ 丢弃超大帧: {e}")
+            raise
+        self.size_hist.add(len(out))
+        self.time_hist.add(elapsed * 1000)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            'inline': self.inline,
+            'offloaded': self.offloaded,
+            'rejected': self.rejected,
+            'size': self.size_hist.snapshot(),
+            'time_ms': self.time_hist.snapshot(),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+# --- 进程级单例 ---
+_decompressor = None
+
+
+def get_decompressor() -> FrameDecompressor:
+    global _decompressor
+    if _decompressor is None:
+        _decompressor = FrameDecompressor()
+    return _decompressor
+
+
+def close_decompressor():
+    global _decompressor
+    if _decompressor is not None:
+        _decompressor.close()
+        _decompressor = None
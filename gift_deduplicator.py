@@ -49,72 +49,117 @@ class AsyncGiftDeduplicator:
         group_id = data.get('group_id', '0')
         return f"{uid}_{gid}_{group_id}"
 
-    async def _is_duplicate(self, trace_id, combo, repeat_end):
+    async def _find_duplicates(self, gifts):
         """
         混合去重逻辑：本地缓存 -> Redis
+        整批的 SET NX 通过一个 pipeline 发出，返回重复项的下标集合
         """
-        fingerprint = f"{trace_id}_{combo}_{repeat_end}"
-        
-        # 1. L1 本地快速检查 (内存级速度)
-        if fingerprint in self.local_history:
-            return True
-            
+        duplicates = set()
+        pending = []  # (下标, fingerprint)
+        for i, gift_data in enumerate(gifts):
+            trace_id = gift_data.get('trace_id', '')
+            # 如果 trace_id 为空，无法去重，只能放行
+            if not trace_id:
+                continue
+            fingerprint = f"{trace_id}_{gift_data.get('combo_count', 1)}_{gift_data.get('repeat_end', 0)}"
+            # 1. L1 本地快速检查 (内存级速度)
+            if fingerprint in self.local_history:
+                duplicates.add(i)
+            else:
+                pending.append((i, fingerprint))
+
+        if not pending:
+            return duplicates
+
         # 2. L2 Redis 权威检查
-        # key 格式: gift_dedup:{trace_id}_{combo}_{repeat_end}
-        redis_key = f"dedup:gift:{fingerprint}"
-        redis_client = get_redis()  # 获取全局 Redis 客户端
-        
+        # key 格式: dedup:gift:{trace_id}_{combo}_{repeat_end}
         try:
-            # SET key value NX EX 600
-            # NX: 只有键不存在时才设置 (原子操作)
-            # EX: 10分钟后过期 (自动释放 Redis 内存)
-            is_new = await redis_client.set(redis_key, 1, nx=True, ex=600)
-            
+            pipe = get_redis().pipeline(transaction=False)
+            for _, fingerprint in pending:
+                # SET key value NX EX 600
+                # NX: 只有键不存在时才设置 (原子操作)
+                # EX: 10分钟后过期 (自动释放 Redis 内存)
+                pipe.set(f"dedup:gift:{fingerprint}", 1, nx=True, ex=600)
+            results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"⚠️ Redis 连接异常，降级通过: {e}")
+            return duplicates # 异常时为了不丢数据，默认不过滤
+
+        for (i, fingerprint), is_new in zip(pending, results):
             if not is_new:
                 # Redis 返回 None/False，说明 Key 已存在 -> 是重复包
                 # 顺便写入本地缓存，拦截后续的快速重试
+                duplicates.add(i)
                 self.local_history[fingerprint] = True
                 if len(self.local_history) > self.LOCAL_HISTORY_SIZE:
                     self.local_history.popitem(last=False)
-                return True
-                
-            # 是新包
-            return False
-            
-        except Exception as e:
-            logger.error(f"⚠️ Redis 连接异常，降级通过: {e}")
-            return False # 异常时为了不丢数据，默认不过滤
+        return duplicates
 
     async def process_gift(self, gift_data):
-        trace_id = gift_data.get('trace_id', '')
-        repeat_end = gift_data.get('repeat_end', 0)
-        combo = gift_data.get('combo_count', 1)
-        gift_name = gift_data.get('gift_name', '')
-        gift_id = str(gift_data.get('gift_id', ''))
-        room_id = gift_data.get('room_id')
-        
-        diamond_count = gift_data.get('diamond_count', 0)
-        group_count = gift_data.get('group_count', 1)
+        await self.process_gifts([gift_data])
 
+    async def process_gifts(self, gifts):
+        """
+        批量入口 (一帧内的礼物)：
+        灯牌增量按房间合并、去重走一次 Redis pipeline、小礼物一次批量写入
+        """
         # --- 1. 特殊礼物：粉丝团灯牌 (不过滤，直接统计) ---
-        if gift_id == "685" or "灯牌" in gift_name:
-            if self.db:
+        fans_inc = {}
+        candidates = []
+        for gift_data in gifts:
+            gift_name = gift_data.get('gift_name', '')
+            gift_id = str(gift_data.get('gift_id', ''))
+            if gift_id == "685" or "灯牌" in gift_name:
                 # 【修复】构造增量数据，同时增加灯牌数和钻石数
-                inc_data = {"fans_ticket_count": 1}
-                
+                inc_data = fans_inc.setdefault(gift_data.get('room_id'), {"fans_ticket_count": 0})
+                inc_data["fans_ticket_count"] += 1
                 # 如果灯牌有价值（通常是1钻），也加上
+                diamond_count = gift_data.get('diamond_count', 0)
                 if diamond_count > 0:
-                    inc_data["total_diamond_count"] = diamond_count
-                
-                await self.db.increment_room_stats(room_id, inc_data)
-            return  # 继续保持 return，不存入 live_gifts 集合
+                    inc_data["total_diamond_count"] = inc_data.get("total_diamond_count", 0) + diamond_count
+                continue  # 不存入 live_gifts 集合
+            candidates.append(gift_data)
+
+        if self.db:
+            # 灯牌增量记入内存，由 room_stats 定时合并写回
+            for room_id, inc_data in fans_inc.items():
+                self.db.room_stats.incr(room_id, inc_data)
+
+        if not candidates:
+            return
 
         # --- 2. Redis 去重检查 ---
-        # 如果 trace_id 为空，无法去重，只能放行
-        if trace_id and await self._is_duplicate(trace_id, combo, repeat_end):
-            return 
+        duplicates = await self._find_duplicates(candidates)
+
+        small_gifts = []
+        for i, gift_data in enumerate(candidates):
+            if i in duplicates:
+                continue
+            repeat_end = gift_data.get('repeat_end', 0)
+            combo = gift_data.get('combo_count', 1)
+            group_count = gift_data.get('group_count', 1)
+            diamond_count = self._correct_price(gift_data)
+
+            # --- 策略B: 小礼物直接写入 (<60钻) ---
+            if diamond_count < 60:
+                if repeat_end == 0:
+                    continue
+                total = diamond_count * group_count * int(combo)
+                gift_data['total_diamond_count'] = total
+                if int(combo) > 0:
+                    small_gifts.append(gift_data)
+                continue
 
-        # --- 3. 价格修正逻辑 ---
+            # --- 策略C: 大礼物缓冲聚合 (>=60钻) ---
+            await self._buffer_large_gift(gift_data, diamond_count)
+
+        if small_gifts and self.db:
+            await self.db.insert_gifts(small_gifts)
+
+    def _correct_price(self, gift_data):
+        """价格修正逻辑，返回修正后的单价"""
+        gift_name = gift_data.get('gift_name', '')
+        diamond_count = gift_data.get('diamond_count', 0)
         if "钻石" in gift_name and gift_name in self.DIAMOND_OVERRIDES:
             corrected_price = self.DIAMOND_OVERRIDES[gift_name]
             diamond_count = corrected_price
@@ -125,20 +170,14 @@ class AsyncGiftDeduplicator:
                 corrected_price = 1500
                 diamond_count = corrected_price     # 更新局部变量，确保后续策略B/C生效
                 gift_data['diamond_count'] = corrected_price # 更新写入DB的数据
-        # --- 策略B: 小礼物直接写入 (<60钻) ---
-        if diamond_count < 60:
-            if repeat_end == 0:
-                return 
-            else:
-                total = diamond_count * group_count * int(combo)
-                gift_data['total_diamond_count'] = total
-                if int(combo) > 0 and self.db:
-                    await self.db.insert_gift(gift_data)
-                return
+        return diamond_count
 
-        # --- 策略C: 大礼物缓冲聚合 (>=60钻) ---
+    async def _buffer_large_gift(self, gift_data, diamond_count):
         # 这部分逻辑保持在内存中，因为是高频的 update 操作，
         # 如果把聚合逻辑也放到 Redis，网络 RTT 会成为瓶颈。
+        repeat_end = gift_data.get('repeat_end', 0)
+        combo = gift_data.get('combo_count', 1)
+        group_count = gift_data.get('group_count', 1)
         key = self._get_unique_key(gift_data)
         current_time = time.time()
 
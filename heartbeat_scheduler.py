@@ -0,0 +1,188 @@
+# heartbeat_scheduler.py
+"""
+进程级心跳调度器 (时间轮)
+
+每个 fetcher 各起一个心跳协程、各自 sleep 10 秒时，几百个直播间就是几百个随机触发的定时器。
+现在所有 WebSocket 注册到同一个时间轮：一个周期 (interval) 切成 slots 个槽，
+每个连接按负载分到一个槽，轮子每 tick 转一格，只给当前槽里的连接发送共享的预编码心跳帧。
+
+- 死连接检测: 发送失败 / 超时，或超过 dead_after 秒没收到任何数据，直接关闭连接 (由重连逻辑接管)
+- 每个周期顺带调用连接的 on_beat 回调 (续期租约、保存续传断点)
+- 统计心跳滞后 (tick 实际触发时间 - 计划时间)
+
+配置: HEARTBEAT_INTERVAL (默认 10s)、HEARTBEAT_SLOTS (默认 20)、HEARTBEAT_DEAD_AFTER (默认 30s)
+"""
+import asyncio
+import logging
+import os
+import time
+
+from fast_decoder import HEARTBEAT_FRAME
+
+logger = logging.getLogger("Heartbeat")
+
+SEND_TIMEOUT = 5
+
+
+class HeartbeatEntry:
+    """一个已注册的连接"""
+
+    def __init__(self, ws, name, on_beat=None):
+        self.ws = ws
+        self.name = name
+        self.on_beat = on_beat          # async def on_beat(ws)，每个周期调用一次
+        self.last_seen = time.monotonic()
+        self.slot = None
+
+    def touch(self):
+        """收到数据时调用 (只记录时间戳)"""
+        self.last_seen = time.monotonic()
+
+
+class HeartbeatScheduler:
+    """
+    :param interval: 心跳周期 (秒)
+    :param slots: 时间轮槽数，tick = interval / slots
+    :param dead_after: 超过该秒数没有收到数据即判定连接已死
+    """
+
+    def __init__(self, interval=None, slots=None, dead_after=None):
+        self.interval = interval or float(os.environ.get('HEARTBEAT_INTERVAL', 10))
+        self.slots = slots or int(os.environ.get('HEARTBEAT_SLOTS', 20))
+        self.dead_after = dead_after or float(os.environ.get('HEARTBEAT_DEAD_AFTER', 30))
+        self.tick = self.interval / self.slots
+
+        self.wheel = [set() for _ in range(self.slots)]
+        self.cursor = 0
+        self.running = False
+        self.task = None
+        self._inflight = set()
+
+        # --- 统计 ---
+        self.sent = 0
+        self.failed = 0
+        self.dead = 0
+        self.ticks = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_sum = 0.0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.task = asyncio.create_task(self._run())
+        logger.info(f"✅ [Heartbeat] 时间轮启动 (周期 {self.interval}s, {self.slots} 槽)")
+
+    def register(self, ws, name, on_beat=None) -> HeartbeatEntry:
+        """注册连接，分到当前最空的槽 (同一槽内的连接在同一 tick 发送)"""
+        self.start()
+        entry = HeartbeatEntry(ws, name, on_beat)
+        entry.slot = min(range(self.slots), key=lambda i: len(self.wheel[i]))
+        self.wheel[entry.slot].add(entry)
+        return entry
+
+    def unregister(self, entry: HeartbeatEntry):
+        if entry is not None and entry.slot is not None:
+            self.wheel[entry.slot].discard(entry)
+            entry.slot = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while self.running:
+            next_tick += self.tick
+            try:
+                await asyncio.sleep(max(0, next_tick - loop.time()))
+            except asyncio.CancelledError:
+                break
+            lag = max(0.0, loop.time() - next_tick)
+            self.ticks += 1
+            self.last_lag = lag
+            self._lag_sum += lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+            bucket = self.wheel[self.cursor]
+            self.cursor = (self.cursor + 1) % self.slots
+            if bucket:
+                # 槽内发送放到独立任务里，单个慢连接不拖慢时间轮
+                task = asyncio.create_task(self._beat_slot(list(bucket)))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+    async def _beat_slot(self, entries):
+        await asyncio.gather(*(self._beat(entry) for entry in entries), return_exceptions=True)
+
+    async def _beat(self, entry: HeartbeatEntry):
+        ws = entry.ws
+        if ws.closed:
+            self.unregister(entry)
+            return
+        if time.monotonic() - entry.last_seen > self.dead_after:
+            self.dead += 1
+            logger.warning(f"💀 [Heartbeat] {entry.name} 已 {self.dead_after:.0f}s 无数据，关闭连接")
+            await self._kill(entry)
+            return
+        try:
+            await asyncio.wait_for(ws.send_bytes(HEARTBEAT_FRAME), timeout=SEND_TIMEOUT)
+            self.sent += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"💀 [Heartbeat] {entry.name} 心跳发送失败 ({e!r})，关闭连接")
+            await self._kill(entry)
+            return
+        if entry.on_beat:
+            try:
+                await entry.on_beat(ws)
+            except Exception as e:
+                logger.error(f"❌ [Heartbeat] {entry.name} 心跳回调异常: {e}")
+
+    async def _kill(self, entry: HeartbeatEntry):
+        self.unregister(entry)
+        try:
+            await entry.ws.close()
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            'sockets': sum(len(bucket) for bucket in self.wheel),
+            'max_slot': max(len(bucket) for bucket in self.wheel),
+            'sent': self.sent,
+            'failed': self.failed,
+            'dead': self.dead,
+            'lag_ms': round(self.last_lag * 1000, 1),
+            'avg_lag_ms': round(self._lag_sum * 1000 / max(1, self.ticks), 1),
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+        }
+
+    async def stop(self):
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._inflight):
+            task.cancel()
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+
+# --- 进程级单例 ---
+_scheduler = None
+
+
+def get_heartbeat_scheduler() -> HeartbeatScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = HeartbeatScheduler()
+    return _scheduler
+
+
+async def close_heartbeat_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
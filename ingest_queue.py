@@ -0,0 +1,172 @@
+# ingest_queue.py
+"""
+直播间入站队列：把 WebSocket 读取与消息处理解耦
+
+读取协程只做 解压 -> ACK -> 入队，处理协程从队列取帧交给 MessageHandler。
+ACK 发送延迟 (收到帧到 ACK 写出) 也记录在这里，与队列指标一起按直播间输出。
+Mongo / Redis 变慢时只会让队列变深，不会拖慢 ACK 导致连接被服务端断开。
+
+队列满时的策略 (环境变量 INGEST_OVERFLOW)：
+    block     : 读取协程等待队列腾出空间 (不丢数据，默认)
+    drop_chat : 丢弃新帧中的弹幕，剩余消息 (礼物/下播信号等) 不等待、直接入队
+    sample    : 新帧中的弹幕每 INGEST_SAMPLE_EVERY 条保留 1 条，其余同 drop_chat
+drop_chat / sample 下读取协程永远不会挂起：削减后的帧允许超出容量入队 (保持帧顺序)，
+超出容量 2 倍时整帧丢弃，防止处理协程卡死时内存无限增长。
+队列容量: INGEST_QUEUE_SIZE (按帧计，默认 500)
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+
+logger = logging.getLogger("IngestQueue")
+
+POLICY_BLOCK = 'block'
+POLICY_DROP_CHAT = 'drop_chat'
+POLICY_SAMPLE = 'sample'
+POLICIES = (POLICY_BLOCK, POLICY_DROP_CHAT, POLICY_SAMPLE)
+
+CHAT_METHOD = 'WebcastChatMessage'
+
+
+class IngestQueue:
+    """
+    :param name: 直播间标识 (用于统计)
+    :param maxsize: 队列容量 (帧)
+    :param policy: 队列满时的策略 (见模块说明)
+    :param sample_every: sample 策略下弹幕的保留间隔
+    """
+
+    def __init__(self, name, maxsize=None, policy=None, sample_every=None):
+        self.name = name
+        self.maxsize = maxsize or int(os.environ.get('INGEST_QUEUE_SIZE', 500))
+        self.policy = policy or os.environ.get('INGEST_OVERFLOW', POLICY_BLOCK)
+        if self.policy not in POLICIES:
+            logger.warning(f"⚠️ 未知的溢出策略 {self.policy}，使用 {POLICY_BLOCK}")
+            self.policy = POLICY_BLOCK
+        self.sample_every = max(1, sample_every or int(os.environ.get('INGEST_SAMPLE_EVERY', 10)))
+
+        # 元素: (入队时间, [(method, payload), ...])
+        # 非 block 策略自行控制容量 (put_nowait)，底层队列不设上限
+        self._queue = asyncio.Queue(maxsize=self.maxsize if self.policy == POLICY_BLOCK else 0)
+        self.hard_limit = self.maxsize * 2
+        self._sample_counter = 0
+
+        # --- 统计 ---
+        self.enqueued = 0
+        self.processed = 0
+        self.max_depth = 0
+        self.blocked = 0             # 入队时因队列满而等待的次数 (仅 block 策略)
+        self.dropped = Counter()     # method -> 丢弃条数
+        self.last_lag = 0.0          # 最近一帧从入队到开始处理的延迟 (秒)
+        self.max_lag = 0.0
+        self._lag_sum = 0.0
+        self._lag_count = 0
+        # ACK 延迟：收到帧 -> ACK 发送完成
+        self.acks = 0
+        self.last_ack = 0.0
+        self.max_ack = 0.0
+        self._ack_sum = 0.0
+
+    def _shed(self, messages):
+        """队列满时按策略削减弹幕"""
+        kept = []
+        for method, payload in messages:
+            if method == CHAT_METHOD:
+                if self.policy == POLICY_SAMPLE:
+                    self._sample_counter += 1
+                    if self._sample_counter % self.sample_every == 0:
+                        kept.append((method, payload))
+                        continue
+                self.dropped[method] += 1
+                continue
+            kept.append((method, payload))
+        return kept
+
+    async def put(self, messages):
+        """入队一帧；只有 block 策略在队列满时会挂起"""
+        if self.policy == POLICY_BLOCK:
+            if self._queue.full():
+                self.blocked += 1
+            await self._queue.put((time.monotonic(), messages))
+        else:
+            depth = self._queue.qsize()
+            if depth >= self.maxsize:
+                messages = self._shed(messages)
+                if depth >= self.hard_limit:
+                    for method, _ in messages:
+                        self.dropped[method] += 1
+                    return
+                if not messages:
+                    return
+            self._queue.put_nowait((time.monotonic(), messages))
+        self.enqueued += 1
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def get(self):
+        """取出一帧，同时记录排队延迟"""
+        enqueued_at, messages = await self._queue.get()
+        lag = time.monotonic() - enqueued_at
+        self.last_lag = lag
+        self._lag_sum += lag
+        self._lag_count += 1
+        if lag > self.max_lag:
+            self.max_lag = lag
+        return messages
+
+    def record_ack(self, latency):
+        """记录一次 ACK 发送延迟 (秒)"""
+        self.acks += 1
+        self.last_ack = latency
+        self._ack_sum += latency
+        if latency > self.max_ack:
+            self.max_ack = latency
+
+    def task_done(self):
+        self.processed += 1
+        self._queue.task_done()
+
+    async def join(self):
+        """等待已入队的帧全部处理完"""
+        await self._queue.join()
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        return {
+            'depth': self._queue.qsize(),
+            'max_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'processed': self.processed,
+            'blocked': self.blocked,
+            'dropped': dict(self.dropped),
+            'lag_ms': round(self.last_lag * 1000, 1),
+            'avg_lag_ms': round(self._lag_sum * 1000 / max(1, self._lag_count), 1),
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'acks': self.acks,
+            'ack_ms': round(self.last_ack * 1000, 2),
+            'avg_ack_ms': round(self._ack_sum * 1000 / max(1, self.acks), 2),
+            'max_ack_ms': round(self.max_ack * 1000, 2),
+        }
+
+
+# --- 进程级登记表：各直播间的队列统计 ---
+_queues = {}
+
+
+def register_queue(queue: IngestQueue):
+    _queues[queue.name] = queue
+
+
+def unregister_queue(queue: IngestQueue):
+    if _queues.get(queue.name) is queue:
+        del _queues[queue.name]
+
+
+def get_ingest_stats() -> dict:
+    """{直播间: 队列统计}"""
+    return {name: queue.stats() for name, queue in _queues.items()}
@@ -1,5 +1,4 @@
 # liveMan.py
-import gzip
 import logging
 import asyncio
 import aiohttp
@@ -9,24 +8,29 @@ import time
 from datetime import datetime, timedelta
 from http.cookies import SimpleCookie
 
-from protobuf.douyin import *
 from liveMan_utils import (
-    generateSignature, 
-    generateMsToken, 
     get_safe_url, 
-    get_ac_signature, 
-    execute_js
+    async_generateSignature,
+    async_get_a_bogus
 )
+from token_pool import get_token_pool
 
 from db import AsyncMongoDBHandler
 from gift_deduplicator import AsyncGiftDeduplicator
-from message_handler import MessageHandler  # 【新增导入】
+from message_handler import MessageHandler, get_response_scanner  # 【新增导入】
+from ingest_queue import IngestQueue, register_queue, unregister_queue
+from fast_decoder import encode_ack, read_push_frame
+from frame_decompressor import get_decompressor
+from reconnect import END_STREAM, END_LEASE_LOST, END_NO_ROOM
+from resume_cursor import get_resume_store
+from heartbeat_scheduler import get_heartbeat_scheduler
+from connection_manager import get_connections
 
 logger = logging.getLogger("LiveMan")
 
 class AsyncDouyinLiveWebFetcher:
     
-    def __init__(self, live_id, db, gift_processor, start_follower_count=0, abogus_file='a_bogus.js', initial_state=None, session=None):
+    def __init__(self, live_id, db, gift_processor, start_follower_count=0, abogus_file='a_bogus.js', initial_state=None, session=None, lease=None, on_connected=None):
 
         self.live_id = live_id
         self.start_follower_count = start_follower_count
@@ -34,6 +38,14 @@ class AsyncDouyinLiveWebFetcher:
         self.db = db
         self.gift_processor = gift_processor
         self.handler = None # 【新增】消息处理器实例
+        self.scanner = get_response_scanner() # Response 预扫描 (只解码有处理器的消息)
+        self.ingest = None # 入站队列：读取协程只负责 解压/ACK/入队
+        self.decompressor = get_decompressor() # 大帧放到线程池解压
+        self.lease = lease # 多节点模式下的直播间租约 (room_lease.RoomLease)，在心跳中续期
+        self.on_connected = on_connected # WebSocket 连上时的回调 (main.py 用于统计重连耗时)
+        self.end_reason = None # 结束原因 (reconnect.END_*)，None 表示连接意外断开
+        self.resume = None # 断线续传状态 (cursor / internal_ext / msg_id 窗口)，跨重连保留
+        self.heartbeat = None # 在进程级心跳时间轮中的登记项
         self.initial_state = initial_state       
         
         self.session = None 
@@ -75,24 +87,18 @@ class AsyncDouyinLiveWebFetcher:
             logger.error(f"【X】获取游客 ttwid 失败: {err}")
         return None
 
-    def get_ac_nonce(self):
-        import random
-        chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-        return ''.join(random.choice(chars) for _ in range(21))
-    
-    def get_a_bogus(self, url_params: dict):
+    async def get_a_bogus(self, url_params: dict):
+        # 所有 fetcher 共享常驻 a_bogus 引擎 (或签名服务)，不再每次重新编译 a_bogus.js
         url = urllib.parse.urlencode(url_params)
-        ctx = execute_js(self.abogus_file)
-        return ctx.call("get_ab", url, self.user_agent)
+        return await async_get_a_bogus(url, self.user_agent, self.abogus_file)
 
     async def get_room_status(self):
         try:
             ttwid = await self.get_ttwid()
             if not ttwid: pass # 尝试无ttwid继续
 
-            msToken = generateMsToken()
-            nonce = self.get_ac_nonce()
-            signature = get_ac_signature(self.live_url[8:], nonce, self.user_agent)
+            # 从预生成池直接取现成的 msToken / nonce / __ac_signature
+            msToken, nonce, signature = get_token_pool(self.live_url[8:], self.user_agent).get()
 
             base_url = "https://live.douyin.com/webcast/room/web/enter/"
             params = {
@@ -119,7 +125,7 @@ class AsyncDouyinLiveWebFetcher:
             }
 
             try:
-                params['a_bogus'] = self.get_a_bogus(params)
+                params['a_bogus'] = await self.get_a_bogus(params)
             except Exception as e:
                 logger.warning(f"⚠️ a_bogus 计算失败: {e}")
 
@@ -224,6 +230,7 @@ class AsyncDouyinLiveWebFetcher:
                     
                 if not room_info:
                     logger.error("❌ 无法获取房间信息，放弃录制")
+                    self.end_reason = END_NO_ROOM
                     return
                 # get_room_status 内部已经设置了 self.current_room_id
 
@@ -253,21 +260,46 @@ class AsyncDouyinLiveWebFetcher:
         if self._own_session and self.session:
             await self.session.close()
 
-    async def _sendHeartbeat(self, ws):
-        while self.running and not ws.closed:
-            try:
-                heartbeat = PushFrame(payload_type='hb').SerializeToString()
-                await ws.send_bytes(heartbeat) 
-                await asyncio.sleep(10)
-            except asyncio.CancelledError:  # <--- 新增：收到停止信号时直接退出循环
-                break
-            except Exception: 
-                break
+    async def _on_heartbeat(self, ws):
+        """心跳时间轮每个周期回调 (心跳帧由调度器统一发送)：保存续传断点、续期租约"""
+        if not self.running:
+            return
+        await self._save_resume()
+        if self.lease and not await self._renew_lease():
+            logger.warning(f"⚠️ 直播间租约已被其他节点接管，停止录制: {self.live_id}")
+            self.end_reason = END_LEASE_LOST
+            self.running = False
+            await ws.close()
 
-    async def _connectWebSocket(self):
-        ttwid = await self.get_ttwid() or ""
-        
-        wss = ("wss://webcast100-ws-web-lq.douyin.com/webcast/im/push/v2/?app_name=douyin_web"
+    async def _renew_lease(self):
+        """续期租约；Redis 异常时不判定丢失 (避免 Redis 抖动导致全部断开)"""
+        try:
+            return await self.lease.renew()
+        except Exception as e:
+            logger.error(f"❌ 租约续期失败: {e}")
+            return True
+
+    async def _save_resume(self):
+        """续传状态写入 Redis；失败不影响录制"""
+        try:
+            await get_resume_store().save(self.resume)
+        except Exception as e:
+            logger.error(f"❌ 保存续传状态失败: {e}")
+
+    def _build_wss_url(self):
+        """有未过期的续传状态时从断点 cursor / internal_ext 继续，否则按当前时间冷启动"""
+        if self.resume.resumable(get_resume_store().ttl):
+            cursor = self.resume.cursor
+            internal_ext = self.resume.internal_ext
+            logger.info(f"⏩ [续传] 从断点恢复: {self.live_id} cursor={cursor}")
+        else:
+            now_ms = int(time.time() * 1000)
+            cursor = f"d-1_u-1_fh-7392091211001140287_t-{now_ms}_r-1"
+            internal_ext = (f"internal_src:dim|wss_push_room_id:{self.current_room_id}|wss_push_did:7319483754668557238"
+                            f"|first_req_ms:{now_ms}|fetch_time:{now_ms}|seq:1|wss_info:0-{now_ms}-0-0|"
+                            f"wrds_v:7392094459690748497")
+
+        return ("wss://webcast100-ws-web-lq.douyin.com/webcast/im/push/v2/?app_name=douyin_web"
                "&version_code=180800&webcast_sdk_version=1.0.14-beta.0"
                "&update_version_code=1.0.14-beta.0&compress=gzip&device_platform=web&cookie_enabled=true"
                "&screen_width=1536&screen_height=864&browser_language=zh-CN&browser_platform=Win32"
@@ -275,15 +307,19 @@ class AsyncDouyinLiveWebFetcher:
                "&browser_version=5.0%20(Windows%20NT%2010.0;%20Win64;%20x64)%20AppleWebKit/537.36%20(KHTML,"
                "%20like%20Gecko)%20Chrome/126.0.0.0%20Safari/537.36"
                "&browser_online=true&tz_name=Asia/Shanghai"
-               f"&cursor=d-1_u-1_fh-7392091211001140287_t-1721106114633_r-1"
-               f"&internal_ext=internal_src:dim|wss_push_room_id:{self.current_room_id}|wss_push_did:7319483754668557238"
-               f"|first_req_ms:1721106114541|fetch_time:1721106114633|seq:1|wss_info:0-1721106114633-0-0|"
-               f"wrds_v:7392094459690748497"
+               f"&cursor={urllib.parse.quote(cursor, safe=':|-_.')}"
+               f"&internal_ext={urllib.parse.quote(internal_ext, safe=':|-_.')}"
                f"&host=https://live.douyin.com&aid=6383&live_id=1&did_rule=3&endpoint=live_pc&support_wrds=1"
                f"&user_unique_id=7319483754668557238&im_path=/webcast/im/fetch/&identity=audience"
                f"&need_persist_msg_count=15&insert_task_id=&live_reason=&room_id={self.current_room_id}&heartbeatDuration=0")
+
+    async def _connectWebSocket(self):
+        ttwid = await self.get_ttwid() or ""
+        self.resume = await get_resume_store().load(self.live_id, self.current_room_id)
+        wss = self._build_wss_url()
         
-        signature = generateSignature(wss)
+        # 签名在线程池中复用常驻 V8 上下文，不阻塞其他直播间的 socket
+        signature = await async_generateSignature(wss)
         wss += f"&signature={signature}"
         
         headers = {
@@ -291,18 +327,31 @@ class AsyncDouyinLiveWebFetcher:
             'User-Agent': self.user_agent,
         }
 
+        # 使用共享连接池时 WS 走独立的长连接池，不占用 HTTP 短请求的连接
+        conns = get_connections()
+        ws_session = conns.ws if conns and not self._own_session else self.session
+
+        worker_task = None
         try:
             # 【重点 1】捕获连接建立阶段的异常（如超时、DNS错误）
-            async with self.session.ws_connect(wss, headers=headers, timeout=15) as ws:
+            async with ws_session.ws_connect(wss, headers=headers, timeout=15) as ws:
                 self.ws = ws
                 logger.info("✅ WebSocket 连接成功")
+                if self.on_connected:
+                    self.on_connected()
                 
-                # 启动心跳任务
-                hb_task = asyncio.create_task(self._sendHeartbeat(ws))
+                # 交给进程级心跳时间轮 (发送心跳 + 死连接检测)
+                self.heartbeat = get_heartbeat_scheduler().register(ws, self.live_id, on_beat=self._on_heartbeat)
+
+                # 启动处理协程：慢的 DB/Redis 写入只会让队列变深，不会阻塞读取和 ACK
+                self.ingest = IngestQueue(self.live_id)
+                register_queue(self.ingest)
+                worker_task = asyncio.create_task(self._process_loop(ws))
                 
                 try:
                     # 【重点 2】消息循环
                     async for msg in ws:
+                        self.heartbeat.touch()
                         if msg.type == aiohttp.WSMsgType.BINARY:
                             await self._handle_binary_message(msg.data, ws)
                         elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
@@ -321,38 +370,67 @@ class AsyncDouyinLiveWebFetcher:
             # 【重点 3】兜底清理：无论是因为 return、break 还是 Exception 退出，这里都会执行
             self.running = False # 确保 flag 关闭
             
-            if hb_task:
-                hb_task.cancel() # 停止心跳
-                try:
-                    await hb_task # 等待心跳协程真正结束
-                except asyncio.CancelledError:
-                    pass # 忽略取消异常
+            if self.heartbeat:
+                get_heartbeat_scheduler().unregister(self.heartbeat) # 停止心跳
+                self.heartbeat = None
 
             if self.ws and not self.ws.closed:
                 await self.ws.close() # 确保连接关闭
+
+            # 记下断点，重连时从这里继续
+            await self._save_resume()
+
+            if worker_task:
+                # 处理完已入队的帧再退出，避免丢数据
+                try:
+                    await asyncio.wait_for(self.ingest.join(), timeout=10)
+                except asyncio.TimeoutError:
+                    logger.warning(f"⚠️ 入站队列未处理完即退出: 剩余 {self.ingest.depth()} 帧")
+                worker_task.cancel()
+                try:
+                    await worker_task
+                except asyncio.CancelledError:
+                    pass
+                unregister_queue(self.ingest)
                 
             logger.info(f"👋 [LiveMan] 录制任务结束/退出: {self.live_id}")
 
     async def _handle_binary_message(self, data, ws):
         try:
-            package = PushFrame().parse(data)
-            response = Response().parse(gzip.decompress(package.payload))
+            received = time.perf_counter()
+            log_id, payload = read_push_frame(data)
+            need_ack, internal_ext, cursor, buf, spans = self.scanner.split(await self.decompressor.decompress(payload))
             
-            if response.need_ack:
-                ack = PushFrame(log_id=package.log_id, payload_type='ack',
-                                payload=response.internal_ext.encode('utf-8')).SerializeToString()
-                await ws.send_bytes(ack)
+            # ACK 优先：拿到 log_id / internal_ext 就发，不等消息筛选
+            if need_ack:
+                await ws.send_bytes(encode_ack(log_id, internal_ext))
+                self.ingest.record_ack(time.perf_counter() - received)
+            self.resume.update(cursor, internal_ext)
             
-            for msg in response.messages_list:
-                # 【修改】委托给 Handler 处理
-                if self.handler:
-                    is_ended = await self.handler.handle(msg.method, msg.payload)
-                    if is_ended:
-                        self.running = False
-                        await ws.close()
-                        break
+            # 重连回放的重复消息 (msg_id 已处理过) 在这里丢弃
+            messages = self.scanner.select(buf, spans, self.resume.window)
+            # 【修改】整帧入队，由 _process_loop 交给 Handler 批量处理
+            if self.handler and messages:
+                await self.ingest.put(messages)
         except Exception: 
             pass
+
+    async def _process_loop(self, ws):
+        """处理协程：从入站队列取帧交给 Handler，收到下播信号后丢弃后续帧"""
+        stopped = False
+        while True:
+            messages = await self.ingest.get()
+            try:
+                if not stopped:
+                    stopped = await self.handler.handle_batch(messages)
+                    if stopped:
+                        self.end_reason = END_STREAM
+                        self.running = False
+                        await ws.close()
+            except Exception as e:
+                logger.error(f"❌ 消息处理异常: {e}")
+            finally:
+                self.ingest.task_done()
     async def _lazy_update_room_info(self):
         """后台任务：尝试获取更详细的直播间信息（高清封面、准确标题等）"""
         logger.info(f"⏳ [LiveMan] 启动后台详情同步: {self.live_id}")
@@ -1,14 +1,10 @@
 # liveMan_utils.py
-import codecs
-import hashlib
-import random
-import string
 import subprocess
-import urllib.parse
 from unittest.mock import patch
 from contextlib import contextmanager
 import execjs
-from py_mini_racer import MiniRacer
+from token_pool import generate_ms_token
+from signer import get_signer, get_abogus_engine, get_sign_client, build_sign_md5
 # 假设 ac_signature 在项目目录下，保持原样导入
 from ac_signature import get__ac_signature
 import logging
@@ -31,40 +27,36 @@ def patched_popen_encoding(encoding='utf-8'):
         yield
 
 def generateSignature(wss, script_file='sign.js'):
-    params = ("live_id,aid,version_code,webcast_sdk_version,"
-              "room_id,sub_room_id,sub_channel_id,did_rule,"
-              "user_unique_id,device_platform,device_type,ac,"
-              "identity").split(',')
-    wss_params = urllib.parse.urlparse(wss).query.split('&')
-    wss_maps = {i.split('=')[0]: i.split("=")[-1] for i in wss_params}
-    tpl_params = [f"{i}={wss_maps.get(i, '')}" for i in params]
-    param = ','.join(tpl_params)
-    
-    md5 = hashlib.md5()
-    md5.update(param.encode())
-    md5_param = md5.hexdigest()
-    
-    with codecs.open(script_file, 'r', encoding='utf8') as f:
-        script = f.read()
-    
-    # 注意: MiniRacer 是同步的，如果并发极高可能会轻微阻塞 EventLoop
-    # 但签名生成频率低，通常可以接受。
-    ctx = MiniRacer()
-    ctx.eval(script)
-    try:
-        signature = ctx.call("get_sign", md5_param)
-        return signature
-    except Exception as e:
-        logger.error(f"签名生成失败: {e}")
-        return ""
+    """
+    同步生成 wss 签名 (兼容旧调用)
+    sign.js 的编译与上下文复用由 signer.SignerPool 负责，异步场景请直接使用
+    await async_generateSignature(wss) (配置了 SIGN_SOCKET 时走共享签名服务)，避免阻塞 EventLoop
+    """
+    return get_signer(script_file).sign_sync(build_sign_md5(wss))
+
+async def _remote_or_local(op, args, local):
+    """优先调用签名服务 (SIGN_SOCKET)，不可用时退回进程内签名"""
+    client = get_sign_client()
+    if client and client.available:
+        try:
+            return await client.call(op, *args)
+        except Exception as e:
+            logger.warning(f"⚠️ 签名服务调用失败 [{op}]，退回本地签名: {e}")
+    return await local()
+
+async def async_generateSignature(wss, script_file='sign.js'):
+    """异步生成 wss 签名"""
+    md5_param = build_sign_md5(wss)
+    return await _remote_or_local('get_sign', (md5_param,),
+                                  lambda: get_signer(script_file).sign(md5_param))
+
+async def async_get_a_bogus(params, user_agent, abogus_file='a_bogus.js'):
+    """异步计算 a_bogus (params 为 urlencode 后的查询串)"""
+    return await _remote_or_local('get_ab', (params, user_agent),
+                                  lambda: get_abogus_engine(abogus_file).sign(params, user_agent))
 
 def generateMsToken(length=182):
-    random_str = ''
-    base_str = string.ascii_letters + string.digits + '-_'
-    _len = len(base_str) - 1
-    for _ in range(length):
-        random_str += base_str[random.randint(0, _len)]
-    return random_str
+    return generate_ms_token(length)
 
 def get_safe_url(icon_obj):
     try:
@@ -6,91 +6,66 @@ import sys
 from logging.handlers import RotatingFileHandler
 import aiohttp
 # 导入异步组件
-from db import AsyncMongoDBHandler
+from db import AsyncMongoDBHandler, external_sink
 from gift_deduplicator import AsyncGiftDeduplicator
 from monitor import AsyncDouyinLiveMonitor
-from liveMan import AsyncDouyinLiveWebFetcher
 from redis_client import init_redis, close_redis
-from datetime import datetime,timedelta
-# --- 配置日志 ---
-log_dir = "logs"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)
-
-log_file_path = os.path.join(log_dir, "monitor.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - [%(levelname)s] - [%(name)s]: %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        RotatingFileHandler(
-            filename=log_file_path, 
-            mode='a', 
-            maxBytes=10 * 1024 * 1024, 
-            backupCount=5, 
-            encoding='utf-8', 
-            delay=False
-        )
-    ]
-)
+from signer import get_signer, get_sign_client, close_engines
+from token_pool import close_token_pools
+from frame_decompressor import close_decompressor
+from room_lease import get_lease_manager, close_lease_manager
+from heartbeat_scheduler import close_heartbeat_scheduler
+from connection_manager import ConnectionManager
+from recorder import (recording_tasks, reconcile_rooms, zombie_cleaner, log_runtime_stats,
+                      stop_all_recorders)
+
 logger = logging.getLogger("Main")
 
-# --- 全局任务字典 ---
-# Key: web_rid, Value: asyncio.Task
-recording_tasks = {}
 
-async def settle_room(db, room_id, nickname):
-    """【新增】封装结算逻辑"""
-    if not room_id: return
-    try:
-        status = await db.get_room_live_status(room_id)
-        if status == 4: return
-        logger.info(f"🛑 [智能结算] 判定直播结束，正在结算: {nickname} ({room_id})")
-        await db.set_room_ended(room_id)
-    except Exception as e:
-        logger.error(f"❌ 结算异常: {e}")
-
-async def start_recorder_task(web_rid, nickname, start_follower_count, db, gift_processor, monitor_data=None, session=None):
-    """单个直播间录制任务的包装器"""
-    fetcher = None
-    try:
-        logger.info(f"🚀 [任务启动] {nickname} ({web_rid})")
-        fetcher = AsyncDouyinLiveWebFetcher(
-            live_id=web_rid,
-            db=db,
-            gift_processor=gift_processor,
-            start_follower_count=start_follower_count,
-            initial_state=monitor_data,
-            session=session
-        )
-        await fetcher.start()
-    except asyncio.CancelledError:
-        logger.info(f"🛑 [任务取消] {nickname}")
-    except Exception as e:
-        logger.error(f"💥 [任务异常] {nickname}: {e}")
-    finally:
-        if fetcher: await fetcher.stop()
-        logger.info(f"🏁 [任务结束] {nickname}")
-async def zombie_cleaner(db_handler):
-    """延迟启动的看门狗"""
-    logger.info("🐶 [看门狗] 正在待命，将在 5分钟 后开始首次清理...")
-    await asyncio.sleep(300) # <--- 关键：启动后先睡 5 分钟，给 LiveMan 重连的时间
-    
-    while True:
-        try:
-            # 正常循环，每 60 秒检查一次
-            await db_handler.clear_zombie_rooms(timeout_seconds=180) 
-        except Exception as e:
-            logger.error(f"❌ 看门狗报错: {e}")
-        await asyncio.sleep(60)
+def setup_logging():
+    """配置日志 (只在作为入口运行时调用，导入本模块不会创建日志文件)"""
+    log_dir = "logs"
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir)
+
+    log_file_path = os.path.join(log_dir, "monitor.log")
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - [%(levelname)s] - [%(name)s]: %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            RotatingFileHandler(
+                filename=log_file_path, 
+                mode='a', 
+                maxBytes=10 * 1024 * 1024, 
+                backupCount=5, 
+                encoding='utf-8', 
+                delay=False
+            )
+        ]
+    )
+
 async def main():
     # 1. 初始化数据库
     db = AsyncMongoDBHandler()
     await db.init_indexes()
+    await db.warm_room_cache()
     asyncio.create_task(zombie_cleaner(db))
     # 2. 初始化全局 Redis 连接
     await init_redis("redis://localhost:6379/0")
+    # Redis Stream 缓冲区消费者 (落库)；部署了独立 sink 时本进程只写缓冲区
+    if not external_sink():
+        await db.start_flushers()
+    # 多节点部署 (ROOM_LEASES=1)：加入租约节点列表
+    if get_lease_manager():
+        get_lease_manager().start()
+
+    # 预热签名上下文池 (sign.js 只编译一次)；使用共享签名服务时无需本地预热
+    if get_sign_client():
+        logger.info(f"✍️ 使用共享签名服务: {get_sign_client().socket_path}")
+    else:
+        await get_signer().warmup()
 
     # 3. 初始化礼物去重
     gift_processor = AsyncGiftDeduplicator(db_handler=db)
@@ -114,8 +89,9 @@ async def main():
         return
 
     logger.info(f"✅ 成功加载 {len(cookies)} 个 Cookie，准备启动监控...")    
-    # 【Session 上下文管理器】
-    async with aiohttp.ClientSession(timeout=timeout) as shared_session:
+    # 【Session 上下文管理器】HTTP 短请求与 WebSocket 长连接分池
+    async with ConnectionManager(timeout=timeout) as conns:
+        shared_session = conns.http
         
         # 4. 初始化监控器 (传入 session)
         monitor = AsyncDouyinLiveMonitor(cookies, db, session=shared_session)
@@ -132,87 +108,11 @@ async def main():
                     # 转为字典方便查找: {web_rid: user_info}
                     current_live_map = {u['web_rid']: u for u in live_users}
 
-                    # --- 阶段 A: 清理已结束的任务 (只处理 WS 已经断开的) ---
-                    for web_rid in list(recording_tasks.keys()):
-                        task_info = recording_tasks[web_rid]
-                        task = task_info['task']
-                        old_room_id = task_info['room_id']
-                        nickname = task_info['nickname']
-                        
-                        # 【原则】：Monitor 没权杀任务，只有任务自己结束(done)了，我们才处理
-                        if not task.done():
-                            continue
-
-                        # ====================================================
-                        # 代码运行到这里，说明 WS 已经断开了
-                        # ====================================================
-                        
-                        # 1. 检查异常
-                        if not task.cancelled() and task.exception():
-                            logger.warning(f"💥 [异常断开] {nickname}: {task.exception()}")
-
-                        # 2. 获取 Monitor 的最新情报
-                        latest_info = current_live_map.get(web_rid)
-                        
-                        # 获取数据库里的最终状态
-                        db_status = await db.get_room_live_status(old_room_id)
-
-                        # --- 分支 1: 真正下播 ---
-                        if db_status == 4 or not latest_info:
-                            logger.info(f"👋 [确认下播] 任务自然结束: {nickname}")
-                            await settle_room(db, old_room_id, nickname)
-                            del recording_tasks[web_rid]
-                            continue
-
-                        # --- 分支 2: 换场 (Monitor 显示房间号变了) ---
-                        new_room_id = str(latest_info.get('room_id'))
-                        if new_room_id and new_room_id != old_room_id:
-                            logger.info(f"🔄 [换场] 旧场结束，准备录制新场: {nickname}")
-                            await settle_room(db, old_room_id, nickname)
-                            del recording_tasks[web_rid]
-                            continue
-
-                        # --- 分支 3: 意外断开 (Monitor 显示还在播) ---
-                        logger.warning(f"♻️ [闪断恢复] WS断开但Monitor显示在线，立即重启: {nickname}")
-                        
-                        new_task = asyncio.create_task(
-                            start_recorder_task(
-                                web_rid, nickname, 
-                                latest_info.get('follower_count', 0), 
-                                db, gift_processor, 
-                                monitor_data=latest_info,
-                                session=shared_session
-                            )
-                        )
-                        recording_tasks[web_rid]['task'] = new_task
-
-                    # --- 阶段 B: 检查新增直播 (启动新任务) ---
-                    for web_rid, user_info in current_live_map.items():
-                        
-                        # ✅ 【新增】如果 monitor 没过滤干净，这里坚决不能放行
-                        if not web_rid:
-                            continue
-                        if web_rid not in recording_tasks:
-                            if user_info.get('live_status') == 1:
-                                nickname = user_info.get('nickname')
-                                room_id = str(user_info.get('room_id'))
-                                
-                                task = asyncio.create_task(
-                                    start_recorder_task(
-                                        web_rid, nickname, 
-                                        user_info.get('follower_count', 0), 
-                                        db, gift_processor, 
-                                        monitor_data=user_info,
-                                        session=shared_session
-                                    )
-                                )
-                                recording_tasks[web_rid] = {
-                                    "task": task,
-                                    "room_id": room_id,
-                                    "nickname": nickname
-                                }
+                    await reconcile_rooms(current_live_map, db, gift_processor, shared_session)
 
                     logger.info(f"💓 扫描完成: 在线{len(current_live_map)} | 录制中{len(recording_tasks)}")
+                    log_runtime_stats()
+                    logger.info(f"📦 缓冲区: {db.buffer_stats()}")
 
                 except Exception as e:
                     logger.error(f"❌ 主循环异常: {e}", exc_info=True)
@@ -224,23 +124,20 @@ async def main():
             logger.info("🛑 收到退出信号...")
         finally:
             # 清理工作
-            if recording_tasks:
-                logger.info("正在取消所有录制任务...")
-                for t in recording_tasks.values():
-                    if isinstance(t, dict): t['task'].cancel()
-                    else: t.cancel()
-                
-                # 等待任务取消
-                tasks = [t['task'] for t in recording_tasks.values() if isinstance(t, dict)]
-                if tasks:
-                    await asyncio.gather(*tasks, return_exceptions=True)
+            await stop_all_recorders()
+            await close_lease_manager()
+            await close_heartbeat_scheduler()
 
             await gift_processor.stop()
+            await close_engines()
+            await close_token_pools()
+            close_decompressor()
             await db.close()
             await close_redis()
             logger.info("👋 系统已完全退出")
 
 if __name__ == "__main__":
+    setup_logging()
     # Windows 下 Python 3.8+ 需要设置事件循环策略
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
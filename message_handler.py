@@ -1,23 +1,69 @@
 # message_handler.py
 import time
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from protobuf.douyin import *
 from liveMan_utils import get_safe_url
+from fast_decoder import DECODERS, ResponseScanner
+from proto_backend import get_backend
 
 logger = logging.getLogger("MsgHandler")
 
+# 默认走投影解码器的消息类型 (其余类型用 proto_backend 全量解析)
+FAST_DECODE_METHODS = frozenset(DECODERS.keys())
+
+# handle() 会处理的消息类型，其余类型在 ResponseScanner 里直接丢弃
+HANDLED_METHODS = frozenset((
+    'WebcastChatMessage',
+    'WebcastGiftMessage',
+    'WebcastRoomUserSeqMessage',
+    'WebcastLikeMessage',
+    'WebcastControlMessage',
+    'WebcastLinkMicBattleFinishMethod',
+))
+
+# handle_batch 中按连续段批量写入的消息类型
+BATCHED_METHODS = ('WebcastChatMessage', 'WebcastGiftMessage')
+
+_scanner = None
+
+
+def get_response_scanner() -> ResponseScanner:
+    """进程级单例：所有直播间共用一份丢弃计数"""
+    global _scanner
+    if _scanner is None:
+        _scanner = ResponseScanner(HANDLED_METHODS)
+    return _scanner
+
+
+def collapse_gift_combos(gifts):
+    """
+    同一帧内 trace_id 相同的连击只保留最终状态 (combo 最大，其次 repeat_end=1)
+    位置取该 trace_id 第一次出现处；trace_id 为空的无法判断，原样保留
+    """
+    collapsed = OrderedDict()
+    for i, gift in enumerate(gifts):
+        trace_id = gift.get('trace_id')
+        key = trace_id if trace_id else i
+        current = collapsed.get(key)
+        if current is None or (int(gift['combo_count']), gift['repeat_end']) >= \
+                (int(current['combo_count']), current['repeat_end']):
+            collapsed[key] = gift
+    return list(collapsed.values())
+
+
 class MessageHandler:
-    def __init__(self, live_id, room_id, db, gift_processor):
+    def __init__(self, live_id, room_id, db, gift_processor, fast_decode=None):
         self.live_id = live_id
         self.room_id = room_id
         self.db = db
         self.gift_processor = gift_processor
+        # 可按消息类型选择解码器：在集合内的用 fast_decoder，否则用全量解析后端 (PROTO_BACKEND)
+        self.fast_decode = FAST_DECODE_METHODS if fast_decode is None else frozenset(fast_decode)
+        self.proto = get_backend()
         self.last_seq_state = None       
-        # --- 频率控制状态 ---
-        self.last_like_time = 0
+        # 上一条 RoomUserSeq 的时间 (用于计算观看时长增量)
         self.last_seq_time = 0
-        self.THROTTLE_INTERVAL = 2 # 120秒限制
 
     async def handle(self, method, payload):
         """
@@ -44,153 +90,193 @@ class MessageHandler:
         
         return False
 
-    async def _parse_control(self, payload):
+    async def handle_batch(self, messages):
+        """
+        按帧批量处理 (ResponseScanner 输出的 [(method, payload), ...])，严格保持帧内顺序
+        - 连续的弹幕 / 礼物攒成一段，遇到其他类型的消息前先写出，每段每个 sink 只写一次
+        - 同一段内同 trace_id 的礼物连击先合并 (collapse_gift_combos)
+        - 点赞数是累计值，一帧内只解析最后一条 (在它原来的位置)
+        - 下播信号之前的消息照常写入，之后的丢弃
+        Returns:
+            bool: 同 handle
+        """
+        last_like = -1
+        for i, (method, _) in enumerate(messages):
+            if method == 'WebcastLikeMessage':
+                last_like = i
+
+        run_method, run = None, []
+        stopped = False
+        for i, (method, payload) in enumerate(messages):
+            if method in BATCHED_METHODS:
+                if method != run_method:
+                    await self._flush_run(run_method, run)
+                    run_method, run = method, []
+                run.append(payload)
+                continue
+            if method == 'WebcastLikeMessage' and i != last_like:
+                continue
+            await self._flush_run(run_method, run)
+            run_method, run = None, []
+            if method == 'WebcastControlMessage':
+                if self._is_stop_signal(payload):
+                    stopped = True
+                    break
+            else:
+                await self.handle(method, payload)
+        await self._flush_run(run_method, run)
+
+        if stopped:
+            await self._on_stop_signal()
+        return stopped
+
+    async def _flush_run(self, method, payloads):
+        if not payloads:
+            return
+        if method == 'WebcastChatMessage':
+            await self._write_chats(payloads)
+        else:
+            await self._write_gifts(payloads)
+
+    def _is_stop_signal(self, payload):
         try:
-            message = ControlMessage().parse(payload)
-            if message.status == 3:
-                logger.info(f"🛑 [ControlMsg] 收到下播信号 (Room: {self.room_id})")
-                if self.db and self.room_id:
-                    await self.db.set_room_ended(self.room_id)
-                return True # Signal to stop
-        except Exception: pass
+            return self.proto.parse('ControlMessage', payload).status == 3
+        except Exception:
+            return False
+
+    async def _on_stop_signal(self):
+        logger.info(f"🛑 [ControlMsg] 收到下播信号 (Room: {self.room_id})")
+        if self.db and self.room_id:
+            await self.db.set_room_ended(self.room_id)
+
+    async def _parse_control(self, payload):
+        if self._is_stop_signal(payload):
+            await self._on_stop_signal()
+            return True # Signal to stop
         return False
 
-    async def _parse_chat(self, payload):
-        try:
-            message = ChatMessage().parse(payload)
-            user = message.user
-            
-            # --- 新增：消费等级 ---
-            pay_grade = 0
-            pay_grade_icon = ""
+    async def _write_chats(self, payloads):
+        batch = []
+        for payload in payloads:
             try:
-                if hasattr(user, 'pay_grade'):
-                    pay_grade = user.pay_grade.level
-                    pay_grade_icon = get_safe_url(user.pay_grade.new_im_icon_with_level)
-            except: pass
-            
-            # --- 粉丝团信息 ---
-            fans_club_icon = ""
-            fans_club_level = 0
+                batch.append(self._build_chat(payload))
+            except Exception: pass
+        if batch and self.db:
+            await self.db.insert_chats(batch)
+
+    async def _write_gifts(self, payloads):
+        batch = []
+        for payload in payloads:
             try:
-                fans_club_icon = user.fans_club.data.badge.icons[4].url_list_list[0]
-                fans_club_level = user.fans_club.data.level
-            except: pass
-            
-            event_ts = getattr(message, 'event_time', 0)
-            
-            if event_ts == 0:
-                event_time_obj = datetime.now()
-            else:
-                # 加上8小时转为北京时间
-                event_time_obj = datetime.utcfromtimestamp(event_ts) + timedelta(hours=8)
-            
-            event_time_str = event_time_obj.strftime('%Y-%m-%d %H:%M:%S')
-            
-            chat_data = {
-                'web_rid': self.live_id,
-                'room_id': self.room_id,
-                'user_id': str(user.id),
-                'user_name': user.nick_name,
-                'gender': getattr(user, 'gender', 0),
-                'content': message.content,
-                'sec_uid': getattr(user, 'sec_uid', ''),
-                'avatar_url': get_safe_url(user.avatar_thumb),
-                'pay_grade': pay_grade,          # ✅ 新增
-                'pay_grade_icon': pay_grade_icon,
-                'fans_club_icon': fans_club_icon,
-                'fans_club_level': fans_club_level,
-                'event_time': event_time_str,
-                'created_at': datetime.now()
-            }
+                batch.append(self._build_gift(payload))
+            except Exception: pass
+        if batch and self.gift_processor:
+            await self.gift_processor.process_gifts(collapse_gift_combos(batch))
+
+    def _decode(self, method, payload):
+        """按配置选择投影解码器或全量解析后端，返回同结构的扁平字典"""
+        backend = 'fast' if method in self.fast_decode else self.proto.name
+        return DECODERS[method][backend](payload)
+
+    async def _parse_chat(self, payload):
+        try:
+            chat_data = self._build_chat(payload)
             if self.db: 
                 await self.db.insert_chat(chat_data)
         except Exception: pass
 
+    def _build_chat(self, payload):
+        """弹幕 payload -> live_chats 文档"""
+        message = self._decode('WebcastChatMessage', payload)
+        
+        event_ts = message['event_time']
+        
+        if event_ts == 0:
+            event_time_obj = datetime.now()
+        else:
+            # 加上8小时转为北京时间
+            event_time_obj = datetime.utcfromtimestamp(event_ts) + timedelta(hours=8)
+        
+        event_time_str = event_time_obj.strftime('%Y-%m-%d %H:%M:%S')
+        
+        chat_data = {
+            'web_rid': self.live_id,
+            'room_id': self.room_id,
+            'user_id': str(message['user_id']),
+            'user_name': message['user_name'],
+            'gender': message['gender'],
+            'content': message['content'],
+            'sec_uid': message['sec_uid'],
+            'avatar_url': message['avatar_url'],
+            'pay_grade': message['pay_grade'],          # ✅ 新增
+            'pay_grade_icon': message['pay_grade_icon'],
+            'fans_club_icon': message['fans_club_icon'],
+            'fans_club_level': message['fans_club_level'],
+            'event_time': event_time_str,
+            'created_at': datetime.now()
+        }
+        return chat_data
+
     async def _parse_gift(self, payload):
         try:
-            message = GiftMessage().parse(payload)
-            user = message.user
-            gift = message.gift
-            group_id = getattr(message, 'group_id', '')          
-            group_count = message.group_count
-            
-            # --- 新增：消费等级 ---
-            pay_grade = 0
-            pay_grade_icon = ""
-            try:
-                if hasattr(user, 'pay_grade'):
-                    pay_grade = user.pay_grade.level
-                    pay_grade_icon = get_safe_url(user.pay_grade.new_im_icon_with_level)
-            except: pass
-            
-            # --- 新增：粉丝团等级 ---
-            fans_club_icon = ""
-            fans_club_level = 0
-            try:
-                fans_club_icon = user.fans_club.data.badge.icons[4].url_list_list[0]
-                fans_club_level = user.fans_club.data.level
-            except: pass
-            
-            gift_icon_url = ""
-            try:
-                gift_icon_url = message.gift.icon.url_list_list[0]
-            except: pass
-            
-            send_time_ms = getattr(message, 'send_time', int(time.time() * 1000))
-            
-            if send_time_ms == 0:
-                send_time_obj = datetime.now()
-            else:
-                send_time_obj = datetime.utcfromtimestamp(send_time_ms / 1000) + timedelta(hours=8)
-            
-            # 格式化时间字符串
-            send_time_str = send_time_obj.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-            
-            gift_data = {
-                'web_rid': self.live_id,
-                'room_id': self.room_id,
-                'user_id': str(user.id),
-                'user_name': user.nick_name,
-                'gender': getattr(user, 'gender', 0),
-                'sec_uid': getattr(user, 'sec_uid', ''),
-                'avatar_url': get_safe_url(user.avatar_thumb),
-                'pay_grade': pay_grade,          # ✅ 新增
-                'pay_grade_icon': pay_grade_icon,
-                'fans_club_level': fans_club_level, # ✅ 新增
-                'fans_club_icon': fans_club_icon,
-                'gift_icon_url' : gift_icon_url,
-                'gift_id': str(gift.id),
-                'gift_name': gift.name,
-                'diamond_count': gift.diamond_count,
-                'combo_count': message.combo_count,
-                'group_count': group_count,
-                'group_id': str(group_id),
-                'repeat_end': getattr(message, 'repeat_end', 0),
-                'trace_id': getattr(message, 'trace_id', ''),
-                'send_time': send_time_str,
-                'created_at': datetime.now()
-            }
-            
+            gift_data = self._build_gift(payload)
             if self.gift_processor: 
                 await self.gift_processor.process_gift(gift_data)
         except Exception: pass
 
+    def _build_gift(self, payload):
+        """礼物 payload -> 交给 gift_processor 的字典"""
+        message = self._decode('WebcastGiftMessage', payload)
+        
+        send_time_ms = message['send_time']
+        
+        if send_time_ms == 0:
+            send_time_obj = datetime.now()
+        else:
+            send_time_obj = datetime.utcfromtimestamp(send_time_ms / 1000) + timedelta(hours=8)
+        
+        # 格式化时间字符串
+        send_time_str = send_time_obj.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        
+        gift_data = {
+            'web_rid': self.live_id,
+            'room_id': self.room_id,
+            'user_id': str(message['user_id']),
+            'user_name': message['user_name'],
+            'gender': message['gender'],
+            'sec_uid': message['sec_uid'],
+            'avatar_url': message['avatar_url'],
+            'pay_grade': message['pay_grade'],          # ✅ 新增
+            'pay_grade_icon': message['pay_grade_icon'],
+            'fans_club_level': message['fans_club_level'], # ✅ 新增
+            'fans_club_icon': message['fans_club_icon'],
+            'gift_icon_url' : message['gift_icon_url'],
+            'gift_id': str(message['gift_id']),
+            'gift_name': message['gift_name'],
+            'diamond_count': message['diamond_count'],
+            'combo_count': message['combo_count'],
+            'group_count': message['group_count'],
+            'group_id': str(message['group_id']),
+            'repeat_end': message['repeat_end'],
+            'trace_id': message['trace_id'],
+            'send_time': send_time_str,
+            'created_at': datetime.now()
+        }
+        return gift_data
+
     async def _parse_user_seq(self, payload):
         """
         直播间统计信息（在线人数、榜单）
+        每条都处理 (不再节流丢弃)，结果记入 db.room_stats，由其定时合并写回 rooms
         """
         now = time.time()
-        # 频率控制
-        if now - self.last_seq_time < self.THROTTLE_INTERVAL:
-            return
         
         # 计算实际的时间间隔 (可能不是精确的5.0秒，用实际差值更准)
         time_diff = now - self.last_seq_time if self.last_seq_time > 0 else 0
         self.last_seq_time = now
 
         try:
-            message = RoomUserSeqMessage().parse(payload)
+            message = self.proto.parse('RoomUserSeqMessage', payload)
             
             # 当前值
             current_online = message.total       # 当前在线
@@ -257,12 +343,12 @@ class MessageHandler:
                 stats['ranks'] = rank_data
 
             if self.db and self.room_id:
-                # 1. 更新覆盖型数据 (在线人数、榜单) -> rooms 表
-                await self.db.update_room_stats(self.room_id, stats)
+                # 1. 覆盖型数据 (在线人数、榜单)：只保留最新值，max_viewers 取最大
+                self.db.room_stats.set(self.room_id, stats)
                 
-                # 2. 更新增量数据 (累计时长等) -> rooms 表
+                # 2. 增量数据 (累计时长等)：累加
                 if inc_data:
-                    await self.db.increment_room_stats(self.room_id, inc_data)
+                    self.db.room_stats.incr(self.room_id, inc_data)
 
                 # ❌ 已移除：写入 live_stats 时序集合的操作
 
@@ -271,26 +357,20 @@ class MessageHandler:
 
     async def _parse_like(self, payload):
         """
-        点赞信息
-        【频率控制】120s 一次
+        点赞信息：只记最新的累计点赞数，由 db.room_stats 定时写回
         """
-        now = time.time()
-        if now - self.last_like_time < self.THROTTLE_INTERVAL:
-            return
-        self.last_like_time = now
-
         try:
-            message = LikeMessage().parse(payload)
+            message = self.proto.parse('LikeMessage', payload)
             if self.db and self.room_id:
                 # logger.info(f"❤️ [Like] 更新点赞数: {message.total}")
-                await self.db.update_room_stats(self.room_id, {
+                self.db.room_stats.set(self.room_id, {
                     'like_count': message.total
                 })
         except Exception: pass
 
     async def _parse_pk_finish(self, payload):
         try:
-            message = LinkMicBattleFinishMethod().parse(payload)
+            message = self.proto.parse('LinkMicBattleFinishMethod', payload)
             if message.info.status != 2: return
 
             battle_id = str(message.info.battle_id)
@@ -0,0 +1,150 @@
+# proto_backend.py
+"""
+protobuf 解码后端切换
+
+- betterproto (默认)：protobuf/douyin/__init__.py 中的纯 Python dataclass
+- upb：由同一份 douyin.proto 生成的 google.protobuf 绑定 (protobuf/douyin_pb2.py)，
+  底层为 C 实现的 upb，解析速度快一个数量级
+
+通过环境变量 PROTO_BACKEND=upb 按部署选择。upb 消息外面包一层 snake_case 适配器，
+字段名与 betterproto 生成的属性名一致 (user.nick_name / message.ranks_list ...)，
+liveMan 与 MessageHandler 的业务代码在两种后端下无需区分。
+
+生成 douyin_pb2.py:
+    cd protobuf && protoc --python_out=. douyin.proto
+"""
+import os
+import logging
+
+logger = logging.getLogger("ProtoBackend")
+
+BACKEND_BETTERPROTO = 'betterproto'
+BACKEND_UPB = 'upb'
+
+
+class BetterprotoBackend:
+    name = BACKEND_BETTERPROTO
+
+    def __init__(self):
+        from protobuf import douyin
+        self._module = douyin
+
+    def parse(self, type_name, data):
+        return getattr(self._module, type_name)().parse(data)
+
+    def push_frame(self, **fields):
+        """编码 PushFrame (心跳 / ACK)"""
+        return self._module.PushFrame(**fields).SerializeToString()
+
+
+# --------------------------------------------------------------------------
+# upb 适配层
+# --------------------------------------------------------------------------
+
+# 描述符全名 -> {snake_case 名: FieldDescriptor}
+_FIELD_MAPS = {}
+
+
+def _field_map(descriptor):
+    fmap = _FIELD_MAPS.get(descriptor.full_name)
+    if fmap is None:
+        # 与 betterproto 生成代码使用同一套命名规则
+        from betterproto.casing import snake_case
+        fmap = {snake_case(f.name): f for f in descriptor.fields}
+        _FIELD_MAPS[descriptor.full_name] = fmap
+    return fmap
+
+
+def _is_repeated(field):
+    # 新版 protobuf 提供 is_repeated，旧版只有 label
+    is_repeated = getattr(field, 'is_repeated', None)
+    if is_repeated is not None:
+        return is_repeated
+    return field.label == field.LABEL_REPEATED
+
+
+def _wrap(field, value):
+    message_type = field.message_type
+    if message_type is None:
+        return list(value) if _is_repeated(field) else value
+    if message_type.GetOptions().map_entry:
+        value_field = message_type.fields_by_name['value']
+        # 转成普通 dict：缺失的 key 抛 KeyError (与 betterproto 一致，不会像 MessageMap 那样自动插入)
+        return {k: _wrap(value_field, v) for k, v in value.items()}
+    if _is_repeated(field):
+        return [UpbMessageView(v) for v in value]
+    return UpbMessageView(value)
+
+
+class UpbMessageView:
+    """以 betterproto 的 snake_case 属性名访问 upb 消息 (只读)"""
+    __slots__ = ('_msg',)
+
+    def __init__(self, msg):
+        self._msg = msg
+
+    def __getattr__(self, name):
+        field = _field_map(self._msg.DESCRIPTOR).get(name)
+        if field is None:
+            raise AttributeError(name)
+        return _wrap(field, getattr(self._msg, field.name))
+
+    def __bool__(self):
+        # 与 betterproto 一致：没有任何字段被设置时为 False
+        return self._msg.ByteSize() > 0
+
+    def __repr__(self):
+        return f"UpbMessageView({self._msg.DESCRIPTOR.name})"
+
+
+class UpbBackend:
+    name = BACKEND_UPB
+
+    def __init__(self):
+        from protobuf import douyin_pb2
+        from google.protobuf.internal import api_implementation
+        self._module = douyin_pb2
+        self.implementation = api_implementation.Type()
+        if self.implementation != 'upb':
+            logger.warning(f"⚠️ google.protobuf 当前实现为 {self.implementation}，不是 upb，解析不会更快")
+
+    def parse(self, type_name, data):
+        msg = getattr(self._module, type_name)()
+        msg.ParseFromString(bytes(data) if isinstance(data, memoryview) else data)
+        return UpbMessageView(msg)
+
+    def push_frame(self, **fields):
+        """编码 PushFrame (心跳 / ACK)，参数使用 snake_case 名"""
+        cls = self._module.PushFrame
+        fmap = _field_map(cls.DESCRIPTOR)
+        return cls(**{fmap[k].name: v for k, v in fields.items()}).SerializeToString()
+
+
+_BACKEND_CLASSES = {
+    BACKEND_BETTERPROTO: BetterprotoBackend,
+    BACKEND_UPB: UpbBackend,
+}
+_backends = {}
+
+
+def get_backend(name=None):
+    """
+    获取解码后端；name 为空时读取环境变量 PROTO_BACKEND (默认 betterproto)
+    upb 不可用 (未安装 protobuf、未生成 douyin_pb2.py，或 protobuf 运行时与生成 douyin_pb2.py 的版本不匹配) 时退回 betterproto
+    """
+    name = (name or os.environ.get('PROTO_BACKEND') or BACKEND_BETTERPROTO).lower()
+    backend = _backends.get(name)
+    if backend is not None:
+        return backend
+    if name not in _BACKEND_CLASSES:
+        logger.warning(f"⚠️ 未知的解码后端 {name}，使用 {BACKEND_BETTERPROTO}")
+        return get_backend(BACKEND_BETTERPROTO)
+    try:
+        backend = _BACKEND_CLASSES[name]()
+    except Exception as e:
+        # 版本不匹配时 douyin_pb2 抛的是 runtime_version.VersionError (不是 ImportError)
+        logger.error(f"❌ 解码后端 {name} 不可用，退回 {BACKEND_BETTERPROTO}: {e}")
+        return get_backend(BACKEND_BETTERPROTO)
+    _backends[name] = backend
+    logger.info(f"✅ protobuf 解码后端: {name}")
+    return backend
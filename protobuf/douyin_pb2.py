@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: douyin.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'douyin.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x64ouyin.proto\x12\x06\x64ouyin\"\xb3\x01\n\tPushFrame\x12\r\n\x05seqId\x18\x01 \x01(\x04\x12\r\n\x05logId\x18\x02 \x01(\x04\x12\x0f\n\x07service\x18\x03 \x01(\x04\x12\x0e\n\x06method\x18\x04 \x01(\x04\x12(\n\x0bheadersList\x18\x05 \x03(\x0b\x32\x13.douyin.HeadersList\x12\x17\n\x0fpayloadEncoding\x18\x06 \x01(\t\x12\x13\n\x0bpayloadType\x18\x07 \x01(\t\x12\x0f\n\x07payload\x18\x08 \x01(\x0c\"\x9a\x01\n\x07Message\x12\x0e\n\x06method\x18\x01 \x01(\t\x12\x0f\n\x07payload\x18\x02 \x01(\x0c\x12\r\n\x05msgId\x18\x03 \x01(\x03\x12\x0f\n\x07msgType\x18\x04 \x01(\x05\x12\x0e\n\x06offset\x18\x05 \x01(\x03\x12\x15\n\rneedWrdsStore\x18\x06 \x01(\x08\x12\x13\n\x0bwrdsVersion\x18\x07 \x01(\x03\x12\x12\n\nwrdsSubKey\x18\x08 \x01(\t\"\xe4\x02\n\x08Response\x12%\n\x0cmessagesList\x18\x01 \x03(\x0b\x32\x0f.douyin.Message\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\x15\n\rfetchInterval\x18\x03 \x01(\x04\x12\x0b\n\x03now\x18\x04 \x01(\x04\x12\x13\n\x0binternalExt\x18\x05 \x01(\t\x12\x11\n\tfetchType\x18\x06 \x01(\r\x12\x36\n\x0brouteParams\x18\x07 \x03(\x0b\x32!.douyin.Response.RouteParamsEntry\x12\x19\n\x11heartbeatDuration\x18\x08 \x01(\x04\x12\x0f\n\x07needAck\x18\t \x01(\x08\x12\x12\n\npushServer\x18\n \x01(\t\x12\x12\n\nliveCursor\x18\x0b \x01(\t\x12\x15\n\rhistoryNoMore\x18\x0c \x01(\x08\x1a\x32\n\x10RouteParamsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\")\n\x0bHeadersList\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\"\xd1\x03\n\x06\x43ommon\x12\x0e\n\x06method\x18\x01 \x01(\t\x12\r\n\x05msgId\x18\x02 \x01(\x04\x12\x0e\n\x06roomId\x18\x03 \x01(\x04\x12\x12\n\ncreateTime\x18\x04 \x01(\x04\x12\x0f\n\x07monitor\x18\x05 \x01(\r\x12\x11\n\tisShowMsg\x18\x06 \x01(\x08\x12\x10\n\x08\x64\x65scribe\x18\x07 \x01(\t\x12\x10\n\x08\x66oldType\x18\t \x01(\x04\x12\x16\n\x0e\x61nchorFoldType\x18\n \x01(\x04\x12\x15\n\rpriorityScore\x18\x0b \x01(\x04\x12\r\n\x05logId\x18\x0c \x01(\t\x12\x19\n\x11msgProcessFilterK\x18\r \x01(\t\x12\x19\n\x11msgProcessFilterV\x18\x0e \x01(\t\x12\x1a\n\x04user\x18\x0f \x01(\x0b\x32\x0c.douyin.User\x12\x18\n\x10\x61nchorFoldTypeV2\x18\x11 \x01(\x04\x12\x1a\n\x12processAtSeiTimeMs\x18\x12 \x01(\x04\x12\x18\n\x10randomDispatchMs\x18\x13 \x01(\x04\x12\x12\n\nisDispatch\x18\x14 \x01(\x08\x12\x11\n\tchannelId\x18\x15 \x01(\x04\x12\x19\n\x11\x64iffSei2absSecond\x18\x16 \x01(\x04\x12\x1a\n\x12\x61nchorFoldDuration\x18\x17 \x01(\x04\"\x9f\x06\n\x04User\x12\n\n\x02id\x18\x01 \x01(\x04\x12\x0f\n\x07shortId\x18\x02 \x01(\x04\x12\x10\n\x08nickName\x18\x03 \x01(\t\x12\x0e\n\x06gender\x18\x04 \x01(\r\x12\x11\n\tSignature\x18\x05 \x01(\t\x12\r\n\x05Level\x18\x06 \x01(\r\x12\x10\n\x08\x42irthday\x18\x07 \x01(\x04\x12\x11\n\tTelephone\x18\x08 \x01(\t\x12\"\n\x0b\x41vatarThumb\x18\t \x01(\x0b\x32\r.douyin.Image\x12#\n\x0c\x41vatarMedium\x18\n \x01(\x0b\x32\r.douyin.Image\x12\"\n\x0b\x41vatarLarge\x18\x0b \x01(\x0b\x32\r.douyin.Image\x12\x10\n\x08Verified\x18\x0c \x01(\x08\x12\x12\n\nExperience\x18\r \x01(\r\x12\x0c\n\x04\x63ity\x18\x0e \x01(\t\x12\x0e\n\x06Status\x18\x0f \x01(\x05\x12\x12\n\nCreateTime\x18\x10 \x01(\x04\x12\x12\n\nModifyTime\x18\x11 \x01(\x04\x12\x0e\n\x06Secret\x18\x12 \x01(\r\x12\x16\n\x0eShareQrcodeUri\x18\x13 \x01(\t\x12\x1a\n\x12IncomeSharePercent\x18\x14 \x01(\r\x12%\n\x0e\x42\x61\x64geImageList\x18\x15 \x03(\x0b\x32\r.douyin.Image\x12&\n\nFollowInfo\x18\x16 \x01(\x0b\x32\x12.douyin.FollowInfo\x12\"\n\x08PayGrade\x18\x17 \x01(\x0b\x32\x10.douyin.PayGrade\x12\"\n\x08\x46\x61nsClub\x18\x18 \x01(\x0b\x32\x10.douyin.FansClub\x12\x11\n\tSpecialId\x18\x1a \x01(\t\x12#\n\x0c\x41vatarBorder\x18\x1b \x01(\x0b\x32\r.douyin.Image\x12\x1c\n\x05Medal\x18\x1c \x01(\x0b\x32\r.douyin.Image\x12(\n\x11RealTimeIconsList\x18\x1d \x03(\x0b\x32\r.douyin.Image\x12\x11\n\tdisplayId\x18& \x01(\t\x12\x0e\n\x06secUid\x18. \x01(\t\x12\x17\n\x0e\x66\x61nTicketCount\x18\xfe\x07 \x01(\x04\x12\x0e\n\x05idStr\x18\x84\x08 \x01(\t\x12\x11\n\x08\x61geRange\x18\x95\x08 \x01(\r\"\xbc\x01\n\x05Image\x12\x13\n\x0burlListList\x18\x01 \x03(\t\x12\x0b\n\x03uri\x18\x02 \x01(\t\x12\x0e\n\x06height\x18\x03 \x01(\x04\x12\r\n\x05width\x18\x04 \x01(\x04\x12\x10\n\x08\x61vgColor\x18\x05 \x01(\t\x12\x11\n\timageType\x18\x06 \x01(\r\x12\x12\n\nopenWebUrl\x18\x07 \x01(\t\x12%\n\x07\x63ontent\x18\x08 \x01(\x0b\x32\x14.douyin.ImageContent\x12\x12\n\nisAnimated\x18\t \x01(\x08\"W\n\x0cImageContent\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x11\n\tfontColor\x18\x02 \x01(\t\x12\r\n\x05level\x18\x03 \x01(\x04\x12\x17\n\x0f\x61lternativeText\x18\x04 \x01(\t\"\xae\x01\n\nFollowInfo\x12\x16\n\x0e\x66ollowingCount\x18\x01 \x01(\x04\x12\x15\n\rfollowerCount\x18\x02 \x01(\x04\x12\x14\n\x0c\x66ollowStatus\x18\x03 \x01(\x04\x12\x12\n\npushStatus\x18\x04 \x01(\x04\x12\x12\n\nremarkName\x18\x05 \x01(\t\x12\x18\n\x10\x66ollowerCountStr\x18\x06 \x01(\t\x12\x19\n\x11\x66ollowingCountStr\x18\x07 \x01(\t\"\xe2\x06\n\x08PayGrade\x12\x19\n\x11totalDiamondCount\x18\x01 \x01(\x03\x12\"\n\x0b\x64iamondIcon\x18\x02 \x01(\x0b\x32\r.douyin.Image\x12\x0c\n\x04name\x18\x03 \x01(\t\x12\x1b\n\x04icon\x18\x04 \x01(\x0b\x32\r.douyin.Image\x12\x10\n\x08nextName\x18\x05 \x01(\t\x12\r\n\x05level\x18\x06 \x01(\x03\x12\x1f\n\x08nextIcon\x18\x07 \x01(\x0b\x32\r.douyin.Image\x12\x13\n\x0bnextDiamond\x18\x08 \x01(\x03\x12\x12\n\nnowDiamond\x18\t \x01(\x03\x12\x1b\n\x13thisGradeMinDiamond\x18\n \x01(\x03\x12\x1b\n\x13thisGradeMaxDiamond\x18\x0b \x01(\x03\x12\x15\n\rpayDiamondBak\x18\x0c \x01(\x03\x12\x15\n\rgradeDescribe\x18\r \x01(\t\x12(\n\rgradeIconList\x18\x0e \x03(\x0b\x32\x11.douyin.GradeIcon\x12\x16\n\x0escreenChatType\x18\x0f \x01(\x03\x12\x1d\n\x06imIcon\x18\x10 \x01(\x0b\x32\r.douyin.Image\x12&\n\x0fimIconWithLevel\x18\x11 \x01(\x0b\x32\r.douyin.Image\x12\x1f\n\x08liveIcon\x18\x12 \x01(\x0b\x32\r.douyin.Image\x12)\n\x12newImIconWithLevel\x18\x13 \x01(\x0b\x32\r.douyin.Image\x12\"\n\x0bnewLiveIcon\x18\x14 \x01(\x0b\x32\r.douyin.Image\x12\x1a\n\x12upgradeNeedConsume\x18\x15 \x01(\x03\x12\x16\n\x0enextPrivileges\x18\x16 \x01(\t\x12!\n\nbackground\x18\x17 \x01(\x0b\x32\r.douyin.Image\x12%\n\x0e\x62\x61\x63kgroundBack\x18\x18 \x01(\x0b\x32\r.douyin.Image\x12\r\n\x05score\x18\x19 \x01(\x03\x12\'\n\x08\x62uffInfo\x18\x1a \x01(\x0b\x32\x15.douyin.GradeBuffInfo\x12\x14\n\x0bgradeBanner\x18\xe9\x07 \x01(\t\x12\'\n\x0fprofileDialogBg\x18\xea\x07 \x01(\x0b\x32\r.douyin.Image\x12+\n\x13profileDialogBgBack\x18\xeb\x07 \x01(\x0b\x32\r.douyin.Image\"^\n\tGradeIcon\x12\x1b\n\x04icon\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x13\n\x0biconDiamond\x18\x02 \x01(\x03\x12\r\n\x05level\x18\x03 \x01(\x03\x12\x10\n\x08levelStr\x18\x04 \x01(\t\"\x0f\n\rGradeBuffInfo\"\xad\x01\n\x08\x46\x61nsClub\x12\"\n\x04\x64\x61ta\x18\x01 \x01(\x0b\x32\x14.douyin.FansClubData\x12\x34\n\npreferData\x18\x02 \x03(\x0b\x32 .douyin.FansClub.PreferDataEntry\x1aG\n\x0fPreferDataEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.douyin.FansClubData:\x02\x38\x01\"\x99\x01\n\x0c\x46\x61nsClubData\x12\x10\n\x08\x63lubName\x18\x01 \x01(\t\x12\r\n\x05level\x18\x02 \x01(\x05\x12\x1a\n\x12userFansClubStatus\x18\x03 \x01(\x05\x12 \n\x05\x62\x61\x64ge\x18\x04 \x01(\x0b\x32\x11.douyin.UserBadge\x12\x18\n\x10\x61vailableGiftIds\x18\x05 \x03(\x03\x12\x10\n\x08\x61nchorId\x18\x06 \x01(\x03\"\x84\x01\n\tUserBadge\x12+\n\x05icons\x18\x01 \x03(\x0b\x32\x1c.douyin.UserBadge.IconsEntry\x12\r\n\x05title\x18\x02 \x01(\t\x1a;\n\nIconsEntry\x12\x0b\n\x03key\x18\x01 \x01(\x05\x12\x1c\n\x05value\x18\x02 \x01(\x0b\x32\r.douyin.Image:\x02\x38\x01\"\xe0\x04\n\x0b\x43hatMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x1a\n\x04user\x18\x02 \x01(\x0b\x32\x0c.douyin.User\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x17\n\x0fvisibleToSender\x18\x04 \x01(\x08\x12&\n\x0f\x62\x61\x63kgroundImage\x18\x05 \x01(\x0b\x32\r.douyin.Image\x12\x1b\n\x13\x66ullScreenTextColor\x18\x06 \x01(\t\x12(\n\x11\x62\x61\x63kgroundImageV2\x18\x07 \x01(\x0b\x32\r.douyin.Image\x12\x32\n\x10publicAreaCommon\x18\t \x01(\x0b\x32\x18.douyin.PublicAreaCommon\x12 \n\tgiftImage\x18\n \x01(\x0b\x32\r.douyin.Image\x12\x12\n\nagreeMsgId\x18\x0b \x01(\x04\x12\x15\n\rpriorityLevel\x18\x0c \x01(\r\x12\x38\n\x13landscapeAreaCommon\x18\r \x01(\x0b\x32\x1b.douyin.LandscapeAreaCommon\x12\x11\n\teventTime\x18\x0f \x01(\x04\x12\x12\n\nsendReview\x18\x10 \x01(\x08\x12\x14\n\x0c\x66romIntercom\x18\x11 \x01(\x08\x12\x1c\n\x14intercomHideUserCard\x18\x12 \x01(\x08\x12\x14\n\x0c\x63hatTagsList\x18\x13 \x03(\t\x12\x0e\n\x06\x63hatBy\x18\x14 \x01(\t\x12\x1e\n\x16individualChatPriority\x18\x15 \x01(\r\x12 \n\nrtfContent\x18\x16 \x01(\x0b\x32\x0c.douyin.Text\"\xa5\x06\n\x0bGiftMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x0e\n\x06giftId\x18\x02 \x01(\x04\x12\x12\n\ngroupCount\x18\x04 \x01(\x04\x12\x13\n\x0brepeatCount\x18\x05 \x01(\x04\x12\x12\n\ncomboCount\x18\x06 \x01(\x04\x12\x1a\n\x04user\x18\x07 \x01(\x0b\x32\x0c.douyin.User\x12\x1c\n\x06toUser\x18\x08 \x01(\x0b\x32\x0c.douyin.User\x12\x11\n\trepeatEnd\x18\t \x01(\r\x12&\n\ntextEffect\x18\n \x01(\x0b\x32\x12.douyin.TextEffect\x12\x0f\n\x07groupId\x18\x0b \x01(\x04\x12\x17\n\x0fincomeTaskgifts\x18\x0c \x01(\x04\x12(\n\x08priority\x18\x0e \x01(\x0b\x32\x16.douyin.GiftIMPriority\x12 \n\x04gift\x18\x0f \x01(\x0b\x32\x12.douyin.GiftStruct\x12\r\n\x05logId\x18\x10 \x01(\t\x12\x10\n\x08sendType\x18\x11 \x01(\x04\x12\x32\n\x10publicAreaCommon\x18\x12 \x01(\x0b\x32\x18.douyin.PublicAreaCommon\x12%\n\x0ftrayDisplayText\x18\x13 \x01(\x0b\x32\x0c.douyin.Text\x12\x1c\n\x14\x62\x61nnedDisplayEffects\x18\x14 \x01(\x04\x12\x16\n\x0e\x64isplayForSelf\x18\x19 \x01(\x08\x12\x18\n\x10interactGiftInfo\x18\x1a \x01(\t\x12\x13\n\x0b\x64iyItemInfo\x18\x1b \x01(\t\x12\x17\n\x0fminAssetSetList\x18\x1c \x03(\x04\x12\x12\n\ntotalCount\x18\x1d \x01(\x04\x12\x18\n\x10\x63lientGiftSource\x18\x1e \x01(\r\x12\x15\n\rtoUserIdsList\x18  \x03(\x04\x12\x10\n\x08sendTime\x18! \x01(\x04\x12\x1b\n\x13\x66orceDisplayEffects\x18\" \x01(\x04\x12\x0f\n\x07traceId\x18# \x01(\t\x12\x17\n\x0f\x65\x66\x66\x65\x63tDisplayTs\x18$ \x01(\x04\x12&\n\x08trayInfo\x18\x15 \x01(\x0b\x32\x14.douyin.GiftTrayInfo\"\xc7\x02\n\x0cGiftTrayInfo\x12$\n\rtray_base_img\x18\x02 \x01(\x0b\x32\r.douyin.Image\x12\x1b\n\x05title\x18\x04 \x01(\x0b\x32\x0c.douyin.Text\x12\x11\n\ttray_type\x18\x05 \x01(\x04\x12%\n\x0etray_right_img\x18\x06 \x01(\x0b\x32\r.douyin.Image\x12&\n\x0ftray_image_base\x18\t \x01(\x0b\x32\r.douyin.Image\x12\x10\n\x08\x64uration\x18\x0c \x01(\x04\x12\x34\n\x0btray_effect\x18\x0f \x01(\x0b\x32\x1f.douyin.GiftTrayInfo.TrayEffect\x1aJ\n\nTrayEffect\x12\x1c\n\x05image\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x10\n\x08\x64uration\x18\x02 \x01(\x04\x12\x0c\n\x04Time\x18\x05 \x01(\x04\"\xa3\x03\n\nGiftStruct\x12\x1c\n\x05image\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x10\n\x08\x64\x65scribe\x18\x02 \x01(\t\x12\x0e\n\x06notify\x18\x03 \x01(\x08\x12\x10\n\x08\x64uration\x18\x04 \x01(\x04\x12\n\n\x02id\x18\x05 \x01(\x04\x12\x12\n\nforLinkmic\x18\x07 \x01(\x08\x12\x0e\n\x06\x64oodle\x18\x08 \x01(\x08\x12\x13\n\x0b\x66orFansclub\x18\t \x01(\x08\x12\r\n\x05\x63ombo\x18\n \x01(\x08\x12\x0c\n\x04type\x18\x0b \x01(\r\x12\x14\n\x0c\x64iamondCount\x18\x0c \x01(\r\x12\x1a\n\x12isDisplayedOnPanel\x18\r \x01(\x08\x12\x17\n\x0fprimaryEffectId\x18\x0e \x01(\x04\x12$\n\rgiftLabelIcon\x18\x0f \x01(\x0b\x32\r.douyin.Image\x12\x0c\n\x04name\x18\x10 \x01(\t\x12\x0e\n\x06region\x18\x11 \x01(\t\x12\x0e\n\x06manual\x18\x12 \x01(\t\x12\x11\n\tforCustom\x18\x13 \x01(\x08\x12\x1b\n\x04icon\x18\x15 \x01(\x0b\x32\r.douyin.Image\x12\x12\n\nactionType\x18\x16 \x01(\r\"U\n\x0eGiftIMPriority\x12\x16\n\x0equeueSizesList\x18\x01 \x03(\x04\x12\x19\n\x11selfQueuePriority\x18\x02 \x01(\x04\x12\x10\n\x08priority\x18\x03 \x01(\x04\"\xef\x04\n\rMemberMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x1a\n\x04user\x18\x02 \x01(\x0b\x32\x0c.douyin.User\x12\x13\n\x0bmemberCount\x18\x03 \x01(\x04\x12\x1e\n\x08operator\x18\x04 \x01(\x0b\x32\x0c.douyin.User\x12\x14\n\x0cisSetToAdmin\x18\x05 \x01(\x08\x12\x11\n\tisTopUser\x18\x06 \x01(\x08\x12\x11\n\trankScore\x18\x07 \x01(\x04\x12\x11\n\ttopUserNo\x18\x08 \x01(\x04\x12\x11\n\tenterType\x18\t \x01(\x04\x12\x0e\n\x06\x61\x63tion\x18\n \x01(\x04\x12\x19\n\x11\x61\x63tionDescription\x18\x0b \x01(\t\x12\x0e\n\x06userId\x18\x0c \x01(\x04\x12*\n\x0c\x65\x66\x66\x65\x63tConfig\x18\r \x01(\x0b\x32\x14.douyin.EffectConfig\x12\x0e\n\x06popStr\x18\x0e \x01(\t\x12/\n\x11\x65nterEffectConfig\x18\x0f \x01(\x0b\x32\x14.douyin.EffectConfig\x12&\n\x0f\x62\x61\x63kgroundImage\x18\x10 \x01(\x0b\x32\r.douyin.Image\x12(\n\x11\x62\x61\x63kgroundImageV2\x18\x11 \x01(\x0b\x32\r.douyin.Image\x12\'\n\x11\x61nchorDisplayText\x18\x12 \x01(\x0b\x32\x0c.douyin.Text\x12\x32\n\x10publicAreaCommon\x18\x13 \x01(\x0b\x32\x18.douyin.PublicAreaCommon\x12\x18\n\x10userEnterTipType\x18\x14 \x01(\x04\x12\x1a\n\x12\x61nchorEnterTipType\x18\x15 \x01(\x04\"\xca\x02\n\x0bLikeMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\x12\r\n\x05total\x18\x03 \x01(\x04\x12\r\n\x05\x63olor\x18\x04 \x01(\x04\x12\x1a\n\x04user\x18\x05 \x01(\x0b\x32\x0c.douyin.User\x12\x0c\n\x04icon\x18\x06 \x01(\t\x12\x32\n\x10\x64oubleLikeDetail\x18\x07 \x01(\x0b\x32\x18.douyin.DoubleLikeDetail\x12\x36\n\x12\x64isplayControlInfo\x18\x08 \x01(\x0b\x32\x1a.douyin.DisplayControlInfo\x12\x17\n\x0flinkmicGuestUid\x18\t \x01(\x04\x12\r\n\x05scene\x18\n \x01(\t\x12\x30\n\x0fpicoDisplayInfo\x18\x0b \x01(\x0b\x32\x17.douyin.PicoDisplayInfo\"_\n\x10\x44oubleLikeDetail\x12\x12\n\ndoubleFlag\x18\x01 \x01(\x08\x12\r\n\x05seqId\x18\x02 \x01(\r\x12\x13\n\x0brenewalsNum\x18\x03 \x01(\r\x12\x13\n\x0btriggersNum\x18\x04 \x01(\r\"9\n\x12\x44isplayControlInfo\x12\x10\n\x08showText\x18\x01 \x01(\x08\x12\x11\n\tshowIcons\x18\x02 \x01(\x08\"l\n\x0fPicoDisplayInfo\x12\x15\n\rcomboSumCount\x18\x01 \x01(\x04\x12\r\n\x05\x65moji\x18\x02 \x01(\t\x12 \n\temojiIcon\x18\x03 \x01(\x0b\x32\r.douyin.Image\x12\x11\n\temojiText\x18\x04 \x01(\t\"\xcc\x01\n\rSocialMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x1a\n\x04user\x18\x02 \x01(\x0b\x32\x0c.douyin.User\x12\x11\n\tshareType\x18\x03 \x01(\x04\x12\x0e\n\x06\x61\x63tion\x18\x04 \x01(\x04\x12\x13\n\x0bshareTarget\x18\x05 \x01(\t\x12\x13\n\x0b\x66ollowCount\x18\x06 \x01(\x04\x12\x32\n\x10publicAreaCommon\x18\x07 \x01(\x0b\x32\x18.douyin.PublicAreaCommon\"\x87\x03\n\x12RoomUserSeqMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x38\n\tranksList\x18\x02 \x03(\x0b\x32%.douyin.RoomUserSeqMessageContributor\x12\r\n\x05total\x18\x03 \x01(\x03\x12\x0e\n\x06popStr\x18\x04 \x01(\t\x12\x38\n\tseatsList\x18\x05 \x03(\x0b\x32%.douyin.RoomUserSeqMessageContributor\x12\x12\n\npopularity\x18\x06 \x01(\x03\x12\x11\n\ttotalUser\x18\x07 \x01(\x03\x12\x14\n\x0ctotalUserStr\x18\x08 \x01(\t\x12\x10\n\x08totalStr\x18\t \x01(\t\x12\x1b\n\x13onlineUserForAnchor\x18\n \x01(\t\x12\x18\n\x10totalPvForAnchor\x18\x0b \x01(\t\x12\x17\n\x0fupRightStatsStr\x18\x0c \x01(\t\x12\x1f\n\x17upRightStatsStrComplete\x18\r \x01(\t\"\xa9\x01\n\x1dRoomUserSeqMessageContributor\x12\r\n\x05score\x18\x01 \x01(\x04\x12\x1a\n\x04user\x18\x02 \x01(\x0b\x32\x0c.douyin.User\x12\x0c\n\x04rank\x18\x03 \x01(\x04\x12\r\n\x05\x64\x65lta\x18\x04 \x01(\x04\x12\x10\n\x08isHidden\x18\x05 \x01(\x08\x12\x18\n\x10scoreDescription\x18\x06 \x01(\t\x12\x14\n\x0c\x65xactlyScore\x18\x07 \x01(\t\"@\n\x0e\x43ontrolMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x0e\n\x06status\x18\x02 \x01(\x05\"\xab\x02\n\x19LinkMicBattleFinishMethod\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12&\n\x04info\x18\x02 \x01(\x0b\x32\x18.douyin.BattleFinishInfo\x12\x30\n\x0c\x63ontributors\x18\x03 \x03(\x0b\x32\x1a.douyin.BattleContributors\x12#\n\x06scores\x18\x04 \x03(\x0b\x32\x13.douyin.BattleScore\x12#\n\x07\x61nchors\x18\x0c \x03(\x0b\x32\x12.douyin.BattleArmy\x12-\n\x0bskin_config\x18\x0f \x01(\x0b\x32\x18.douyin.BattleSkinConfig\x12\x1b\n\x13\x65vent_tracking_info\x18\x12 \x01(\t\"\xde\x01\n\x10\x42\x61ttleFinishInfo\x12\x11\n\tbattle_id\x18\x02 \x01(\x04\x12\x15\n\rstart_time_ms\x18\x03 \x01(\x04\x12\x10\n\x08\x64uration\x18\x04 \x01(\x04\x12/\n\x0ctitle_config\x18\x11 \x01(\x0b\x32\x19.douyin.BattleTitleConfig\x12\x31\n\rpunish_config\x18\x12 \x01(\x0b\x32\x1a.douyin.BattlePunishConfig\x12\x1a\n\x12\x62\x61ttle_config_json\x18\' \x01(\t\x12\x0e\n\x06status\x18( \x01(\x04\"\xaa\x01\n\x0b\x42\x61ttleScore\x12\r\n\x05score\x18\x01 \x01(\x04\x12\x0f\n\x07user_id\x18\x02 \x01(\x04\x12\x0c\n\x04rank\x18\x10 \x01(\x04\x12\x13\n\x0b\x64\x65scription\x18\x12 \x01(\t\x12\x18\n\x10team_total_score\x18\x13 \x01(\x04\x12\x12\n\nwin_status\x18\x14 \x01(\r\x12\x11\n\tstatus_21\x18\x15 \x01(\r\x12\x17\n\x0fpart_of_team_id\x18\x18 \x01(\x04\"^\n\nBattleArmy\x12\x11\n\tanchor_id\x18\x01 \x01(\x04\x12&\n\x04list\x18\x02 \x03(\x0b\x32\x18.douyin.BattleAnchorItem\x12\x15\n\ranchor_id_str\x18\x03 \x01(\t\"G\n\x10\x42\x61ttleAnchorItem\x12$\n\x04user\x18\x01 \x01(\x0b\x32\x16.douyin.BattleUserInfo\x12\r\n\x05score\x18\x02 \x01(\x04\"k\n\x12\x42\x61ttleContributors\x12\x11\n\tanchor_id\x18\x01 \x01(\x04\x12+\n\x04list\x18\x02 \x03(\x0b\x32\x1d.douyin.BattleContributorItem\x12\x15\n\ranchor_id_str\x18\x03 \x01(\t\"\x90\x01\n\x15\x42\x61ttleContributorItem\x12\n\n\x02id\x18\x01 \x01(\x04\x12\x10\n\x08nickname\x18\x02 \x01(\t\x12\x1d\n\x06\x61vatar\x18\x03 \x01(\x0b\x32\r.douyin.Image\x12\r\n\x05score\x18\x04 \x01(\x04\x12\x0e\n\x06id_str\x18\x05 \x01(\t\x12\x0c\n\x04rank\x18\x06 \x01(\x04\x12\r\n\x05\x64\x65lta\x18\n \x01(\x04\"S\n\x0e\x42\x61ttleUserInfo\x12\n\n\x02id\x18\x01 \x01(\x04\x12\x10\n\x08nickname\x18\x02 \x01(\t\x12#\n\x0c\x61vatar_thumb\x18\x03 \x01(\x0b\x32\r.douyin.Image\"`\n\x17\x42\x61ttleResultContributor\x12\x11\n\tanchor_id\x18\x01 \x01(\x04\x12\x32\n\x05items\x18\x02 \x03(\x0b\x32#.douyin.BattleResultContributorItem\"\xc0\x01\n\x1b\x42\x61ttleResultContributorItem\x12\x1a\n\x04user\x18\x01 \x01(\x0b\x32\x0c.douyin.User\x12-\n\x07tag_map\x18\x03 \x01(\x0b\x32\x1c.douyin.BattleContributorTag\x12\x12\n\nrank_index\x18\x08 \x01(\x04\x12\r\n\x05\x64\x65lta\x18\n \x01(\x04\x12\x33\n\x0cseason_badge\x18\x0c \x01(\x0b\x32\x1d.douyin.BattleRankSeasonBadge\"2\n\x14\x42\x61ttleContributorTag\x12\x0b\n\x03key\x18\x01 \x01(\x04\x12\r\n\x05value\x18\x02 \x01(\x04\"\x7f\n\x15\x42\x61ttleRankSeasonBadge\x12!\n\nicon_small\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x1f\n\x08icon_big\x18\x02 \x01(\x0b\x32\r.douyin.Image\x12\x11\n\ttitle_str\x18\x03 \x01(\t\x12\x0f\n\x07url_str\x18\x04 \x01(\t\"e\n\x11\x42\x61ttleTitleConfig\x12\x1b\n\x04icon\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x12\n\nscheme_url\x18\x03 \x01(\t\x12\x1f\n\x08new_icon\x18\x07 \x01(\x0b\x32\r.douyin.Image\"w\n\x12\x42\x61ttlePunishConfig\x12\x1b\n\x04icon\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\x12\n\nscheme_url\x18\x03 \x01(\t\x12\x1f\n\x08new_icon\x18\x07 \x01(\x0b\x32\r.douyin.Image\"/\n\x10\x42\x61ttleSkinConfig\x12\x1b\n\x13start_animation_url\x18\x01 \x01(\t\"q\n\rBattleSetting\x12\x11\n\tbattle_id\x18\x01 \x01(\x04\x12\r\n\x05title\x18\x02 \x01(\t\x12\x12\n\nscheme_url\x18\x03 \x01(\t\x12\x18\n\x10scheme_url_extra\x18\x04 \x01(\t\x12\x10\n\x08\x64uration\x18\x05 \x01(\x04\"e\n\nTextEffect\x12*\n\x08portrait\x18\x01 \x01(\x0b\x32\x18.douyin.TextEffectDetail\x12+\n\tlandscape\x18\x02 \x01(\x0b\x32\x18.douyin.TextEffectDetail\"\xb6\x02\n\x10TextEffectDetail\x12\x1a\n\x04text\x18\x01 \x01(\x0b\x32\x0c.douyin.Text\x12\x14\n\x0ctextFontSize\x18\x02 \x01(\r\x12!\n\nbackground\x18\x03 \x01(\x0b\x32\r.douyin.Image\x12\r\n\x05start\x18\x04 \x01(\r\x12\x10\n\x08\x64uration\x18\x05 \x01(\r\x12\t\n\x01x\x18\x06 \x01(\r\x12\t\n\x01y\x18\x07 \x01(\r\x12\r\n\x05width\x18\x08 \x01(\r\x12\x0e\n\x06height\x18\t \x01(\r\x12\x10\n\x08shadowDx\x18\n \x01(\r\x12\x10\n\x08shadowDy\x18\x0b \x01(\r\x12\x14\n\x0cshadowRadius\x18\x0c \x01(\r\x12\x13\n\x0bshadowColor\x18\r \x01(\t\x12\x13\n\x0bstrokeColor\x18\x0e \x01(\t\x12\x13\n\x0bstrokeWidth\x18\x0f \x01(\r\"|\n\x04Text\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x15\n\rdefaultPatter\x18\x02 \x01(\t\x12)\n\rdefaultFormat\x18\x03 \x01(\x0b\x32\x12.douyin.TextFormat\x12%\n\npiecesList\x18\x04 \x03(\x0b\x32\x11.douyin.TextPiece\"\xb4\x02\n\tTextPiece\x12\x0c\n\x04type\x18\x01 \x01(\x08\x12\"\n\x06\x66ormat\x18\x02 \x01(\x0b\x32\x12.douyin.TextFormat\x12\x13\n\x0bstringValue\x18\x03 \x01(\t\x12(\n\tuserValue\x18\x04 \x01(\x0b\x32\x15.douyin.TextPieceUser\x12(\n\tgiftValue\x18\x05 \x01(\x0b\x32\x15.douyin.TextPieceGift\x12*\n\nheartValue\x18\x06 \x01(\x0b\x32\x16.douyin.TextPieceHeart\x12\x34\n\x0fpatternRefValue\x18\x07 \x01(\x0b\x32\x1b.douyin.TextPiecePatternRef\x12*\n\nimageValue\x18\x08 \x01(\x0b\x32\x16.douyin.TextPieceImage\"C\n\x0eTextPieceImage\x12\x1c\n\x05image\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x13\n\x0bscalingRate\x18\x02 \x01(\x02\":\n\x13TextPiecePatternRef\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x16\n\x0e\x64\x65\x66\x61ultPattern\x18\x02 \x01(\t\"\x1f\n\x0eTextPieceHeart\x12\r\n\x05\x63olor\x18\x01 \x01(\t\"D\n\rTextPieceGift\x12\x0e\n\x06giftId\x18\x01 \x01(\x04\x12#\n\x07nameRef\x18\x02 \x01(\x0b\x32\x12.douyin.PatternRef\"1\n\nPatternRef\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x16\n\x0e\x64\x65\x66\x61ultPattern\x18\x02 \x01(\t\">\n\rTextPieceUser\x12\x1a\n\x04user\x18\x01 \x01(\x0b\x32\x0c.douyin.User\x12\x11\n\twithColon\x18\x02 \x01(\x08\"\xa3\x01\n\nTextFormat\x12\r\n\x05\x63olor\x18\x01 \x01(\t\x12\x0c\n\x04\x62old\x18\x02 \x01(\x08\x12\x0e\n\x06italic\x18\x03 \x01(\x08\x12\x0e\n\x06weight\x18\x04 \x01(\r\x12\x13\n\x0bitalicAngle\x18\x05 \x01(\r\x12\x10\n\x08\x66ontSize\x18\x06 \x01(\r\x12\x1a\n\x12useHeighLightColor\x18\x07 \x01(\x08\x12\x15\n\ruseRemoteClor\x18\x08 \x01(\x08\"\x96\x05\n\x0c\x45\x66\x66\x65\x63tConfig\x12\x0c\n\x04type\x18\x01 \x01(\x04\x12\x1b\n\x04icon\x18\x02 \x01(\x0b\x32\r.douyin.Image\x12\x11\n\tavatarPos\x18\x03 \x01(\x04\x12\x1a\n\x04text\x18\x04 \x01(\x0b\x32\x0c.douyin.Text\x12\x1f\n\x08textIcon\x18\x05 \x01(\x0b\x32\r.douyin.Image\x12\x10\n\x08stayTime\x18\x06 \x01(\r\x12\x13\n\x0b\x61nimAssetId\x18\x07 \x01(\x04\x12\x1c\n\x05\x62\x61\x64ge\x18\x08 \x01(\x0b\x32\r.douyin.Image\x12\x1c\n\x14\x66lexSettingArrayList\x18\t \x03(\x04\x12&\n\x0ftextIconOverlay\x18\n \x01(\x0b\x32\r.douyin.Image\x12$\n\ranimatedBadge\x18\x0b \x01(\x0b\x32\r.douyin.Image\x12\x15\n\rhasSweepLight\x18\x0c \x01(\x08\x12 \n\x18textFlexSettingArrayList\x18\r \x03(\x04\x12\x19\n\x11\x63\x65nterAnimAssetId\x18\x0e \x01(\x04\x12#\n\x0c\x64ynamicImage\x18\x0f \x01(\x0b\x32\r.douyin.Image\x12\x34\n\x08\x65xtraMap\x18\x10 \x03(\x0b\x32\".douyin.EffectConfig.ExtraMapEntry\x12\x16\n\x0emp4AnimAssetId\x18\x11 \x01(\x04\x12\x10\n\x08priority\x18\x12 \x01(\x04\x12\x13\n\x0bmaxWaitTime\x18\x13 \x01(\x04\x12\x0f\n\x07\x64ressId\x18\x14 \x01(\t\x12\x11\n\talignment\x18\x15 \x01(\x04\x12\x17\n\x0f\x61lignmentOffset\x18\x16 \x01(\x04\x1a/\n\rExtraMapEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"n\n\x10PublicAreaCommon\x12 \n\tuserLabel\x18\x01 \x01(\x0b\x32\r.douyin.Image\x12\x19\n\x11userConsumeInRoom\x18\x02 \x01(\x04\x12\x1d\n\x15userSendGiftCntInRoom\x18\x03 \x01(\x04\"\xa1\x01\n\x13LandscapeAreaCommon\x12\x10\n\x08showHead\x18\x01 \x01(\x08\x12\x14\n\x0cshowNickname\x18\x02 \x01(\x08\x12\x15\n\rshowFontColor\x18\x03 \x01(\x08\x12\x16\n\x0e\x63olorValueList\x18\x04 \x03(\t\x12\x33\n\x13\x63ommentTypeTagsList\x18\x05 \x03(\x0e\x32\x16.douyin.CommentTypeTag\"\xed\x01\n\x10RoomStatsMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x14\n\x0c\x64isplayShort\x18\x02 \x01(\t\x12\x15\n\rdisplayMiddle\x18\x03 \x01(\t\x12\x13\n\x0b\x64isplayLong\x18\x04 \x01(\t\x12\x14\n\x0c\x64isplayValue\x18\x05 \x01(\x03\x12\x16\n\x0e\x64isplayVersion\x18\x06 \x01(\x03\x12\x13\n\x0bincremental\x18\x07 \x01(\x08\x12\x10\n\x08isHidden\x18\x08 \x01(\x08\x12\r\n\x05total\x18\t \x01(\x03\x12\x13\n\x0b\x64isplayType\x18\n \x01(\x03\"\xb7\x01\n\x0fRoomRankMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x33\n\tranksList\x18\x02 \x03(\x0b\x32 .douyin.RoomRankMessage.RoomRank\x1aO\n\x08RoomRank\x12\x1a\n\x04user\x18\x01 \x01(\x0b\x32\x0c.douyin.User\x12\x10\n\x08scoreStr\x18\x02 \x01(\t\x12\x15\n\rprofileHidden\x18\x03 \x01(\x08\"p\n\x0f\x46\x61nsclubMessage\x12\"\n\ncommonInfo\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x0c\n\x04type\x18\x02 \x01(\x05\x12\x0f\n\x07\x63ontent\x18\x03 \x01(\t\x12\x1a\n\x04user\x18\x04 \x01(\x0b\x32\x0c.douyin.User\"\x89\x01\n\x16UpdateFanTicketMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x1e\n\x16roomFanTicketCountText\x18\x02 \x01(\t\x12\x1a\n\x12roomFanTicketCount\x18\x03 \x01(\x04\x12\x13\n\x0b\x66orceUpdate\x18\x04 \x01(\x08\"\x97\x01\n\x1bRoomStreamAdaptationMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x16\n\x0e\x61\x64\x61ptationType\x18\x02 \x01(\x05\x12\x1d\n\x15\x61\x64\x61ptationHeightRatio\x18\x03 \x01(\x02\x12!\n\x19\x61\x64\x61ptationBodyCenterRatio\x18\x04 \x01(\x02\"\xb3\x03\n\x1dWebcastLotteryEventNewMessage\x12\x1e\n\x06\x63ommon\x18\x01 \x01(\x0b\x32\x0e.douyin.Common\x12\x11\n\tlotteryId\x18\x02 \x01(\x04\x12\x0e\n\x06status\x18\x03 \x01(\x04\x12\x11\n\tstartTime\x18\x04 \x01(\x04\x12\x0f\n\x07\x65ndTime\x18\x05 \x01(\x04\x12\x17\n\x0f\x63\x61lculationTime\x18\x06 \x01(\x04\x12\x13\n\x0brulePageUrl\x18\x07 \x01(\t\x12\x11\n\teventType\x18\x08 \x01(\x04\x12\x12\n\nextraBytes\x18\n \x01(\x0c\x12)\n\x08ruleInfo\x18\x0b \x03(\x0b\x32\x17.douyin.LotteryRuleInfo\x12\x13\n\x0blotteryType\x18\x0c \x01(\x04\x12\x13\n\x0bwinnerCount\x18\r \x01(\x04\x12\x14\n\x0c\x63urrentStock\x18\x0e \x01(\x04\x12\x11\n\tprizeName\x18\x12 \x01(\t\x12\x18\n\x10prizeDescription\x18\x13 \x01(\t\x12\x11\n\tcountdown\x18\x14 \x01(\x04\x12+\n\x0b\x63ontentList\x18\x15 \x03(\x0b\x32\x16.douyin.LotteryContent\"-\n\x0fLotteryRuleInfo\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t\">\n\x0eLotteryContent\x12\x0c\n\x04type\x18\x01 \x01(\x04\x12\x0f\n\x07\x63ontent\x18\x02 \x01(\t\x12\r\n\x05value\x18\x03 \x01(\x04*C\n\x0e\x43ommentTypeTag\x12\x19\n\x15\x43OMMENTTYPETAGUNKNOWN\x10\x00\x12\x16\n\x12\x43OMMENTTYPETAGSTAR\x10\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'douyin_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_RESPONSE_ROUTEPARAMSENTRY']._loaded_options = None
+  _globals['_RESPONSE_ROUTEPARAMSENTRY']._serialized_options = b'8\001'
+  _globals['_FANSCLUB_PREFERDATAENTRY']._loaded_options = None
+  _globals['_FANSCLUB_PREFERDATAENTRY']._serialized_options = b'8\001'
+  _globals['_USERBADGE_ICONSENTRY']._loaded_options = None
+  _globals['_USERBADGE_ICONSENTRY']._serialized_options = b'8\001'
+  _globals['_EFFECTCONFIG_EXTRAMAPENTRY']._loaded_options = None
+  _globals['_EFFECTCONFIG_EXTRAMAPENTRY']._serialized_options = b'8\001'
+  _globals['_COMMENTTYPETAG']._serialized_start=14025
+  _globals['_COMMENTTYPETAG']._serialized_end=14092
+  _globals['_PUSHFRAME']._serialized_start=25
+  _globals['_PUSHFRAME']._serialized_end=204
+  _globals['_MESSAGE']._serialized_start=207
+  _globals['_MESSAGE']._serialized_end=361
+  _globals['_RESPONSE']._serialized_start=364
+  _globals['_RESPONSE']._serialized_end=720
+  _globals['_RESPONSE_ROUTEPARAMSENTRY']._serialized_start=670
+  _globals['_RESPONSE_ROUTEPARAMSENTRY']._serialized_end=720
+  _globals['_HEADERSLIST']._serialized_start=722
+  _globals['_HEADERSLIST']._serialized_end=763
+  _globals['_COMMON']._serialized_start=766
+  _globals['_COMMON']._serialized_end=1231
+  _globals['_USER']._serialized_start=1234
+  _globals['_USER']._serialized_end=2033
+  _globals['_IMAGE']._serialized_start=2036
+  _globals['_IMAGE']._serialized_end=2224
+  _globals['_IMAGECONTENT']._serialized_start=2226
+  _globals['_IMAGECONTENT']._serialized_end=2313
+  _globals['_FOLLOWINFO']._serialized_start=2316
+  _globals['_FOLLOWINFO']._serialized_end=2490
+  _globals['_PAYGRADE']._serialized_start=2493
+  _globals['_PAYGRADE']._serialized_end=3359
+  _globals['_GRADEICON']._serialized_start=3361
+  _globals['_GRADEICON']._serialized_end=3455
+  _globals['_GRADEBUFFINFO']._serialized_start=3457
+  _globals['_GRADEBUFFINFO']._serialized_end=3472
+  _globals['_FANSCLUB']._serialized_start=3475
+  _globals['_FANSCLUB']._serialized_end=3648
+  _globals['_FANSCLUB_PREFERDATAENTRY']._serialized_start=3577
+  _globals['_FANSCLUB_PREFERDATAENTRY']._serialized_end=3648
+  _globals['_FANSCLUBDATA']._serialized_start=3651
+  _globals['_FANSCLUBDATA']._serialized_end=3804
+  _globals['_USERBADGE']._serialized_start=3807
+  _globals['_USERBADGE']._serialized_end=3939
+  _globals['_USERBADGE_ICONSENTRY']._serialized_start=3880
+  _globals['_USERBADGE_ICONSENTRY']._serialized_end=3939
+  _globals['_CHATMESSAGE']._serialized_start=3942
+  _globals['_CHATMESSAGE']._serialized_end=4550
+  _globals['_GIFTMESSAGE']._serialized_start=4553
+  _globals['_GIFTMESSAGE']._serialized_end=5358
+  _globals['_GIFTTRAYINFO']._serialized_start=5361
+  _globals['_GIFTTRAYINFO']._serialized_end=5688
+  _globals['_GIFTTRAYINFO_TRAYEFFECT']._serialized_start=5614
+  _globals['_GIFTTRAYINFO_TRAYEFFECT']._serialized_end=5688
+  _globals['_GIFTSTRUCT']._serialized_start=5691
+  _globals['_GIFTSTRUCT']._serialized_end=6110
+  _globals['_GIFTIMPRIORITY']._serialized_start=6112
+  _globals['_GIFTIMPRIORITY']._serialized_end=6197
+  _globals['_MEMBERMESSAGE']._serialized_start=6200
+  _globals['_MEMBERMESSAGE']._serialized_end=6823
+  _globals['_LIKEMESSAGE']._serialized_start=6826
+  _globals['_LIKEMESSAGE']._serialized_end=7156
+  _globals['_DOUBLELIKEDETAIL']._serialized_start=7158
+  _globals['_DOUBLELIKEDETAIL']._serialized_end=7253
+  _globals['_DISPLAYCONTROLINFO']._serialized_start=7255
+  _globals['_DISPLAYCONTROLINFO']._serialized_end=7312
+  _globals['_PICODISPLAYINFO']._serialized_start=7314
+  _globals['_PICODISPLAYINFO']._serialized_end=7422
+  _globals['_SOCIALMESSAGE']._serialized_start=7425
+  _globals['_SOCIALMESSAGE']._serialized_end=7629
+  _globals['_ROOMUSERSEQMESSAGE']._serialized_start=7632
+  _globals['_ROOMUSERSEQMESSAGE']._serialized_end=8023
+  _globals['_ROOMUSERSEQMESSAGECONTRIBUTOR']._serialized_start=8026
+  _globals['_ROOMUSERSEQMESSAGECONTRIBUTOR']._serialized_end=8195
+  _globals['_CONTROLMESSAGE']._serialized_start=8197
+  _globals['_CONTROLMESSAGE']._serialized_end=8261
+  _globals['_LINKMICBATTLEFINISHMETHOD']._serialized_start=8264
+  _globals['_LINKMICBATTLEFINISHMETHOD']._serialized_end=8563
+  _globals['_BATTLEFINISHINFO']._serialized_start=8566
+  _globals['_BATTLEFINISHINFO']._serialized_end=8788
+  _globals['_BATTLESCORE']._serialized_start=8791
+  _globals['_BATTLESCORE']._serialized_end=8961
+  _globals['_BATTLEARMY']._serialized_start=8963
+  _globals['_BATTLEARMY']._serialized_end=9057
+  _globals['_BATTLEANCHORITEM']._serialized_start=9059
+  _globals['_BATTLEANCHORITEM']._serialized_end=9130
+  _globals['_BATTLECONTRIBUTORS']._serialized_start=9132
+  _globals['_BATTLECONTRIBUTORS']._serialized_end=9239
+  _globals['_BATTLECONTRIBUTORITEM']._serialized_start=9242
+  _globals['_BATTLECONTRIBUTORITEM']._serialized_end=9386
+  _globals['_BATTLEUSERINFO']._serialized_start=9388
+  _globals['_BATTLEUSERINFO']._serialized_end=9471
+  _globals['_BATTLERESULTCONTRIBUTOR']._serialized_start=9473
+  _globals['_BATTLERESULTCONTRIBUTOR']._serialized_end=9569
+  _globals['_BATTLERESULTCONTRIBUTORITEM']._serialized_start=9572
+  _globals['_BATTLERESULTCONTRIBUTORITEM']._serialized_end=9764
+  _globals['_BATTLECONTRIBUTORTAG']._serialized_start=9766
+  _globals['_BATTLECONTRIBUTORTAG']._serialized_end=9816
+  _globals['_BATTLERANKSEASONBADGE']._serialized_start=9818
+  _globals['_BATTLERANKSEASONBADGE']._serialized_end=9945
+  _globals['_BATTLETITLECONFIG']._serialized_start=9947
+  _globals['_BATTLETITLECONFIG']._serialized_end=10048
+  _globals['_BATTLEPUNISHCONFIG']._serialized_start=10050
+  _globals['_BATTLEPUNISHCONFIG']._serialized_end=10169
+  _globals['_BATTLESKINCONFIG']._serialized_start=10171
+  _globals['_BATTLESKINCONFIG']._serialized_end=10218
+  _globals['_BATTLESETTING']._serialized_start=10220
+  _globals['_BATTLESETTING']._serialized_end=10333
+  _globals['_TEXTEFFECT']._serialized_start=10335
+  _globals['_TEXTEFFECT']._serialized_end=10436
+  _globals['_TEXTEFFECTDETAIL']._serialized_start=10439
+  _globals['_TEXTEFFECTDETAIL']._serialized_end=10749
+  _globals['_TEXT']._serialized_start=10751
+  _globals['_TEXT']._serialized_end=10875
+  _globals['_TEXTPIECE']._serialized_start=10878
+  _globals['_TEXTPIECE']._serialized_end=11186
+  _globals['_TEXTPIECEIMAGE']._serialized_start=11188
+  _globals['_TEXTPIECEIMAGE']._serialized_end=11255
+  _globals['_TEXTPIECEPATTERNREF']._serialized_start=11257
+  _globals['_TEXTPIECEPATTERNREF']._serialized_end=11315
+  _globals['_TEXTPIECEHEART']._serialized_start=11317
+  _globals['_TEXTPIECEHEART']._serialized_end=11348
+  _globals['_TEXTPIECEGIFT']._serialized_start=11350
+  _globals['_TEXTPIECEGIFT']._serialized_end=11418
+  _globals['_PATTERNREF']._serialized_start=11420
+  _globals['_PATTERNREF']._serialized_end=11469
+  _globals['_TEXTPIECEUSER']._serialized_start=11471
+  _globals['_TEXTPIECEUSER']._serialized_end=11533
+  _globals['_TEXTFORMAT']._serialized_start=11536
+  _globals['_TEXTFORMAT']._serialized_end=11699
+  _globals['_EFFECTCONFIG']._serialized_start=11702
+  _globals['_EFFECTCONFIG']._serialized_end=12364
+  _globals['_EFFECTCONFIG_EXTRAMAPENTRY']._serialized_start=12317
+  _globals['_EFFECTCONFIG_EXTRAMAPENTRY']._serialized_end=12364
+  _globals['_PUBLICAREACOMMON']._serialized_start=12366
+  _globals['_PUBLICAREACOMMON']._serialized_end=12476
+  _globals['_LANDSCAPEAREACOMMON']._serialized_start=12479
+  _globals['_LANDSCAPEAREACOMMON']._serialized_end=12640
+  _globals['_ROOMSTATSMESSAGE']._serialized_start=12643
+  _globals['_ROOMSTATSMESSAGE']._serialized_end=12880
+  _globals['_ROOMRANKMESSAGE']._serialized_start=12883
+  _globals['_ROOMRANKMESSAGE']._serialized_end=13066
+  _globals['_ROOMRANKMESSAGE_ROOMRANK']._serialized_start=12987
+  _globals['_ROOMRANKMESSAGE_ROOMRANK']._serialized_end=13066
+  _globals['_FANSCLUBMESSAGE']._serialized_start=13068
+  _globals['_FANSCLUBMESSAGE']._serialized_end=13180
+  _globals['_UPDATEFANTICKETMESSAGE']._serialized_start=13183
+  _globals['_UPDATEFANTICKETMESSAGE']._serialized_end=13320
+  _globals['_ROOMSTREAMADAPTATIONMESSAGE']._serialized_start=13323
+  _globals['_ROOMSTREAMADAPTATIONMESSAGE']._serialized_end=13474
+  _globals['_WEBCASTLOTTERYEVENTNEWMESSAGE']._serialized_start=13477
+  _globals['_WEBCASTLOTTERYEVENTNEWMESSAGE']._serialized_end=13912
+  _globals['_LOTTERYRULEINFO']._serialized_start=13914
+  _globals['_LOTTERYRULEINFO']._serialized_end=13959
+  _globals['_LOTTERYCONTENT']._serialized_start=13961
+  _globals['_LOTTERYCONTENT']._serialized_end=14023
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,108 @@
+# reconnect.py
+"""
+直播间闪断重连策略
+
+录制任务结束时由完成回调立即安排重连，不再等下一次 20 秒的 Monitor 扫描：
+- 退避: 带抖动的指数退避 (full jitter)，第 n 次重连等待 uniform(0, min(cap, base * 2^n)) 秒
+- 预算: 每个直播间在 window 秒内最多重连 budget 次，用完后交给 Monitor 扫描处理
+- 指标: 断开 -> 重新连上 WebSocket 的耗时 (time-to-reconnect) 直方图
+
+配置: RECONNECT_BASE (默认 1s)、RECONNECT_CAP (默认 30s)、
+      RECONNECT_BUDGET (默认 5 次)、RECONNECT_WINDOW (默认 600s)
+"""
+import logging
+import os
+import random
+import time
+from collections import Counter, deque
+
+from frame_decompressor import Histogram
+
+logger = logging.getLogger("Reconnect")
+
+# 录制任务结束原因 (start_recorder_task 的返回值)
+END_DISCONNECTED = 'disconnected'   # 连接意外断开，需要重连
+END_STREAM = 'stream_end'           # 收到下播信号 / 已确认下播
+END_LEASE_LOST = 'lease_lost'       # 租约被其他节点接管
+END_NO_ROOM = 'no_room'             # 获取不到房间信息，放弃录制
+END_ROOM_CHANGED = 'room_changed'   # Monitor 显示已换场
+
+TTR_BUCKETS = (0.5, 1, 2, 5, 10, 20, 60)   # 秒
+
+
+class ReconnectBackoff:
+    """
+    单个直播间的退避与重连预算
+    :param base: 退避基数 (秒)
+    :param cap: 单次退避上限 (秒)
+    :param budget: window 秒内允许的最大重连次数
+    :param window: 预算统计窗口 (秒)
+    """
+
+    def __init__(self, base=None, cap=None, budget=None, window=None):
+        self.base = base or float(os.environ.get('RECONNECT_BASE', 1))
+        self.cap = cap or float(os.environ.get('RECONNECT_CAP', 30))
+        self.budget = budget or int(os.environ.get('RECONNECT_BUDGET', 5))
+        self.window = window or float(os.environ.get('RECONNECT_WINDOW', 600))
+        self._attempts = deque()
+
+    def next_delay(self):
+        """返回下一次重连前的等待秒数；预算用完时返回 None"""
+        now = time.monotonic()
+        while self._attempts and now - self._attempts[0] > self.window:
+            self._attempts.popleft()
+        if len(self._attempts) >= self.budget:
+            return None
+        delay = random.uniform(0, min(self.cap, self.base * 2 ** len(self._attempts)))
+        self._attempts.append(now)
+        return delay
+
+    def recent(self):
+        return len(self._attempts)
+
+
+class ReconnectStats:
+    def __init__(self):
+        self.scheduled = 0
+        self.reconnected = 0
+        self.exhausted = 0
+        self.ends = Counter()          # 结束原因 -> 次数
+        self.last_ttr = 0.0
+        self.max_ttr = 0.0
+        self._ttr_sum = 0.0
+        self.ttr_hist = Histogram(TTR_BUCKETS)
+
+    def record_end(self, reason):
+        self.ends[reason] += 1
+
+    def record_reconnect(self, ttr):
+        """记录一次 time-to-reconnect (秒)"""
+        self.reconnected += 1
+        self.last_ttr = ttr
+        self._ttr_sum += ttr
+        if ttr > self.max_ttr:
+            self.max_ttr = ttr
+        self.ttr_hist.add(ttr)
+
+    def stats(self) -> dict:
+        return {
+            'scheduled': self.scheduled,
+            'reconnected': self.reconnected,
+            'exhausted': self.exhausted,
+            'ends': dict(self.ends),
+            'ttr_s': round(self.last_ttr, 2),
+            'avg_ttr_s': round(self._ttr_sum / max(1, self.reconnected), 2),
+            'max_ttr_s': round(self.max_ttr, 2),
+            'ttr': self.ttr_hist.snapshot(),
+        }
+
+
+# --- 进程级单例 ---
+_stats = None
+
+
+def get_reconnect_stats() -> ReconnectStats:
+    global _stats
+    if _stats is None:
+        _stats = ReconnectStats()
+    return _stats
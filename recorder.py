@@ -0,0 +1,303 @@
+# recorder.py
+"""
+录制任务编排 (main.py 与 supervisor worker 共用)
+
+recording_tasks 记录本进程的录制任务；reconcile_rooms 按 Monitor 的最新直播列表启动 / 结算 / 重连 / 迁移。
+本模块导入时没有副作用 (不配置日志、不创建文件)，各入口进程自行配置日志后再导入使用。
+"""
+import asyncio
+import functools
+import logging
+import time
+
+from liveMan import AsyncDouyinLiveWebFetcher
+from message_handler import get_response_scanner
+from ingest_queue import get_ingest_stats
+from signer import get_signer, get_abogus_engine
+from frame_decompressor import get_decompressor
+from room_lease import get_lease_manager
+from resume_cursor import get_resume_store
+from heartbeat_scheduler import get_heartbeat_scheduler
+from connection_manager import get_connections
+from reconnect import (ReconnectBackoff, get_reconnect_stats,
+                       END_DISCONNECTED, END_STREAM, END_ROOM_CHANGED)
+
+logger = logging.getLogger("Recorder")
+
+# --- 全局任务字典 ---
+# Key: web_rid, Value: {task, room_id, nickname, info (最近一次 Monitor 数据), backoff, disconnected_at}
+recording_tasks = {}
+
+async def settle_room(db, room_id, nickname):
+    """【新增】封装结算逻辑；结算后旧场不会再被读取，移出缓存"""
+    if not room_id: return
+    try:
+        status = await db.get_room_live_status(room_id, fresh=True)
+        if status != 4:
+            logger.info(f"🛑 [智能结算] 判定直播结束，正在结算: {nickname} ({room_id})")
+            await db.set_room_ended(room_id)
+        db.room_cache.invalidate(room_id)
+    except Exception as e:
+        logger.error(f"❌ 结算异常: {e}")
+
+async def start_recorder_task(web_rid, nickname, start_follower_count, db, gift_processor, monitor_data=None, session=None, lease=None, on_connected=None):
+    """单个直播间录制任务的包装器，返回结束原因 (reconnect.END_*)；被取消时返回 None"""
+    fetcher = None
+    reason = None
+    try:
+        logger.info(f"🚀 [任务启动] {nickname} ({web_rid})")
+        fetcher = AsyncDouyinLiveWebFetcher(
+            live_id=web_rid,
+            db=db,
+            gift_processor=gift_processor,
+            start_follower_count=start_follower_count,
+            initial_state=monitor_data,
+            session=session,
+            lease=lease,
+            on_connected=on_connected
+        )
+        await fetcher.start()
+        reason = fetcher.end_reason or END_DISCONNECTED
+    except asyncio.CancelledError:
+        logger.info(f"🛑 [任务取消] {nickname}")
+    except Exception as e:
+        logger.error(f"💥 [任务异常] {nickname}: {e}")
+        reason = END_DISCONNECTED
+    finally:
+        if fetcher: await fetcher.stop()
+        logger.info(f"🏁 [任务结束] {nickname}")
+    return reason
+
+def launch_recorder(web_rid, user_info, db, gift_processor, session, delay=0):
+    """创建录制任务并挂上完成回调：连接意外断开时由回调立即安排重连，不等下一次扫描"""
+    leases = get_lease_manager()
+    task = asyncio.create_task(
+        _run_recorder(web_rid, user_info, db, gift_processor, session, delay,
+                      lease=leases.handle(web_rid) if leases else None)
+    )
+    task.add_done_callback(functools.partial(_on_recorder_done, web_rid, db, gift_processor, session))
+    return task
+
+async def _run_recorder(web_rid, user_info, db, gift_processor, session, delay, lease):
+    if delay:
+        await asyncio.sleep(delay)
+        # 退避期间 Monitor 已确认下播 / 换场：不再重连，交给扫描结算
+        task_info = recording_tasks.get(web_rid)
+        user_info = task_info and task_info.get('info')
+        if not user_info:
+            return END_STREAM
+        if str(user_info.get('room_id')) != task_info['room_id']:
+            return END_ROOM_CHANGED
+        if await db.get_room_live_status(task_info['room_id'], fresh=True) == 4:
+            return END_STREAM
+
+    return await start_recorder_task(
+        web_rid, user_info.get('nickname'),
+        user_info.get('follower_count', 0),
+        db, gift_processor,
+        monitor_data=user_info,
+        session=session,
+        lease=lease,
+        on_connected=functools.partial(_on_recorder_connected, web_rid)
+    )
+
+def _on_recorder_done(web_rid, db, gift_processor, session, task):
+    """录制任务完成回调：只对意外断开安排带抖动退避的重连，其余情况交给 Monitor 扫描确认"""
+    task_info = recording_tasks.get(web_rid)
+    # 已被释放 / 替换，或被取消 (退出、迁移)
+    if not task_info or task_info['task'] is not task or task.cancelled():
+        return
+    reason = END_DISCONNECTED if task.exception() else task.result()
+    if reason is None:
+        return
+    stats = get_reconnect_stats()
+    stats.record_end(reason)
+    if reason != END_DISCONNECTED:
+        return
+
+    nickname = task_info['nickname']
+    task_info.setdefault('disconnected_at', time.monotonic())
+    backoff = task_info['backoff']
+    delay = backoff.next_delay()
+    if delay is None:
+        stats.exhausted += 1
+        logger.warning(f"⛔ [重连预算用完] {backoff.window:.0f}s 内已重连 {backoff.budget} 次，等待 Monitor 扫描: {nickname}")
+        return
+
+    stats.scheduled += 1
+    logger.warning(f"♻️ [闪断恢复] {delay:.1f}s 后重连 (第 {backoff.recent()} 次): {nickname}")
+    task_info['task'] = launch_recorder(web_rid, task_info['info'], db, gift_processor, session, delay=delay)
+
+def _on_recorder_connected(web_rid):
+    """WebSocket 连上时记录 time-to-reconnect"""
+    task_info = recording_tasks.get(web_rid)
+    if task_info and task_info.get('disconnected_at') is not None:
+        ttr = time.monotonic() - task_info.pop('disconnected_at')
+        get_reconnect_stats().record_reconnect(ttr)
+        logger.info(f"🔗 [重连成功] 断开 {ttr:.1f}s 后恢复: {task_info['nickname']}")
+
+async def zombie_cleaner(db_handler):
+    """延迟启动的看门狗"""
+    logger.info("🐶 [看门狗] 正在待命，将在 5分钟 后开始首次清理...")
+    await asyncio.sleep(300) # <--- 关键：启动后先睡 5 分钟，给 LiveMan 重连的时间
+    
+    while True:
+        try:
+            # 正常循环，每 60 秒检查一次
+            await db_handler.clear_zombie_rooms(timeout_seconds=180) 
+        except Exception as e:
+            logger.error(f"❌ 看门狗报错: {e}")
+        await asyncio.sleep(60)
+async def release_room(web_rid, db):
+    """取消本进程对某个直播间的录制，但不结算 (房间仍在直播，只是交给了别的进程)"""
+    task_info = recording_tasks.pop(web_rid, None)
+    if not task_info:
+        return
+    logger.info(f"🔀 [迁移] 释放直播间: {task_info['nickname']} ({web_rid})")
+    task = task_info['task']
+    if not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    # 断开时 fetcher 已把续传状态写入 Redis，接管的进程从那里续传
+    get_resume_store().discard(web_rid)
+    # 之后由接管的进程写 rooms，本进程的缓存不再可信
+    db.room_cache.invalidate(task_info['room_id'])
+
+async def reconcile_rooms(current_live_map, db, gift_processor, session, owned_elsewhere=()):
+    """
+    根据最新直播列表调整本进程的录制任务
+    :param current_live_map: {web_rid: user_info}，本进程负责的直播间
+    :param owned_elsewhere: 仍在直播但归其他进程负责的 web_rid (supervisor 模式)，直接释放，不做结算
+    """
+    leases = get_lease_manager()
+
+    # --- 阶段 0: 释放已分配给其他进程的直播间 ---
+    for web_rid in list(recording_tasks.keys()):
+        if web_rid in owned_elsewhere:
+            await release_room(web_rid, db)
+            if leases:
+                await leases.release(web_rid)
+
+    # 多节点模式：续期租约，已被其他节点接管的直播间直接释放
+    if leases:
+        for web_rid in await leases.renew_many(list(recording_tasks.keys())):
+            await release_room(web_rid, db)
+
+    # 刷新 Monitor 情报，退避中的重连据此判断是否已下播 / 换场
+    for web_rid, task_info in recording_tasks.items():
+        task_info['info'] = current_live_map.get(web_rid)
+
+    # --- 阶段 A: 确认已结束的任务 (闪断已由完成回调重连，这里只剩下播 / 换场 / 重连预算用完) ---
+    for web_rid in list(recording_tasks.keys()):
+        task_info = recording_tasks[web_rid]
+        task = task_info['task']
+        old_room_id = task_info['room_id']
+        nickname = task_info['nickname']
+
+        # 【原则】：Monitor 没权杀任务，只有任务自己结束(done)了，我们才处理
+        if not task.done():
+            continue
+
+        # ====================================================
+        # 代码运行到这里，说明 WS 已经断开了
+        # ====================================================
+
+        # 1. 检查异常
+        if not task.cancelled() and task.exception():
+            logger.warning(f"💥 [异常断开] {nickname}: {task.exception()}")
+
+        # 2. 获取 Monitor 的最新情报
+        latest_info = current_live_map.get(web_rid)
+
+        # 获取数据库里的最终状态
+        db_status = await db.get_room_live_status(old_room_id, fresh=True)
+
+        # --- 分支 1: 真正下播 ---
+        if db_status == 4 or not latest_info:
+            logger.info(f"👋 [确认下播] 任务自然结束: {nickname}")
+            await settle_room(db, old_room_id, nickname)
+            del recording_tasks[web_rid]
+            get_resume_store().discard(web_rid)
+            if leases:
+                await leases.release(web_rid)
+            continue
+
+        # --- 分支 2: 换场 (Monitor 显示房间号变了) ---
+        new_room_id = str(latest_info.get('room_id'))
+        if new_room_id and new_room_id != old_room_id:
+            logger.info(f"🔄 [换场] 旧场结束，准备录制新场: {nickname}")
+            await settle_room(db, old_room_id, nickname)
+            del recording_tasks[web_rid]
+            get_resume_store().discard(web_rid)
+            if leases:
+                await leases.release(web_rid)
+            continue
+
+        # --- 分支 3: 重连预算用完但 Monitor 显示还在播 ---
+        logger.warning(f"♻️ [闪断恢复] WS断开但Monitor显示在线，立即重启: {nickname}")
+        task_info['task'] = launch_recorder(web_rid, latest_info, db, gift_processor, session)
+
+    # --- 阶段 B: 检查新增直播 (启动新任务) ---
+    # ✅ 【新增】如果 monitor 没过滤干净，这里坚决不能放行
+    new_rooms = [web_rid for web_rid, user_info in current_live_map.items()
+                 if web_rid and web_rid not in recording_tasks and user_info.get('live_status') == 1]
+
+    # 多节点模式：只启动本节点认领到租约的直播间 (按容量与公平份额)
+    if leases:
+        new_rooms = await leases.claim_many(new_rooms, total_live=len(current_live_map))
+
+    for web_rid in new_rooms:
+        user_info = current_live_map[web_rid]
+        nickname = user_info.get('nickname')
+        room_id = str(user_info.get('room_id'))
+        # 刚认领 / 分配到的直播间此前可能由其他进程写入 rooms，丢弃本进程的旧缓存
+        db.room_cache.invalidate(room_id)
+
+        recording_tasks[web_rid] = {
+            "task": launch_recorder(web_rid, user_info, db, gift_processor, session),
+            "room_id": room_id,
+            "nickname": nickname,
+            "info": user_info,
+            "backoff": ReconnectBackoff()
+        }
+
+def runtime_stats() -> dict:
+    """本进程的运行统计 (签名 / 预筛 / 解压 / 入站队列)"""
+    return {
+        'recording': len(recording_tasks),
+        'sign': get_signer().stats(),
+        'a_bogus': get_abogus_engine().stats(),
+        'scanner': get_response_scanner().stats(),
+        'decompress': get_decompressor().stats(),
+        'ingest': get_ingest_stats(),
+        'lease': get_lease_manager().stats() if get_lease_manager() else None,
+        'reconnect': get_reconnect_stats().stats(),
+        'resume': get_resume_store().stats(),
+        'heartbeat': get_heartbeat_scheduler().stats(),
+        'connections': get_connections().stats() if get_connections() else None,
+    }
+
+def log_runtime_stats():
+    logger.info(f"✍️ 签名统计: sign={get_signer().stats()} | a_bogus={get_abogus_engine().stats()}")
+    logger.info(f"📭 消息预筛: {get_response_scanner().stats()}")
+    logger.info(f"🗜️ 解压统计: {get_decompressor().stats()}")
+    logger.info(f"💗 心跳统计: {get_heartbeat_scheduler().stats()}")
+    if get_connections():
+        logger.info(f"🔌 连接池: {get_connections().stats()}")
+    logger.info(f"🔗 重连统计: {get_reconnect_stats().stats()} | 续传: {get_resume_store().stats()}")
+    for web_rid, queue_stats in get_ingest_stats().items():
+        logger.info(f"📥 入站队列 [{web_rid}]: {queue_stats}")
+    if get_lease_manager():
+        logger.info(f"🔐 租约统计: {get_lease_manager().stats()}")
+
+async def stop_all_recorders():
+    if recording_tasks:
+        logger.info("正在取消所有录制任务...")
+        for t in recording_tasks.values():
+            if isinstance(t, dict): t['task'].cancel()
+            else: t.cancel()
+        
+        # 等待任务取消
+        tasks = [t['task'] for t in recording_tasks.values() if isinstance(t, dict)]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,156 @@
+# redis_batcher.py
+"""
+Redis 缓冲区写入的进程内微批 (group commit)
+
+每个直播间每帧都会调一次 insert_chats / insert_gifts，几百个直播间就是每秒几百次 Redis 写入往返。
+这里把同一时间窗口内所有调用方的数据攒起来 (最多 max_delay 秒或 max_items 条)，
+每条数据一个 XADD (MAXLEN ~ 限长)，所有 key 放进同一个 pipeline 一次往返发送；调用方等待所在批次发送完成后返回，
+保留原来 "返回即已进 Redis" 的语义与背压。
+
+缓冲区积压在本地跟踪：写入时累加，本进程消费者确认后按条数扣减；其他进程 / 节点的消费者确认的条目本地看不到，
+所以每隔 BUFFER_DEPTH_RESYNC 秒用 XLEN 校准一次 (消费者确认后会 XDEL，XLEN 即未落库的条数)。
+采集进程不消费 (EXTERNAL_SINK=1) 时不跟踪积压。
+
+配置: REDIS_BATCH_ITEMS (默认 200 条)、REDIS_BATCH_DELAY_MS (默认 5ms)、BUFFER_STREAM_MAXLEN (默认 1000000)、
+      BUFFER_DEPTH_RESYNC (秒，默认 10)
+"""
+import asyncio
+import logging
+import os
+import time
+
+from redis_client import get_redis_binary
+from stream_buffer import FIELD
+
+logger = logging.getLogger("RedisBatcher")
+
+
+class RedisStreamBatcher:
+    """
+    :param max_items: 攒够该条数立即发送
+    :param max_delay: 第一条数据进入后最多等待的秒数
+    :param maxlen: stream 近似长度上限 (积压超过时最旧的条目被裁剪)
+    :param track_depth: 是否跟踪积压 (本进程不消费时关闭，push 固定返回 0)
+    :param resync_interval: 用 XLEN 校准积压的间隔 (秒)
+    """
+
+    def __init__(self, max_items=None, max_delay=None, maxlen=None, track_depth=True, resync_interval=None):
+        self.max_items = max_items or int(os.environ.get('REDIS_BATCH_ITEMS', 200))
+        self.max_delay = max_delay or float(os.environ.get('REDIS_BATCH_DELAY_MS', 5)) / 1000
+        self.maxlen = maxlen or int(os.environ.get('BUFFER_STREAM_MAXLEN', 1000000))
+
+        self._pending = {}       # key -> [payload, ...]
+        self._pending_count = 0
+        self._future = None      # 当前批次的完成信号
+        self._timer = None
+        self._inflight = set()
+        self.track_depth = track_depth
+        self.resync_interval = resync_interval or float(os.environ.get('BUFFER_DEPTH_RESYNC', 10))
+        self.depth = {}          # key -> 本地跟踪的积压条数 (本进程写入 - 已确认，定期按 XLEN 校准)
+        self._synced_at = {}     # key -> 上次校准时间
+        self._resync_task = None
+
+        # --- 统计 ---
+        self.calls = 0
+        self.items = 0
+        self.round_trips = 0
+
+    async def push(self, key, payloads) -> int:
+        """加入当前批次并等待其发送完成，返回该 key 的积压条数"""
+        if not payloads:
+            return self.depth.get(key, 0)
+        self._pending.setdefault(key, []).extend(payloads)
+        self._pending_count += len(payloads)
+        self.calls += 1
+
+        future = self._future
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._future = loop.create_future()
+            self._timer = loop.call_later(self.max_delay, self._send)
+        if self._pending_count >= self.max_items:
+            self._send()
+
+        # shield: 单个调用方被取消不影响同批次的其他调用方
+        await asyncio.shield(future)
+        return self.depth.get(key, 0)
+
+    def _send(self):
+        """截断当前批次并在后台发送"""
+        if self._future is None:
+            return
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        pending, future = self._pending, self._future
+        self._pending, self._pending_count, self._future = {}, 0, None
+
+        task = asyncio.create_task(self._execute(pending, future))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, pending, future):
+        try:
+            pipe = get_redis_binary().pipeline(transaction=False)
+            for key, payloads in pending.items():
+                for payload in payloads:
+                    pipe.xadd(key, {FIELD: payload}, maxlen=self.maxlen, approximate=True)
+            await pipe.execute()
+            self.round_trips += 1
+            for key, payloads in pending.items():
+                if self.track_depth:
+                    self.depth[key] = self.depth.get(key, 0) + len(payloads)
+                self.items += len(payloads)
+            future.set_result(None)
+            if self.track_depth:
+                self._maybe_resync(pending)
+        except Exception as e:
+            future.set_exception(e)
+            # 没有调用方等待时 (都已取消) 避免 "exception was never retrieved"
+            future.exception()
+
+    def drained(self, key, count):
+        """消费者确认了 count 条"""
+        if self.track_depth:
+            self.depth[key] = max(0, self.depth.get(key, 0) - count)
+
+    def _maybe_resync(self, keys):
+        """距上次校准超过 resync_interval 的 key 在后台按 XLEN 校准 (同一时间只有一个校准任务)"""
+        if self._resync_task is not None and not self._resync_task.done():
+            return
+        now = time.monotonic()
+        stale = [key for key in keys if now - self._synced_at.get(key, float('-inf')) >= self.resync_interval]
+        if stale:
+            self._resync_task = asyncio.create_task(self.resync(stale))
+
+    async def resync(self, keys):
+        """用 XLEN 覆盖本地积压 (其他进程确认的条目在本地不会扣减)"""
+        try:
+            pipe = get_redis_binary().pipeline(transaction=False)
+            for key in keys:
+                pipe.xlen(key)
+            lengths = await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ [Batcher] 校准积压失败: {e}")
+            return
+        now = time.monotonic()
+        for key, length in zip(keys, lengths):
+            self.depth[key] = length
+            self._synced_at[key] = now
+
+    async def flush(self):
+        """立即发送未满的批次并等待所有批次完成 (退出前调用)"""
+        self._send()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        if self._resync_task is not None:
+            await asyncio.gather(self._resync_task, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'items': self.items,
+            'round_trips': self.round_trips,
+            'calls_per_rtt': round(self.calls / max(1, self.round_trips), 1),
+            'depth': dict(self.depth),
+        }
@@ -2,6 +2,7 @@
 """
 全局 Redis 客户端模块
 在应用启动时调用 init_redis() 初始化，其他模块通过 get_redis() 获取客户端实例
+缓冲区 stream 的条目是二进制编码 (buffer_codec)，通过 get_redis_binary() 获取不解码响应的客户端
 """
 import redis.asyncio as redis
 import logging
@@ -9,6 +10,7 @@ import logging
 logger = logging.getLogger("RedisClient")
 
 _redis_client = None
+_redis_binary = None
 
 
 async def init_redis(url: str = "redis://localhost:6379/0"):
@@ -16,12 +18,13 @@ async def init_redis(url: str = "redis://localhost:6379/0"):
     初始化全局 Redis 连接
     :param url: Redis 连接字符串，例如 "redis://localhost:6379/0" 或 "redis://:password@host:port/db"
     """
-    global _redis_client
+    global _redis_client, _redis_binary
     if _redis_client is not None:
         logger.warning("⚠️ Redis 已经初始化，跳过重复初始化")
         return _redis_client
     
     _redis_client = redis.from_url(url, decode_responses=True)
+    _redis_binary = redis.from_url(url, decode_responses=False)
     logger.info(f"✅ 全局 Redis 连接已初始化: {url.split('@')[-1]}")  # 隐藏密码
     return _redis_client
 
@@ -36,11 +39,24 @@ def get_redis():
     return _redis_client
 
 
+def get_redis_binary():
+    """
+    获取 bytes 模式的全局 Redis 客户端 (decode_responses=False，用于缓冲区 stream)
+    :raises RuntimeError: 如果 Redis 尚未初始化
+    """
+    if _redis_binary is None:
+        raise RuntimeError("❌ Redis 未初始化，请先调用 init_redis()")
+    return _redis_binary
+
+
 async def close_redis():
     """
     关闭全局 Redis 连接
     """
-    global _redis_client
+    global _redis_client, _redis_binary
+    if _redis_binary:
+        await _redis_binary.close()
+        _redis_binary = None
     if _redis_client:
         await _redis_client.close()
         logger.info("👋 全局 Redis 连接已关闭")
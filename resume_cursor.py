@@ -0,0 +1,152 @@
+# resume_cursor.py
+"""
+WebSocket 断线续传
+
+每个直播间记住最近一帧 Response 的 cursor / internal_ext，重连时用它们拼 WSS URL，
+服务端从断点继续推送，而不是冷启动 (回放 need_persist_msg_count 条历史或留下空洞)。
+
+- 内存: 进程内按 web_rid 保存，fetcher 重建后仍可续传
+- Redis: ws_resume:{web_rid} (HASH，带 TTL)，由 fetcher 心跳和断开时写入，
+  进程重启 / 直播间迁移到其他 worker 后也能续传
+- msg_id 窗口: 每个直播间保留最近 N 个 msg_id，重连回放的重复消息在进入 Handler 之前丢弃 (只在内存中)
+- 直播间结算 / 迁出本进程时 discard() 释放内存中的状态
+
+配置: RESUME_TTL (默认 600s，超过即冷启动)、RESUME_WINDOW (msg_id 窗口大小，默认 2000)
+"""
+import logging
+import os
+import time
+from collections import deque
+
+from redis_client import get_redis
+
+logger = logging.getLogger("Resume")
+
+RESUME_PREFIX = "ws_resume:"
+
+
+class MsgIdWindow:
+    """最近 size 个 msg_id (FIFO 淘汰)"""
+
+    def __init__(self, size):
+        self.size = size
+        self._ids = set()
+        self._order = deque()
+
+    def seen(self, msg_id):
+        """已出现过返回 True，否则记录下来返回 False；msg_id 为 0 (缺失) 时不去重"""
+        if not msg_id:
+            return False
+        if msg_id in self._ids:
+            return True
+        self._ids.add(msg_id)
+        self._order.append(msg_id)
+        if len(self._order) > self.size:
+            self._ids.discard(self._order.popleft())
+        return False
+
+
+class ResumeState:
+    """单个直播间的续传状态"""
+
+    def __init__(self, web_rid, room_id, window_size):
+        self.web_rid = web_rid
+        self.room_id = room_id
+        self.cursor = ""
+        self.internal_ext = ""
+        self.updated_at = 0.0
+        self.dirty = False
+        self.window = MsgIdWindow(window_size)
+
+    def update(self, cursor, internal_ext):
+        """每帧调用，只更新内存"""
+        if cursor:
+            self.cursor = cursor
+        if internal_ext:
+            self.internal_ext = internal_ext if isinstance(internal_ext, str) else internal_ext.decode('utf-8', 'ignore')
+        self.updated_at = time.time()
+        self.dirty = True
+
+    def resumable(self, ttl):
+        return bool(self.cursor) and time.time() - self.updated_at < ttl
+
+
+class ResumeStore:
+    """
+    :param ttl: 续传状态的有效期 (秒)
+    :param window_size: 每个直播间的 msg_id 窗口大小
+    """
+
+    def __init__(self, ttl=None, window_size=None):
+        self.ttl = ttl or int(os.environ.get('RESUME_TTL', 600))
+        self.window_size = window_size or int(os.environ.get('RESUME_WINDOW', 2000))
+        self._states = {}
+
+        # --- 统计 ---
+        self.resumed = 0
+        self.cold = 0
+
+    async def load(self, web_rid, room_id) -> ResumeState:
+        """取直播间的续传状态：优先内存，其次 Redis；换场 (room_id 变化) 时重新开始"""
+        room_id = str(room_id)
+        state = self._states.get(web_rid)
+        if state is None or state.room_id != room_id:
+            state = ResumeState(web_rid, room_id, self.window_size)
+            self._states[web_rid] = state
+
+        if not state.resumable(self.ttl):
+            try:
+                saved = await get_redis().hgetall(RESUME_PREFIX + web_rid)
+                if saved and saved.get('room_id') == room_id:
+                    state.cursor = saved.get('cursor', '')
+                    state.internal_ext = saved.get('internal_ext', '')
+                    state.updated_at = float(saved.get('updated_at') or 0)
+            except Exception as e:
+                logger.error(f"❌ [Resume] 读取续传状态失败 {web_rid}: {e}")
+
+        if state.resumable(self.ttl):
+            self.resumed += 1
+        else:
+            self.cold += 1
+        return state
+
+    async def save(self, state: ResumeState):
+        """把内存中的续传状态写入 Redis (没有变化时跳过)；写入失败时保持 dirty，下次重试"""
+        if not state.dirty or not state.cursor:
+            return
+        updated_at = state.updated_at
+        key = RESUME_PREFIX + state.web_rid
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hset(key, mapping={
+            'room_id': state.room_id,
+            'cursor': state.cursor,
+            'internal_ext': state.internal_ext,
+            'updated_at': state.updated_at,
+        })
+        pipe.expire(key, self.ttl)
+        await pipe.execute()
+        # 写入期间又收到新帧时仍需下次写入
+        if state.updated_at == updated_at:
+            state.dirty = False
+
+    def discard(self, web_rid):
+        """直播间结束 / 不再由本进程录制：释放内存中的状态 (Redis 中的状态按 TTL 过期，供接管的进程续传)"""
+        self._states.pop(web_rid, None)
+
+    def stats(self) -> dict:
+        return {
+            'rooms': len(self._states),
+            'resumed': self.resumed,
+            'cold': self.cold,
+        }
+
+
+# --- 进程级单例 ---
+_store = None
+
+
+def get_resume_store() -> ResumeStore:
+    global _store
+    if _store is None:
+        _store = ResumeStore()
+    return _store
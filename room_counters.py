@@ -0,0 +1,138 @@
+# room_counters.py
+"""
+rooms 计数器 ($inc total_chat_count / total_diamond_count) 的合并批量写入
+
+每次落库后不再逐个直播间 await update_one (50 个直播间 = 50 次串行往返)，
+而是把增量合并进待写表，一次无序 bulk_write 发送全部 UpdateOne。
+写入进行中时新到的增量继续合并，由下一次 bulk_write 一并发送 (多个消费者并发落库时自然合并)；
+写入失败的增量合并回待写表，retry_delay 秒后 (或下一次 add 时) 重试，不丢计数；退出前调用 flush() 写完剩余增量。
+
+配置: ROOM_COUNTER_RETRY (失败后重试间隔秒数，默认 5)
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger("RoomCounters")
+
+
+class RoomCounterWriter:
+    """
+    :param collection: 返回 rooms 集合的函数 (延迟获取)
+    :param retry_delay: 写入失败后重试的间隔 (秒)
+    """
+
+    def __init__(self, collection, retry_delay=None):
+        self.collection = collection
+        self.retry_delay = retry_delay or float(os.environ.get('ROOM_COUNTER_RETRY', 5))
+        self._pending = {}       # room_id -> {field: inc}
+        self._future = None      # 待写表被下一次 bulk_write 取走时完成
+        self._task = None
+        self._retry = None       # 失败后的重试定时器
+
+        # --- 统计 ---
+        self.calls = 0
+        self.flushes = 0
+        self.ops = 0
+        self.errors = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self._ms_sum = 0.0
+
+    async def add(self, field, deltas: dict):
+        """合并 {room_id: 增量} 并等待包含它们的 bulk_write 完成 (失败时已合并回待写表，不抛异常)"""
+        deltas = {str(room_id): inc for room_id, inc in deltas.items() if room_id and inc}
+        if not deltas:
+            return
+        self.calls += 1
+        for room_id, inc in deltas.items():
+            fields = self._pending.setdefault(room_id, {})
+            fields[field] = fields.get(field, 0) + inc
+
+        if self._future is None:
+            self._future = asyncio.get_running_loop().create_future()
+        future = self._future
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        await asyncio.shield(future)
+
+    async def _run(self):
+        # 写入期间到达的增量留在新的待写表里，循环直到清空；失败时由重试定时器 (或下一次 add) 触发重试
+        while self._pending:
+            pending, future = self._pending, self._future
+            self._pending, self._future = {}, None
+            ok = await self._write(pending)
+            if future is not None and not future.done():
+                future.set_result(None)
+            if not ok:
+                # 写入期间加入的调用方也不再等待，增量留在待写表里
+                if self._future is not None:
+                    self._future.set_result(None)
+                    self._future = None
+                self._schedule_retry()
+                return
+
+    def _schedule_retry(self):
+        if self._retry is None:
+            self._retry = asyncio.get_running_loop().call_later(self.retry_delay, self._retry_now)
+
+    def _retry_now(self):
+        self._retry = None
+        if self._pending and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    def _cancel_retry(self):
+        if self._retry is not None:
+            self._retry.cancel()
+            self._retry = None
+
+    async def flush(self):
+        """等待进行中的写入，并立即写入待写表中剩余的增量 (退出前调用)"""
+        self._cancel_retry()
+        if self._task is not None and not self._task.done():
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._pending:
+            await self._run()
+        self._cancel_retry()
+        if self._pending:
+            logger.error(f"❌ [RoomCounters] 仍有 {len(self._pending)} 个直播间的计数未能写入")
+
+    async def _write(self, pending) -> bool:
+        now = datetime.now()
+        ops = [UpdateOne({"room_id": room_id}, {"$inc": fields, "$set": {"updated_at": now}}, upsert=True)
+               for room_id, fields in pending.items()]
+        start = time.perf_counter()
+        try:
+            await self.collection().bulk_write(ops, ordered=False)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ [RoomCounters] 批量更新 {len(ops)} 个直播间计数失败，下次重试: {e}")
+            for room_id, fields in pending.items():
+                merged = self._pending.setdefault(room_id, {})
+                for field, inc in fields.items():
+                    merged[field] = merged.get(field, 0) + inc
+            return False
+        elapsed = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.ops += len(ops)
+        self.last_ms = elapsed
+        self._ms_sum += elapsed
+        if elapsed > self.max_ms:
+            self.max_ms = elapsed
+        return True
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'flushes': self.flushes,
+            'ops': self.ops,
+            'errors': self.errors,
+            'pending_rooms': len(self._pending),
+            'ms': round(self.last_ms, 1),
+            'avg_ms': round(self._ms_sum / max(1, self.flushes), 1),
+            'max_ms': round(self.max_ms, 1),
+        }
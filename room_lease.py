@@ -0,0 +1,257 @@
+# room_lease.py
+"""
+多节点直播间归属 (Redis 租约)
+
+多台机器连同一套 Mongo / Redis 运行时，每个直播间只能由一个节点录制，否则 live_chats 会重复写入。
+
+- 租约: lease:room:{web_rid} = 节点 ID，SET NX + TTL；录制中由 fetcher 心跳续期
+- 节点存活 / 负载: ZSET lease:nodes (最近心跳时间)、HASH lease:load (持有数)
+- 按负载认领: 每个节点最多持有 capacity 个直播间；未分配的直播间按各节点上报的负载 "注水" 分摊
+  (负载低的节点先补到同一水位)，本节点只认领到该水位，多出来的房间留给负载更低的节点；
+  上一轮已经无人认领的房间 (孤儿) 不受水位限制，只受 capacity 限制
+- 故障切换: 节点宕机后其租约在 TTL 内过期，其余节点下一轮扫描即可接管；正常退出时主动释放全部租约
+
+默认关闭，设置 ROOM_LEASES=1 开启；NODE_ID / NODE_CAPACITY / LEASE_TTL 可选
+"""
+import asyncio
+import logging
+import math
+import os
+import socket
+import time
+
+from redis_client import get_redis
+
+logger = logging.getLogger("RoomLease")
+
+LEASE_PREFIX = "lease:room:"
+NODES_KEY = "lease:nodes"
+LOAD_KEY = "lease:load"
+
+# 租约不存在或属于自己时 (重新) 设置并续期，否则返回 0
+_ACQUIRE_SCRIPT = """
+local owner = redis.call('GET', KEYS[1])
+if owner == false or owner == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# 只删除属于自己的租约
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def fill_level(loads, amount):
+    """
+    注水水位：把 amount 个新直播间分给当前负载为 loads 的各节点，先补负载最低的节点，
+    返回补完后的共同水位 (负载已高于水位的节点不再分配)
+    """
+    loads = sorted(loads)
+    total = amount
+    for k, load in enumerate(loads, 1):
+        total += load
+        level = total / k
+        if k == len(loads) or level <= loads[k]:
+            return level
+    return amount
+
+
+class RoomLease:
+    """单个直播间的租约句柄 (交给 fetcher，在心跳里续期)"""
+
+    def __init__(self, manager, web_rid):
+        self.manager = manager
+        self.web_rid = web_rid
+
+    async def renew(self):
+        """续期；租约已被其他节点持有时返回 False"""
+        return await self.manager.acquire(self.web_rid)
+
+
+class RoomLeaseManager:
+    """
+    :param node_id: 本节点标识 (默认 主机名:pid)
+    :param capacity: 本节点最多持有的直播间数
+    :param ttl: 租约 TTL (秒)，应大于 fetcher 心跳间隔的 2 倍
+    """
+
+    def __init__(self, node_id=None, capacity=None, ttl=None):
+        self.node_id = node_id or os.environ.get('NODE_ID') or f"{socket.gethostname()}:{os.getpid()}"
+        self.capacity = capacity or int(os.environ.get('NODE_CAPACITY', 100))
+        self.ttl = ttl or int(os.environ.get('LEASE_TTL', 30))
+
+        self.held = set()
+        self._orphans = set()     # 上一轮因水位限制没有认领、且无人持有的直播间
+        self._acquire = None
+        self._release = None
+
+        self.running = False
+        self.heartbeat_task = None
+
+        # --- 统计 ---
+        self.claimed = 0
+        self.lost = 0
+
+    def _scripts(self):
+        if self._acquire is None:
+            redis_client = get_redis()
+            self._acquire = redis_client.register_script(_ACQUIRE_SCRIPT)
+            self._release = redis_client.register_script(_RELEASE_SCRIPT)
+        return self._acquire, self._release
+
+    def handle(self, web_rid) -> RoomLease:
+        return RoomLease(self, web_rid)
+
+    async def acquire(self, web_rid):
+        """认领或续期单个直播间"""
+        acquire, _ = self._scripts()
+        ok = bool(await acquire(keys=[LEASE_PREFIX + web_rid], args=[self.node_id, self.ttl]))
+        if ok:
+            self.held.add(web_rid)
+        elif web_rid in self.held:
+            self.held.discard(web_rid)
+            self.lost += 1
+            logger.warning(f"⚠️ [Lease] 租约已被其他节点接管: {web_rid}")
+        return ok
+
+    async def release(self, web_rid):
+        self.held.discard(web_rid)
+        _, release = self._scripts()
+        try:
+            await release(keys=[LEASE_PREFIX + web_rid], args=[self.node_id])
+        except Exception as e:
+            logger.error(f"❌ [Lease] 释放租约失败 {web_rid}: {e}")
+
+    async def renew_many(self, web_rids):
+        """批量续期，返回已经丢失 (被其他节点持有) 的 web_rid 列表；Redis 异常时不判定丢失"""
+        lost = []
+        for web_rid in web_rids:
+            try:
+                if not await self.acquire(web_rid):
+                    lost.append(web_rid)
+            except Exception as e:
+                logger.error(f"❌ [Lease] 续期失败 {web_rid}: {e}")
+        return lost
+
+    async def _fleet_loads(self):
+        """存活节点上报的持有数 {node_id: held}；本节点用本地实时值"""
+        redis_client = get_redis()
+        now = time.time()
+        await redis_client.zremrangebyscore(NODES_KEY, 0, now - self.ttl)
+        nodes = [node for node in await redis_client.zrange(NODES_KEY, 0, -1) if node != self.node_id]
+        loads = await redis_client.hmget(LOAD_KEY, nodes) if nodes else []
+        fleet = {node: int(load or 0) for node, load in zip(nodes, loads)}
+        fleet[self.node_id] = len(self.held)
+        return fleet
+
+    async def claim_many(self, candidates, total_live):
+        """
+        按容量与集群负载认领新直播间，返回认领成功的 web_rid 列表
+        :param candidates: 本节点尚未录制的在线直播间
+        :param total_live: 当前在线直播间总数 (减去各节点持有数即为待分配数)
+        """
+        if not candidates:
+            self._orphans = set()
+            return []
+        redis_client = get_redis()
+        fleet = await self._fleet_loads()
+        unassigned = max(0, total_live - sum(fleet.values()))
+        level = math.ceil(fill_level(fleet.values(), unassigned))
+        fair_budget = min(self.capacity, level) - len(self.held)
+        cap_budget = self.capacity - len(self.held)
+
+        owners = await redis_client.mget([LEASE_PREFIX + rid for rid in candidates])
+        claimed = []
+        orphans = set()
+        for web_rid, owner in zip(candidates, owners):
+            if owner is not None and owner != self.node_id:
+                continue
+            # 水位内正常认领；上一轮就无人认领的孤儿只要还有容量就接管
+            if fair_budget <= 0 and not (web_rid in self._orphans and cap_budget > 0):
+                orphans.add(web_rid)
+                continue
+            if await self.acquire(web_rid):
+                claimed.append(web_rid)
+                self.claimed += 1
+                fair_budget -= 1
+                cap_budget -= 1
+        self._orphans = orphans
+        return claimed
+
+    async def _publish(self):
+        redis_client = get_redis()
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.zadd(NODES_KEY, {self.node_id: time.time()})
+        pipe.hset(LOAD_KEY, self.node_id, len(self.held))
+        await pipe.execute()
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        logger.info(f"✅ [Lease] 节点 {self.node_id} 加入 (容量 {self.capacity}, TTL {self.ttl}s)")
+
+    async def _heartbeat_loop(self):
+        while self.running:
+            try:
+                await self._publish()
+            except Exception as e:
+                logger.error(f"❌ [Lease] 节点心跳失败: {e}")
+            try:
+                await asyncio.sleep(self.ttl / 3)
+            except asyncio.CancelledError:
+                break
+
+    def stats(self) -> dict:
+        return {
+            'node': self.node_id,
+            'held': len(self.held),
+            'capacity': self.capacity,
+            'claimed': self.claimed,
+            'lost': self.lost,
+        }
+
+    async def stop(self):
+        """退出时释放全部租约，其余节点无需等待 TTL 即可接管"""
+        self.running = False
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            try:
+                await self.heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        for web_rid in list(self.held):
+            await self.release(web_rid)
+        try:
+            redis_client = get_redis()
+            await redis_client.zrem(NODES_KEY, self.node_id)
+            await redis_client.hdel(LOAD_KEY, self.node_id)
+        except Exception as e:
+            logger.error(f"❌ [Lease] 注销节点失败: {e}")
+        logger.info(f"👋 [Lease] 节点 {self.node_id} 已退出")
+
+
+# --- 进程级单例 (ROOM_LEASES=1 时启用) ---
+_manager = None
+
+
+def get_lease_manager():
+    """未开启时返回 None"""
+    global _manager
+    if _manager is None and os.environ.get('ROOM_LEASES') == '1':
+        _manager = RoomLeaseManager()
+    return _manager
+
+
+async def close_lease_manager():
+    global _manager
+    if _manager is not None:
+        await _manager.stop()
+        _manager = None
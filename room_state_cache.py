@@ -0,0 +1,92 @@
+# room_state_cache.py
+"""
+rooms 热字段的进程内直写缓存 (write-through)
+
+Monitor 每 20s 扫描时 update_room_realtime 要先 find_one 取 start_follower_count 再 update_one；
+扫描对账 / 结算 / 退避重连又反复 get_room_live_status。这些读取的都是少数几个字段，而且基本都由本进程写入：
+- 启动时预热直播中的房间
+- 每次写 rooms (save_room_info / update_room_realtime / set_room_ended ...) 同步更新缓存
+- 结算后失效 (旧场不会再被读取)
+读取命中时不再访问 Mongo。
+
+不存在的房间也缓存一个空条目 (较短的有效期)，避免对未落库的房间每轮都 find_one。
+其他进程写入的变更 (supervisor 的看门狗等) 最多在 ROOM_CACHE_TTL 秒后可见；
+结算 / 重连等决策跳过缓存直接读 Mongo，直播间迁入 / 迁出本进程 (租约认领、释放) 时失效对应条目。
+
+配置: ROOM_CACHE_TTL (秒，默认 300)、ROOM_CACHE_SIZE (默认 20000)
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("RoomCache")
+
+# 缓存的 rooms 字段 (也是 find_one / 预热的 projection)
+FIELDS = ('live_status', 'start_follower_count')
+PROJECTION = {"_id": 0, "room_id": 1, **{field: 1 for field in FIELDS}}
+
+MISSING_TTL = 60
+
+
+class RoomStateCache:
+    """
+    :param ttl: 条目有效期 (秒)
+    :param max_size: 最多缓存的房间数 (LRU 淘汰)
+    """
+
+    def __init__(self, ttl=None, max_size=None):
+        self.ttl = ttl or float(os.environ.get('ROOM_CACHE_TTL', 300))
+        self.max_size = max_size or int(os.environ.get('ROOM_CACHE_SIZE', 20000))
+        self._entries = OrderedDict()    # room_id -> (expire_at, {field: value})；空字典表示房间不存在
+
+        # --- 统计 ---
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, room_id):
+        """返回缓存的字段字典 (房间不存在时为空字典)；未缓存或已过期返回 None"""
+        room_id = str(room_id)
+        item = self._entries.get(room_id)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                del self._entries[room_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(room_id)
+        self.hits += 1
+        return item[1]
+
+    def put(self, room_id, doc):
+        """写入 Mongo 读到的文档 (None 表示房间不存在)"""
+        room_id = str(room_id)
+        if doc:
+            fields, ttl = {field: doc[field] for field in FIELDS if field in doc}, self.ttl
+        else:
+            fields, ttl = {}, min(self.ttl, MISSING_TTL)
+        self._entries[room_id] = (time.monotonic() + ttl, fields)
+        self._entries.move_to_end(room_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return fields
+
+    def update(self, room_id, **fields):
+        """写 Mongo 后同步已缓存的条目；未缓存 / 缓存为不存在的房间不处理 (下次读取时加载完整文档)"""
+        item = self._entries.get(str(room_id))
+        if item and item[1]:
+            item[1].update({field: value for field, value in fields.items() if field in FIELDS})
+
+    def invalidate(self, *room_ids):
+        for room_id in room_ids:
+            if self._entries.pop(str(room_id), None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> dict:
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / max(1, self.hits + self.misses), 3),
+            'invalidations': self.invalidations,
+        }
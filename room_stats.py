@@ -0,0 +1,168 @@
+# room_stats.py
+"""
+直播间实时统计的写回合并 (write-behind)
+
+在线人数 / 榜单 / 点赞数 / 观看时长 / 灯牌等统计原来每条消息 (或节流后) 直接 update_one rooms。
+现在先记在内存里，每 interval 秒把所有有变化的直播间合并成一次无序 bulk_write：
+- 覆盖型字段 ($set) 只保留最新值
+- 增量字段 ($inc) 累加
+- max_viewers 取 $max
+消息不再因节流被丢弃，最终数值更准确，rooms 写入次数降到 每个直播间每 interval 秒最多一次。
+
+配置: ROOM_STATS_FLUSH_INTERVAL (默认 3s)
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger("RoomStats")
+
+
+def room_stats_fields(stats: dict):
+    """消息统计 -> ($set 字段, $max 字段)"""
+    update_fields = {}
+    max_fields = {}
+    if 'user_count' in stats:
+        update_fields['user_count'] = stats['user_count']
+        max_fields['max_viewers'] = stats['user_count']
+    if 'total_user' in stats: update_fields['total_user_count'] = stats['total_user']
+    if 'like_count' in stats: update_fields['like_count'] = stats['like_count']
+    if 'live_status' in stats:
+        update_fields['live_status'] = stats['live_status']
+        update_fields['room_status'] = stats['live_status']
+    if 'ranks' in stats:
+        update_fields['ranks'] = stats['ranks']
+    return update_fields, max_fields
+
+
+class _Pending:
+    __slots__ = ('sets', 'incs', 'maxes')
+
+    def __init__(self):
+        self.sets = {}
+        self.incs = {}
+        self.maxes = {}
+
+    def merge_older(self, older):
+        """把写入失败的旧数据合并回来：$set 以本对象 (更新) 为准，$inc 累加，$max 取大"""
+        for field, value in older.sets.items():
+            self.sets.setdefault(field, value)
+        for field, inc in older.incs.items():
+            self.incs[field] = self.incs.get(field, 0) + inc
+        for field, value in older.maxes.items():
+            if field not in self.maxes or value > self.maxes[field]:
+                self.maxes[field] = value
+
+
+class RoomStatsCoalescer:
+    """
+    :param collection: 返回 rooms 集合的函数 (延迟获取)
+    :param interval: 刷新间隔 (秒)
+    """
+
+    def __init__(self, collection, interval=None):
+        self.collection = collection
+        self.interval = interval or float(os.environ.get('ROOM_STATS_FLUSH_INTERVAL', 3))
+        self._dirty = {}         # room_id -> _Pending
+        self.running = False
+        self.task = None
+
+        # --- 统计 ---
+        self.updates = 0         # 记入内存的更新次数
+        self.flushes = 0
+        self.writes = 0          # 实际写入的直播间文档数
+        self.errors = 0
+        self.last_ms = 0.0
+
+    def _room(self, room_id) -> _Pending:
+        if not self.running:
+            self.start()
+        pending = self._dirty.get(room_id)
+        if pending is None:
+            pending = self._dirty[room_id] = _Pending()
+        return pending
+
+    def set(self, room_id, stats: dict):
+        """覆盖型统计 (update_room_stats 的字段)"""
+        if not room_id or not stats: return
+        update_fields, max_fields = room_stats_fields(stats)
+        pending = self._room(str(room_id))
+        pending.sets.update(update_fields)
+        for field, value in max_fields.items():
+            if field not in pending.maxes or value > pending.maxes[field]:
+                pending.maxes[field] = value
+        self.updates += 1
+
+    def incr(self, room_id, inc_data: dict):
+        """增量统计"""
+        if not room_id or not inc_data: return
+        pending = self._room(str(room_id))
+        for field, inc in inc_data.items():
+            pending.incs[field] = pending.incs.get(field, 0) + inc
+        self.updates += 1
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self.running:
+            try:
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            await self.flush()
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        now = datetime.now()
+        ops = []
+        for room_id, pending in dirty.items():
+            update = {"$set": dict(pending.sets, updated_at=now)}
+            if pending.incs:
+                update["$inc"] = pending.incs
+            if pending.maxes:
+                update["$max"] = pending.maxes
+            ops.append(UpdateOne({"room_id": room_id}, update, upsert=True))
+
+        start = time.perf_counter()
+        try:
+            await self.collection().bulk_write(ops, ordered=False)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ [RoomStats] 写入 {len(ops)} 个直播间统计失败，下次重试: {e}")
+            for room_id, older in dirty.items():
+                self._dirty.setdefault(room_id, _Pending()).merge_older(older)
+            return
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.flushes += 1
+        self.writes += len(ops)
+
+    def stats(self) -> dict:
+        return {
+            'updates': self.updates,
+            'flushes': self.flushes,
+            'writes': self.writes,
+            'errors': self.errors,
+            'dirty_rooms': len(self._dirty),
+            'ms': round(self.last_ms, 1),
+        }
+
+    async def stop(self):
+        """停止定时刷新并写出剩余数据"""
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
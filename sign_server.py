@@ -0,0 +1,117 @@
+# sign_server.py
+"""
+本地签名守护进程 (可选)
+
+多进程采集时，每个进程都各自加载 sign.js / a_bogus.js 会浪费内存和冷启动时间。
+启动本服务后，采集进程设置环境变量 SIGN_SOCKET 指向同一个 Unix Socket，
+即可共享这里的 signature (sign.js) 与 a_bogus 引擎；服务不可用时客户端自动退回进程内签名。
+__ac_signature 不经过本服务：它由 TokenPool 在采集进程内预生成 (ac_signature.AcSigner，纯 Python)，服务端没有对应的 op。
+
+协议：每行一个 JSON，支持流水线 (不必等待上一个响应)，响应按 id 对应，可能乱序
+    请求: {"id": 1, "op": "get_sign" | "get_ab", "args": [...]}
+    响应: {"id": 1, "result": "..."}  或  {"id": 1, "error": "..."}
+
+用法:
+    python sign_server.py --socket /tmp/danmu_sign.sock --pool-size 4
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+from signer import get_signer, get_abogus_engine, close_engines
+
+logger = logging.getLogger("SignServer")
+
+DEFAULT_SOCKET = "/tmp/danmu_sign.sock"
+
+
+class SignServer:
+    def __init__(self, socket_path=DEFAULT_SOCKET, pool_size=4):
+        self.socket_path = socket_path
+        self.signer = get_signer(pool_size=pool_size)
+        self.abogus = get_abogus_engine()
+        self.server = None
+        self.requests = 0
+
+    async def _dispatch(self, op, args):
+        if op == 'get_sign':
+            return await self.signer.sign(*args)
+        if op == 'get_ab':
+            return await self.abogus.sign(*args)
+        raise ValueError(f"未知操作: {op}")
+
+    async def _handle_request(self, req, writer, write_lock):
+        resp = {'id': req.get('id')}
+        try:
+            resp['result'] = await self._dispatch(req.get('op'), req.get('args') or [])
+        except Exception as e:
+            resp['error'] = str(e)
+        async with write_lock:
+            writer.write((json.dumps(resp, ensure_ascii=False) + "\n").encode('utf-8'))
+            await writer.drain()
+
+    async def _handle_client(self, reader, writer):
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                except ValueError:
+                    continue
+                self.requests += 1
+                # 每个请求独立执行，实现流水线
+                task = asyncio.create_task(self._handle_request(req, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        await self.signer.warmup()
+        await self.abogus.start()
+        self.server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        logger.info(f"✅ 签名服务已启动: {self.socket_path}")
+        try:
+            async with self.server:
+                while True:
+                    await asyncio.sleep(60)
+                    logger.info(f"✍️ 签名统计: requests={self.requests} | "
+                                f"sign={self.signer.stats()} | a_bogus={self.abogus.stats()}")
+        finally:
+            await close_engines()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            logger.info("👋 签名服务已退出")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="本地签名守护进程")
+    parser.add_argument('--socket', default=os.environ.get('SIGN_SOCKET', DEFAULT_SOCKET), help="Unix Socket 路径")
+    parser.add_argument('--pool-size', type=int, default=4, help="sign.js 上下文池大小")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - [%(levelname)s] - [%(name)s]: %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    args = parse_args()
+    try:
+        asyncio.run(SignServer(args.socket, args.pool_size).serve())
+    except KeyboardInterrupt:
+        pass
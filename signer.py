@@ -0,0 +1,541 @@
+# signer.py
+"""
+签名子系统
+
+- sign.js 每个进程只读取、编译一次，之后复用常驻的 MiniRacer 上下文池
+- a_bogus.js 依赖 sm-crypto (Node)，由一个常驻 Node 子进程计算，请求按批合并
+- 所有 JS 调用都不在事件循环里同步执行
+- 记录每次调用耗时，方便观察开播高峰期 (重连风暴) 的签名延迟
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger("Signer")
+
+# 参与签名的 wss 参数 (顺序固定)
+SIGN_PARAM_KEYS = ("live_id,aid,version_code,webcast_sdk_version,"
+                   "room_id,sub_room_id,sub_channel_id,did_rule,"
+                   "user_unique_id,device_platform,device_type,ac,"
+                   "identity").split(',')
+
+
+def build_sign_md5(wss: str) -> str:
+    """从 wss 地址中提取签名参数并计算 md5 (get_sign 的输入)"""
+    wss_params = urllib.parse.urlparse(wss).query.split('&')
+    wss_maps = {i.split('=')[0]: i.split("=")[-1] for i in wss_params}
+    tpl_params = [f"{i}={wss_maps.get(i, '')}" for i in SIGN_PARAM_KEYS]
+    param = ','.join(tpl_params)
+    return hashlib.md5(param.encode()).hexdigest()
+
+
+class SignerPool:
+    """
+    sign.js 上下文池
+    :param script_file: 签名脚本路径
+    :param pool_size: 常驻 V8 上下文数量 (同时也是线程池大小)
+    :param slow_ms: 单次调用超过该耗时会打印警告
+    """
+
+    def __init__(self, script_file='sign.js', pool_size=2, slow_ms=200):
+        self.script_file = script_file
+        self.pool_size = max(1, pool_size)
+        self.slow_ms = slow_ms
+
+        self._script = None
+        self._script_lock = threading.Lock()
+        self._contexts = queue.Queue()
+        self._created = 0
+        self._create_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="signer")
+
+        # --- 延迟统计 ---
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent_ms = deque(maxlen=512)
+
+    def _load_script(self):
+        """sign.js 只读取一次"""
+        if self._script is None:
+            with self._script_lock:
+                if self._script is None:
+                    with open(self.script_file, 'r', encoding='utf8') as f:
+                        self._script = f.read()
+        return self._script
+
+    def _create_context(self):
+        from py_mini_racer import MiniRacer
+        ctx = MiniRacer()
+        ctx.eval(self._load_script())
+        return ctx
+
+    def _acquire(self):
+        """取一个空闲上下文；池未满时按需新建，池满时等待归还"""
+        try:
+            return self._contexts.get_nowait()
+        except queue.Empty:
+            pass
+        with self._create_lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                try:
+                    return self._create_context()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._contexts.get()
+
+    def _release(self, ctx):
+        self._contexts.put(ctx)
+
+    def _record(self, cost_ms, ok=True):
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+        self.total_ms += cost_ms
+        self.max_ms = max(self.max_ms, cost_ms)
+        self._recent_ms.append(cost_ms)
+        if cost_ms > self.slow_ms:
+            logger.warning(f"🐢 [Signer] 签名耗时过长: {cost_ms:.1f}ms")
+
+    def sign_sync(self, md5_param: str) -> str:
+        """同步签名 (在调用线程中执行 JS)"""
+        start = time.perf_counter()
+        try:
+            ctx = self._acquire()
+        except Exception as e:
+            self._record((time.perf_counter() - start) * 1000, ok=False)
+            logger.error(f"签名上下文初始化失败: {e}")
+            return ""
+        try:
+            signature = ctx.call("get_sign", md5_param)
+            self._record((time.perf_counter() - start) * 1000)
+            return signature
+        except Exception as e:
+            self._record((time.perf_counter() - start) * 1000, ok=False)
+            logger.error(f"签名生成失败: {e}")
+            return ""
+        finally:
+            self._release(ctx)
+
+    async def sign(self, md5_param: str) -> str:
+        """异步签名：在线程池中执行，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.sign_sync, md5_param)
+
+    async def generate(self, wss: str) -> str:
+        """根据 wss 地址生成 signature"""
+        return await self.sign(build_sign_md5(wss))
+
+    def _warmup_sync(self):
+        with self._create_lock:
+            while self._created < self.pool_size:
+                self._contexts.put(self._create_context())
+                self._created += 1
+
+    async def warmup(self):
+        """启动时预热所有上下文，避免首批开播时现场编译"""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, self._warmup_sync)
+            logger.info(f"🔥 [Signer] 已预热 {self._created} 个签名上下文 "
+                        f"({(time.perf_counter() - start) * 1000:.0f}ms)")
+        except Exception as e:
+            logger.error(f"❌ [Signer] 预热失败: {e}")
+
+    def stats(self) -> dict:
+        recent = sorted(self._recent_ms)
+        p50 = recent[len(recent) // 2] if recent else 0.0
+        p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'avg_ms': round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            'p50_ms': round(p50, 2),
+            'p95_ms': round(p95, 2),
+            'max_ms': round(self.max_ms, 2),
+            'contexts': self._created,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class ABogusEngine:
+    """
+    常驻 a_bogus 引擎
+    一个 Node 子进程常驻内存 (a_bogus.js 只加载一次)，同一时间窗口内的请求
+    合并成一行 JSON 批量发送；子进程退出后下一次调用自动重启。
+    找不到 node、或子进程在返回任何结果前反复退出 (缺少 sm-crypto、脚本语法错误等) 时退回 execjs，
+    但脚本也只编译一次。
+    :param batch_window: 批次收集窗口 (秒)
+    :param max_batch: 单批最大请求数
+    :param max_early_exits: early_exit_window 秒内子进程未返回结果就退出的次数上限，超过后退回 execjs
+    """
+
+    def __init__(self, abogus_file='a_bogus.js', worker_file='abogus_worker.js', node_bin='node',
+                 batch_window=0.002, max_batch=64, timeout=5, max_early_exits=3, early_exit_window=60):
+        self.abogus_file = abogus_file
+        self.worker_file = worker_file
+        self.node_bin = node_bin
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.max_early_exits = max_early_exits
+        self.early_exit_window = early_exit_window
+
+        self._proc = None
+        self._reader_task = None
+        self._stderr_task = None
+        self._batch_task = None
+        self._queue = asyncio.Queue()
+        self._pending = {}
+        self._next_id = 0
+        self._start_lock = asyncio.Lock()
+
+        self._node_unavailable = False
+        self._early_exits = deque()     # 子进程未返回结果就退出的时间
+        self._legacy_ctx = None
+        self._executor = None
+
+        # --- 统计 ---
+        self.calls = 0
+        self.errors = 0
+        self.batches = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def _alive(self):
+        return self._proc is not None and self._proc.returncode is None
+
+    async def _spawn(self):
+        self._proc = await asyncio.create_subprocess_exec(
+            self.node_bin, os.path.abspath(self.worker_file), os.path.abspath(self.abogus_file),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=1024 * 1024,
+        )
+        self._reader_task = asyncio.create_task(self._read_loop(self._proc))
+        self._stderr_task = asyncio.create_task(self._drain_stderr(self._proc))
+        logger.info(f"✅ [ABogus] Node 引擎已启动 (pid={self._proc.pid})")
+
+    async def start(self):
+        async with self._start_lock:
+            if self._node_unavailable:
+                return
+            if not self._alive():
+                try:
+                    await self._spawn()
+                except (FileNotFoundError, PermissionError) as e:
+                    self._node_unavailable = True
+                    logger.warning(f"⚠️ [ABogus] 无法启动 Node，退回 execjs: {e}")
+                    return
+            if self._batch_task is None or self._batch_task.done():
+                self._batch_task = asyncio.create_task(self._batch_loop())
+
+    async def sign(self, params: str, ua: str) -> str:
+        """计算 a_bogus (params 为 urlencode 后的查询串)"""
+        start = time.perf_counter()
+        ok = False
+        try:
+            await self.start()
+            if self._node_unavailable:
+                result = await self._legacy_sign(params, ua)
+            else:
+                loop = asyncio.get_running_loop()
+                self._next_id += 1
+                req_id = self._next_id
+                fut = loop.create_future()
+                self._pending[req_id] = fut
+                self._queue.put_nowait((req_id, params, ua))
+                try:
+                    result = await asyncio.wait_for(fut, self.timeout)
+                except (RuntimeError, OSError):
+                    # 本次失败导致引擎被判定不可用时，直接改走 execjs
+                    if not self._node_unavailable:
+                        raise
+                    result = await self._legacy_sign(params, ua)
+                finally:
+                    self._pending.pop(req_id, None)
+            ok = bool(result)
+            return result
+        finally:
+            cost_ms = (time.perf_counter() - start) * 1000
+            self.calls += 1
+            if not ok:
+                self.errors += 1
+            self.total_ms += cost_ms
+            self.max_ms = max(self.max_ms, cost_ms)
+
+    async def _batch_loop(self):
+        while True:
+            item = await self._queue.get()
+            # 给并发请求一个很短的窗口合并成一批
+            if self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            batch = [item]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                if not self._alive():
+                    await self.start()
+                    if self._node_unavailable:
+                        raise RuntimeError("Node 引擎不可用")
+                line = json.dumps(batch, ensure_ascii=False) + "\n"
+                self._proc.stdin.write(line.encode('utf-8'))
+                await self._proc.stdin.drain()
+                self.batches += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ [ABogus] 批次发送失败: {e}")
+                for req_id, _, _ in batch:
+                    fut = self._pending.get(req_id)
+                    if fut and not fut.done():
+                        fut.set_exception(e)
+
+    async def _read_loop(self, proc):
+        responded = False
+        try:
+            while True:
+                line = await proc.stdout.readline()
+                if not line:
+                    break
+                try:
+                    results = json.loads(line)
+                except ValueError:
+                    continue
+                responded = True
+                for req_id, value in results:
+                    fut = self._pending.get(req_id)
+                    if fut and not fut.done():
+                        fut.set_result(value)
+        except asyncio.CancelledError:
+            raise
+        finally:
+            # 子进程已退出：让还在等待的请求尽快失败，下次调用会重启引擎
+            if self._proc is proc:
+                logger.warning("⚠️ [ABogus] Node 引擎已退出")
+                if not responded:
+                    self._record_early_exit()
+                for fut in list(self._pending.values()):
+                    if not fut.done():
+                        fut.set_exception(RuntimeError("a_bogus 引擎已退出"))
+
+    def _record_early_exit(self):
+        """子进程没返回任何结果就退出：短时间内超过 max_early_exits 次视为脚本 / 依赖有问题，不再重启"""
+        now = time.monotonic()
+        self._early_exits.append(now)
+        while self._early_exits and now - self._early_exits[0] > self.early_exit_window:
+            self._early_exits.popleft()
+        if len(self._early_exits) >= self.max_early_exits and not self._node_unavailable:
+            self._node_unavailable = True
+            logger.warning(f"⚠️ [ABogus] Node 引擎 {self.early_exit_window}s 内启动失败 {len(self._early_exits)} 次"
+                           f" (请检查 sm-crypto / {self.abogus_file})，退回 execjs")
+
+    async def _drain_stderr(self, proc):
+        while True:
+            line = await proc.stderr.readline()
+            if not line:
+                break
+            logger.debug(f"[ABogus] {line.decode('utf-8', 'replace').rstrip()}")
+
+    def _legacy_sign_sync(self, params, ua):
+        if self._legacy_ctx is None:
+            from liveMan_utils import execute_js
+            self._legacy_ctx = execute_js(self.abogus_file)
+        return self._legacy_ctx.call("get_ab", params, ua)
+
+    async def _legacy_sign(self, params, ua):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="abogus")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._legacy_sign_sync, params, ua)
+
+    def stats(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'batches': self.batches,
+            'avg_batch': round(self.calls / self.batches, 2) if self.batches else 0.0,
+            'avg_ms': round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            'max_ms': round(self.max_ms, 2),
+            'backend': 'execjs' if self._node_unavailable else 'node',
+        }
+
+    async def close(self):
+        for task in (self._batch_task, self._reader_task, self._stderr_task):
+            if task:
+                task.cancel()
+        proc, self._proc = self._proc, None
+        if proc and proc.returncode is None:
+            try:
+                proc.stdin.close()
+                await asyncio.wait_for(proc.wait(), 2)
+            except Exception:
+                proc.kill()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+
+
+class SignClient:
+    """
+    签名守护进程 (sign_server.py) 客户端
+    单连接流水线：请求带 id 发出后不等待，响应按 id 唤醒对应的 Future。
+    连接失败后进入冷却期，期间调用方应退回进程内签名。
+    支持的 op: get_sign (WebSocket signature)、get_ab (a_bogus)；
+    __ac_signature 始终在本地由 TokenPool 计算，不要向服务端请求。
+    """
+
+    def __init__(self, socket_path, timeout=3, retry_interval=30):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._pending = {}
+        self._next_id = 0
+        self._connect_lock = asyncio.Lock()
+        self._down_until = 0
+
+    @property
+    def available(self):
+        return time.time() >= self._down_until
+
+    def _connected(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _connect(self):
+        async with self._connect_lock:
+            if self._connected():
+                return
+            self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=1024 * 1024)
+            self._reader_task = asyncio.create_task(self._read_loop(self._reader))
+            logger.info(f"✅ [SignClient] 已连接签名服务: {self.socket_path}")
+
+    async def _read_loop(self, reader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    resp = json.loads(line)
+                except ValueError:
+                    continue
+                fut = self._pending.get(resp.get('id'))
+                if fut is None or fut.done():
+                    continue
+                if 'error' in resp:
+                    fut.set_exception(RuntimeError(resp['error']))
+                else:
+                    fut.set_result(resp.get('result'))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ [SignClient] 读取响应异常: {e}")
+        finally:
+            if self._reader is reader:
+                self._mark_down()
+
+    def _mark_down(self):
+        self._down_until = time.time() + self.retry_interval
+        if self._writer:
+            self._writer.close()
+        self._reader = self._writer = None
+        for fut in list(self._pending.values()):
+            if not fut.done():
+                fut.set_exception(ConnectionError("签名服务连接已断开"))
+
+    async def call(self, op, *args):
+        """调用远程签名；失败时抛出异常，由调用方决定是否退回本地"""
+        if not self.available:
+            raise ConnectionError("签名服务冷却中")
+        try:
+            await self._connect()
+        except OSError:
+            self._down_until = time.time() + self.retry_interval
+            raise
+
+        loop = asyncio.get_running_loop()
+        self._next_id += 1
+        req_id = self._next_id
+        fut = loop.create_future()
+        self._pending[req_id] = fut
+        try:
+            line = json.dumps({'id': req_id, 'op': op, 'args': list(args)}, ensure_ascii=False) + "\n"
+            self._writer.write(line.encode('utf-8'))
+            await self._writer.drain()
+            return await asyncio.wait_for(fut, self.timeout)
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def close(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._writer:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+# --- 进程级单例 (每个脚本一个池) ---
+_signers = {}
+_abogus_engines = {}
+_sign_client = None
+
+
+def get_signer(script_file='sign.js', pool_size=2) -> SignerPool:
+    signer = _signers.get(script_file)
+    if signer is None:
+        signer = SignerPool(script_file, pool_size=pool_size)
+        _signers[script_file] = signer
+    return signer
+
+
+def get_abogus_engine(abogus_file='a_bogus.js') -> ABogusEngine:
+    engine = _abogus_engines.get(abogus_file)
+    if engine is None:
+        engine = ABogusEngine(abogus_file)
+        _abogus_engines[abogus_file] = engine
+    return engine
+
+
+def get_sign_client():
+    """
+    返回签名服务客户端；未设置环境变量 SIGN_SOCKET 时返回 None (纯进程内签名)
+    """
+    global _sign_client
+    if _sign_client is None:
+        socket_path = os.environ.get('SIGN_SOCKET')
+        if socket_path:
+            _sign_client = SignClient(socket_path)
+    return _sign_client
+
+
+async def close_engines():
+    """关闭所有签名引擎 (进程退出时调用)"""
+    global _sign_client
+    if _sign_client:
+        await _sign_client.close()
+        _sign_client = None
+    for engine in list(_abogus_engines.values()):
+        await engine.close()
+    _abogus_engines.clear()
+    for signer in list(_signers.values()):
+        signer.close()
+    _signers.clear()
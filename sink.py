@@ -0,0 +1,79 @@
+# sink.py
+"""
+独立落库服务 (sink)
+
+只做一件事：消费 Redis Stream 缓冲区 (stream:chats / stream:gifts)，写入 live_chats / live_gifts，
+并累加 rooms 的弹幕数 / 钻石数。采集进程 (main.py / supervisor.py) 设置 EXTERNAL_SINK=1 后只负责写 Redis，
+Mongo 的延迟不再进入 WebSocket 所在的进程，写入能力也可以单独扩容 (多开几个 sink 进程或加大 --writers)。
+
+多个 sink 进程共用同一个消费者组，条目自动分摊；某个进程退出后其未确认的条目由其余进程重新领取。
+
+用法:
+    EXTERNAL_SINK=1 python supervisor.py --workers 4
+    python sink.py --writers 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from db import AsyncMongoDBHandler
+from redis_client import init_redis, close_redis, get_redis
+from stream_buffer import GROUP
+from supervisor import setup_logging, REDIS_URL
+
+logger = logging.getLogger("Sink")
+
+STATS_INTERVAL = 30
+
+
+async def log_backlog(db):
+    """各 stream 在消费者组中的积压 (未投递) 与未确认条数"""
+    redis_client = get_redis()
+    for key in (db.REDIS_CHAT_KEY, db.REDIS_GIFT_KEY):
+        try:
+            groups = await redis_client.xinfo_groups(key)
+            info = next((g for g in groups if g['name'] == GROUP), {})
+            logger.info(f"📊 [{key}] 积压 {info.get('lag')} | 未确认 {info.get('pending')} | "
+                        f"消费者 {info.get('consumers')}")
+        except Exception as e:
+            logger.error(f"❌ 查询 {key} 积压失败: {e}")
+
+
+async def run_sink(writers):
+    db = AsyncMongoDBHandler()
+    await db.init_indexes()
+    await init_redis(REDIS_URL)
+    await db.start_flushers(consumers=writers)
+    logger.info(f"✅ Sink 启动 (pid={os.getpid()}, 每个 stream {writers} 个写入协程)")
+
+    try:
+        while True:
+            await asyncio.sleep(STATS_INTERVAL)
+            logger.info(f"📦 缓冲区: {db.buffer_stats()}")
+            await log_backlog(db)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.info("🛑 收到退出信号...")
+    finally:
+        await db.close()
+        await close_redis()
+        logger.info("👋 Sink 已退出")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Redis 缓冲区 -> MongoDB 落库服务")
+    parser.add_argument('--writers', type=int, default=int(os.environ.get('SINK_WRITERS', 4)),
+                        help="每个 stream 的并发写入协程数")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    setup_logging("sink")
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    args = parse_args()
+    try:
+        asyncio.run(run_sink(args.writers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,216 @@
+# stream_buffer.py
+"""
+基于 Redis Streams 的持久缓冲区消费者
+
+弹幕 / 礼物先 XADD 进 stream:chats / stream:gifts (MAXLEN ~ 限制内存)，
+由消费者组 flushers 中的若干消费者并行落库：
+
+    XAUTOCLAIM (领取超时未确认的条目) -> XREADGROUP (新条目) -> 写 Mongo -> XACK + XDEL
+
+- 写 Mongo 失败时不 ACK，条目留在 PEL 中，超过 min_idle 后被任意消费者重新领取 (at-least-once，保持条目原有顺序)；
+  部分写入 (handler 抛 PartialWriteError) 时只保留失败的条目，已写入的照常确认
+- 无法解析的条目、以及投递次数超过 BUFFER_MAX_DELIVERIES 仍写不进去的条目移入死信 stream ({key}:dead) 后确认，
+  避免毒消息反复重试，同时保留原始数据以便排查 / 手工重放
+- 重新领取的条目写入失败不影响继续读取新条目
+- 多进程 / 多节点的消费者共用同一个消费者组，天然分摊
+- 条目为 buffer_codec 编码的 bytes，读写都走 bytes 模式的 Redis 连接
+
+配置: BUFFER_STREAM_MAXLEN (默认 1000000)、BUFFER_CONSUMERS (每个 stream 的消费者数，默认 2)、
+      BUFFER_RECLAIM_IDLE (秒，默认 60)、BUFFER_MAX_DELIVERIES (默认 5)
+"""
+import asyncio
+import logging
+import os
+import socket
+
+from redis.exceptions import ResponseError
+
+from redis_client import get_redis_binary
+
+logger = logging.getLogger("StreamBuffer")
+
+GROUP = "flushers"
+FIELD = b"d"
+DEAD_SUFFIX = ":dead"
+
+
+class PartialWriteError(Exception):
+    """handler 只写入了部分文档；failed 为失败文档在 docs 中的下标"""
+
+    def __init__(self, failed, message=""):
+        super().__init__(message or f"{len(failed)} 条写入失败")
+        self.failed = set(failed)
+
+
+async def ensure_group(key):
+    try:
+        await get_redis_binary().xgroup_create(key, GROUP, id='0', mkstream=True)
+    except ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+class StreamConsumer:
+    """
+    :param key: stream key
+    :param index: 本进程内的消费者序号
+    :param handler: async def handler(docs)，写入失败时抛异常 (部分失败时抛 PartialWriteError)
+    :param decode: 单条 payload (bytes) -> 文档
+    :param batch_size: 每次读取 / 落库的最大条数
+    :param interval: 没有被唤醒时的最长等待 (秒)
+    :param wake: asyncio.Event，缓冲区积压到 batch_size 时由写入方设置
+    :param on_drained: 确认 n 条后回调 (用于本地积压统计)
+    """
+
+    def __init__(self, key, index, handler, decode, batch_size, interval, wake=None, on_drained=None):
+        self.key = key
+        self.index = index
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        self.handler = handler
+        self.decode = decode
+        self.batch_size = batch_size
+        self.interval = interval
+        self.wake = wake or asyncio.Event()
+        self.on_drained = on_drained
+        self.min_idle = int(float(os.environ.get('BUFFER_RECLAIM_IDLE', 60)) * 1000)
+        self.max_deliveries = int(os.environ.get('BUFFER_MAX_DELIVERIES', 5))
+        self.dead_key = key + DEAD_SUFFIX
+        self.dead_maxlen = int(os.environ.get('BUFFER_STREAM_MAXLEN', 1000000))
+
+        self.running = False
+        self.task = None
+        self._lock = asyncio.Lock()
+
+        # --- 统计 ---
+        self.acked = 0
+        self.failed = 0
+        self.reclaimed = 0
+        self.poison = 0
+        self.dead = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self.running:
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                break
+            self.wake.clear()
+            try:
+                await self.drain()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"❌ [{self.key}] 消费异常: {e}")
+
+    async def drain(self):
+        """先处理超时未确认的条目，再读新条目，直到读空或写入失败"""
+        async with self._lock:
+            redis_client = get_redis_binary()
+            claimed = await redis_client.xautoclaim(self.key, GROUP, self.name, min_idle_time=self.min_idle,
+                                                    start_id='0-0', count=self.batch_size)
+            entries = [entry for entry in claimed[1] if entry[1]]
+            if entries:
+                self.reclaimed += len(entries)
+                logger.warning(f"♻️ [{self.key}] 重新领取 {len(entries)} 条未确认数据")
+                entries = await self._expire(entries)
+                # 失败的条目留在 PEL 中等下次领取，新条目照常读取
+                if entries:
+                    await self._process(entries)
+
+            while True:
+                result = await redis_client.xreadgroup(GROUP, self.name, {self.key: '>'}, count=self.batch_size)
+                entries = result[0][1] if result else []
+                if not entries:
+                    return
+                if not await self._process(entries) or len(entries) < self.batch_size:
+                    return
+
+    async def _expire(self, entries):
+        """投递次数超过 max_deliveries 的条目移入死信，返回其余条目"""
+        pipe = get_redis_binary().pipeline(transaction=False)
+        for entry_id, _ in entries:
+            pipe.xpending_range(self.key, GROUP, min=entry_id, max=entry_id, count=1)
+        deliveries = {item['message_id']: item['times_delivered']
+                      for pending in await pipe.execute() for item in pending}
+        dead = [entry for entry in entries if deliveries.get(entry[0], 0) > self.max_deliveries]
+        if not dead:
+            return entries
+        logger.error(f"❌ [{self.key}] {len(dead)} 条数据投递超过 {self.max_deliveries} 次仍未写入，移入 {self.dead_key}")
+        await self._ack([], dead)
+        dead_ids = {entry[0] for entry in dead}
+        return [entry for entry in entries if entry[0] not in dead_ids]
+
+    async def _process(self, entries) -> bool:
+        ids, docs, dead = [], [], []
+        for entry_id, fields in entries:
+            try:
+                doc = self.decode(fields[FIELD])
+            except Exception as e:
+                self.poison += 1
+                logger.error(f"❌ [{self.key}] 无法解析的条目 {entry_id} 移入死信: {e!r}")
+                dead.append((entry_id, fields))
+                continue
+            ids.append(entry_id)
+            docs.append(doc)
+
+        ok = True
+        if docs:
+            try:
+                await self.handler(docs)
+            except PartialWriteError as e:
+                # 只保留失败的条目，min_idle 后重新领取
+                self.failed += len(e.failed)
+                logger.error(f"❌ [{self.key}] 部分落库失败，{len(e.failed)}/{len(docs)} 条等待重试: {e}")
+                ids = [entry_id for i, entry_id in enumerate(ids) if i not in e.failed]
+                ok = False
+            except Exception as e:
+                # 不 ACK：留在 PEL 中，min_idle 后重新领取
+                self.failed += len(docs)
+                logger.error(f"❌ [{self.key}] 落库失败，{len(docs)} 条等待重试: {e}")
+                ids = []
+                ok = False
+
+        await self._ack(ids, dead)
+        return ok
+
+    async def _ack(self, ids, dead):
+        """确认并删除已写入的条目；dead 中的 (id, fields) 先写入死信 stream 再确认"""
+        if not ids and not dead:
+            return
+        pipe = get_redis_binary().pipeline(transaction=False)
+        for entry_id, fields in dead:
+            pipe.xadd(self.dead_key, dict(fields, src=entry_id), maxlen=self.dead_maxlen, approximate=True)
+        done = list(ids) + [entry_id for entry_id, _ in dead]
+        pipe.xack(self.key, GROUP, *done)
+        pipe.xdel(self.key, *done)
+        await pipe.execute()
+        self.acked += len(ids)
+        self.dead += len(dead)
+        if self.on_drained:
+            self.on_drained(self.key, len(done))
+
+    def stats(self) -> dict:
+        return {
+            'acked': self.acked,
+            'failed': self.failed,
+            'reclaimed': self.reclaimed,
+            'poison': self.poison,
+            'dead': self.dead,
+        }
+
+    async def stop(self):
+        self.running = False
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
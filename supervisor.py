@@ -0,0 +1,412 @@
+# supervisor.py
+"""
+多进程采集入口 (supervisor 模式)
+
+main.py 把所有直播间放在一个事件循环里，几十个活跃直播间就能吃满一个核。
+本入口启动 N 个 worker 进程，每个 worker 运行与 main.py 相同的
+AsyncDouyinLiveWebFetcher + MessageHandler 栈 (复用 recorder.reconcile_rooms)；
+supervisor 只负责扫描关注列表，并按 web_rid 一致性哈希把直播间分配给 worker。
+
+- worker 退出/失联：立即从哈希环摘除，其直播间迁移到其余 worker，随后重启该 worker；
+  重启后的 worker 上报第一次健康信息才重新加入哈希环 (一致性哈希只会迁回它原来的直播间)
+- 健康信息：worker 定期上报录制数、队列深度/延迟、签名与解压统计，supervisor 汇总打印
+
+用法:
+    python supervisor.py --workers 4
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import logging
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+
+logger = logging.getLogger("Supervisor")
+
+SCAN_INTERVAL = 20          # 关注列表扫描间隔 (秒)
+HEALTH_INTERVAL = 10        # worker 上报间隔 (秒)
+HEALTH_TIMEOUT = 60         # 超过该时间未上报视为失联
+RESPAWN_INTERVAL = 5        # 同一个 worker 两次重启的最小间隔 (秒)
+REDIS_URL = "redis://localhost:6379/0"
+
+
+def setup_logging(name):
+    """每个进程写各自的日志文件，避免多进程同时轮转同一个文件"""
+    log_dir = "logs"
+    os.makedirs(log_dir, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f'%(asctime)s - [%(levelname)s] - [{name}] [%(name)s]: %(message)s',
+        handlers=[
+            logging.StreamHandler(sys.stdout),
+            RotatingFileHandler(
+                filename=os.path.join(log_dir, f"{name}.log"),
+                mode='a',
+                maxBytes=10 * 1024 * 1024,
+                backupCount=5,
+                encoding='utf-8',
+            )
+        ],
+        force=True,
+    )
+
+
+class HashRing:
+    """一致性哈希环 (虚拟节点)"""
+
+    def __init__(self, nodes=(), replicas=100):
+        self.replicas = replicas
+        self.nodes = set()
+        self._keys = []
+        self._owners = {}
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key):
+        return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:16], 16)
+
+    def add(self, node):
+        self.nodes.add(node)
+        for i in range(self.replicas):
+            h = self._hash(f"{node}#{i}")
+            if h not in self._owners:
+                bisect.insort(self._keys, h)
+            self._owners[h] = node
+
+    def remove(self, node):
+        self.nodes.discard(node)
+        for i in range(self.replicas):
+            h = self._hash(f"{node}#{i}")
+            if self._owners.get(h) == node:
+                del self._owners[h]
+                self._keys.remove(h)
+
+    def get(self, key):
+        if not self._keys:
+            return None
+        idx = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._owners[self._keys[idx]]
+
+    def __contains__(self, node):
+        return node in self.nodes
+
+
+# --------------------------------------------------------------------------
+# Worker 进程
+# --------------------------------------------------------------------------
+
+def run_worker(worker_id, commands, health_queue):
+    """worker 进程入口"""
+    setup_logging(f"worker-{worker_id}")
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    try:
+        asyncio.run(worker_main(worker_id, commands, health_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+async def worker_main(worker_id, commands, health_queue):
+    import aiohttp
+    from db import AsyncMongoDBHandler, external_sink
+    from gift_deduplicator import AsyncGiftDeduplicator
+    from redis_client import init_redis, close_redis
+    from signer import get_signer, get_sign_client, close_engines
+    from token_pool import close_token_pools
+    from frame_decompressor import close_decompressor
+    from room_lease import get_lease_manager, close_lease_manager
+    from heartbeat_scheduler import close_heartbeat_scheduler
+    from connection_manager import ConnectionManager
+    from recorder import reconcile_rooms, runtime_stats, stop_all_recorders, recording_tasks
+
+    wlogger = logging.getLogger(f"Worker-{worker_id}")
+    loop = asyncio.get_running_loop()
+
+    db = AsyncMongoDBHandler()
+    await db.warm_room_cache()
+    await init_redis(REDIS_URL)
+    if not external_sink():
+        await db.start_flushers()
+    if get_lease_manager():
+        get_lease_manager().start()
+    if not get_sign_client():
+        await get_signer().warmup()
+    gift_processor = AsyncGiftDeduplicator(db_handler=db)
+    gift_processor.start()
+
+    def report():
+        health_queue.put({
+            'worker': worker_id,
+            'pid': os.getpid(),
+            'time': time.time(),
+            'rooms': list(recording_tasks.keys()),
+            'stats': runtime_stats(),
+        })
+
+    async def health_loop():
+        while True:
+            try:
+                report()
+            except Exception as e:
+                wlogger.error(f"❌ 上报健康信息失败: {e}")
+            await asyncio.sleep(HEALTH_INTERVAL)
+
+    timeout = aiohttp.ClientTimeout(total=15, connect=10)
+    health_task = asyncio.create_task(health_loop())
+    wlogger.info(f"✅ Worker 启动 (pid={os.getpid()})")
+    try:
+        async with ConnectionManager(timeout=timeout) as conns:
+            session = conns.http
+            while True:
+                # 阻塞读取放到线程里，不占用事件循环
+                cmd = await loop.run_in_executor(None, commands.recv)
+                if cmd['type'] == 'stop':
+                    break
+                if cmd['type'] == 'assign':
+                    try:
+                        await reconcile_rooms(cmd['rooms'], db, gift_processor, session,
+                                              owned_elsewhere=cmd['elsewhere'])
+                    except Exception as e:
+                        wlogger.error(f"❌ 分配处理异常: {e}", exc_info=True)
+                    report()
+            await stop_all_recorders()
+    except (EOFError, OSError):
+        wlogger.warning("⚠️ 与 supervisor 的连接已断开")
+        await stop_all_recorders()
+    finally:
+        health_task.cancel()
+        await close_lease_manager()
+        await close_heartbeat_scheduler()
+        await gift_processor.stop()
+        await close_engines()
+        await close_token_pools()
+        close_decompressor()
+        await db.close()
+        await close_redis()
+        wlogger.info("👋 Worker 已退出")
+
+
+# --------------------------------------------------------------------------
+# Supervisor
+# --------------------------------------------------------------------------
+
+class WorkerHandle:
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.process = None
+        self.commands = None
+        self.started_at = 0
+        self.health = None       # 最近一次上报
+        self.restarts = 0
+
+    @property
+    def ready(self):
+        """进程存活且自本次启动后上报过健康信息"""
+        return (self.process is not None and self.process.is_alive()
+                and self.health is not None and self.health['time'] >= self.started_at)
+
+
+class Supervisor:
+    def __init__(self, num_workers):
+        self.num_workers = num_workers
+        self.ctx = mp.get_context('spawn')
+        self.health_queue = self.ctx.Queue()
+        self.workers = {i: WorkerHandle(i) for i in range(num_workers)}
+        self.ring = HashRing()
+        self.live_map = {}
+        self.assignment = {}     # web_rid -> worker_id
+
+    def _spawn(self, handle):
+        if handle.commands is not None:
+            handle.commands.close()
+        # Pipe(duplex=False) 返回 (接收端, 发送端)
+        recv_end, send_end = self.ctx.Pipe(duplex=False)
+        handle.process = self.ctx.Process(
+            target=run_worker, args=(handle.worker_id, recv_end, self.health_queue),
+            name=f"worker-{handle.worker_id}", daemon=True,
+        )
+        handle.process.start()
+        recv_end.close()
+        handle.commands = send_end
+        handle.started_at = time.time()
+        handle.health = None
+        logger.info(f"🚀 启动 Worker-{handle.worker_id} (pid={handle.process.pid})")
+
+    def _drain_health(self):
+        while True:
+            try:
+                report = self.health_queue.get_nowait()
+            except queue.Empty:
+                return
+            handle = self.workers.get(report['worker'])
+            if handle and handle.process and report['pid'] == handle.process.pid:
+                handle.health = report
+
+    def _check_workers(self):
+        """返回哈希环是否有变化"""
+        changed = False
+        now = time.time()
+        for handle in self.workers.values():
+            alive = handle.process is not None and handle.process.is_alive()
+            if alive and handle.health is None and now - handle.started_at > HEALTH_TIMEOUT:
+                logger.error(f"❌ Worker-{handle.worker_id} 启动后未上报，强制重启")
+                handle.process.terminate()
+                alive = False
+            elif alive and handle.health is not None and now - handle.health['time'] > HEALTH_TIMEOUT:
+                logger.error(f"❌ Worker-{handle.worker_id} 失联 {now - handle.health['time']:.0f}s，强制重启")
+                handle.process.terminate()
+                alive = False
+
+            if not alive:
+                if handle.worker_id in self.ring:
+                    self.ring.remove(handle.worker_id)
+                    changed = True
+                    logger.warning(f"💀 Worker-{handle.worker_id} 已退出，其直播间迁移到其他 Worker")
+                if handle.process is None or now - handle.started_at >= RESPAWN_INTERVAL:
+                    if handle.process is not None:
+                        handle.restarts += 1
+                    self._spawn(handle)
+            elif handle.ready and handle.worker_id not in self.ring:
+                self.ring.add(handle.worker_id)
+                changed = True
+                logger.info(f"✅ Worker-{handle.worker_id} 就绪，加入哈希环")
+        return changed
+
+    def _assign(self):
+        """按一致性哈希把当前直播列表分给就绪的 worker"""
+        per_worker = {wid: {} for wid, h in self.workers.items() if h.ready}
+        assignment = {}
+        for web_rid, info in self.live_map.items():
+            owner = self.ring.get(web_rid)
+            if owner is None or owner not in per_worker:
+                continue
+            per_worker[owner][web_rid] = info
+            assignment[web_rid] = owner
+
+        moved = sum(1 for rid, wid in assignment.items() if self.assignment.get(rid, wid) != wid)
+        self.assignment = assignment
+        live = set(self.live_map)
+        for wid, rooms in per_worker.items():
+            try:
+                self.workers[wid].commands.send({
+                    'type': 'assign',
+                    'rooms': rooms,
+                    'elsewhere': live - set(rooms),
+                })
+            except (BrokenPipeError, OSError) as e:
+                logger.error(f"❌ 向 Worker-{wid} 下发任务失败: {e}")
+        if moved:
+            logger.info(f"🔀 重新分配: {moved} 个直播间迁移")
+
+    def log_health(self):
+        for wid, handle in self.workers.items():
+            health = handle.health
+            if not health:
+                logger.info(f"👷 Worker-{wid}: 启动中 (重启 {handle.restarts} 次)")
+                continue
+            ingest = health['stats'].get('ingest', {})
+            depth = sum(q['depth'] for q in ingest.values())
+            max_lag = max((q['max_lag_ms'] for q in ingest.values()), default=0)
+            logger.info(f"👷 Worker-{wid} pid={health['pid']} | 录制中{len(health['rooms'])} | "
+                        f"队列深度{depth} | 最大延迟{max_lag}ms | 重启{handle.restarts}次 | "
+                        f"上报于{time.time() - health['time']:.0f}s前")
+
+    async def run(self):
+        import aiohttp
+        from db import AsyncMongoDBHandler
+        from monitor import AsyncDouyinLiveMonitor
+        from redis_client import init_redis, close_redis
+        from recorder import zombie_cleaner
+
+        db = AsyncMongoDBHandler()
+        await db.init_indexes()
+        await db.warm_room_cache()
+        await init_redis(REDIS_URL)
+        cleaner_task = asyncio.create_task(zombie_cleaner(db))
+
+        cookies = []
+        async for doc in db.db['settings_cookies'].find({}, {"_id": 0, "cookie": 1}):
+            if doc.get('cookie'):
+                cookies.append(doc['cookie'])
+        if not cookies:
+            logger.error("❌ 数据库中没有 Cookie！请先访问 /admin 后台进行添加。")
+            cleaner_task.cancel()
+            await db.close()
+            await close_redis()
+            return
+
+        for handle in self.workers.values():
+            self._spawn(handle)
+
+        timeout = aiohttp.ClientTimeout(total=15, connect=10)
+        try:
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                monitor = AsyncDouyinLiveMonitor(cookies, db, session=session)
+                last_scan = 0
+                while True:
+                    self._drain_health()
+                    changed = self._check_workers()
+
+                    if time.time() - last_scan >= SCAN_INTERVAL:
+                        last_scan = time.time()
+                        try:
+                            live_users = await monitor.get_all_live_users()
+                            self.live_map = {u['web_rid']: u for u in live_users if u.get('web_rid')}
+                            changed = True
+                            logger.info(f"💓 扫描完成: 在线{len(self.live_map)} | "
+                                        f"就绪Worker {sum(h.ready for h in self.workers.values())}/{self.num_workers}")
+                            self.log_health()
+                        except Exception as e:
+                            logger.error(f"❌ 扫描异常: {e}", exc_info=True)
+
+                    if changed:
+                        self._assign()
+                    await asyncio.sleep(1)
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.info("🛑 收到退出信号...")
+        finally:
+            await self.shutdown()
+            cleaner_task.cancel()
+            await db.close()
+            await close_redis()
+            logger.info("👋 Supervisor 已退出")
+
+    async def shutdown(self):
+        for handle in self.workers.values():
+            if handle.process and handle.process.is_alive():
+                try:
+                    handle.commands.send({'type': 'stop'})
+                except (BrokenPipeError, OSError):
+                    pass
+        deadline = time.time() + 30
+        for handle in self.workers.values():
+            if not handle.process:
+                continue
+            while handle.process.is_alive() and time.time() < deadline:
+                await asyncio.sleep(0.2)
+            if handle.process.is_alive():
+                logger.warning(f"⚠️ Worker-{handle.worker_id} 未按时退出，强制结束")
+                handle.process.terminate()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="多进程采集 supervisor")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="worker 进程数")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    setup_logging("supervisor")
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    args = parse_args()
+    try:
+        asyncio.run(Supervisor(args.workers).run())
+    except KeyboardInterrupt:
+        pass
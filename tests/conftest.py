@@ -0,0 +1,30 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# 模块都在项目根目录 (平铺结构)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis_client  # noqa: E402
+
+
+@pytest.fixture
+def redis():
+    """用 fakeredis 替换 redis_client 的全局连接 (str 模式)"""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    redis_client._redis_client = client
+    yield client
+    redis_client._redis_client = None
+
+
+@pytest.fixture
+def redis_binary():
+    """用 fakeredis 替换 redis_client 的 bytes 模式连接 (缓冲区 stream)"""
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.aioredis.FakeRedis(decode_responses=False)
+    redis_client._redis_binary = client
+    yield client
+    redis_client._redis_binary = None
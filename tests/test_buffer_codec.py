@@ -0,0 +1,77 @@
+# tests/test_buffer_codec.py
+import random
+import sys
+from datetime import datetime, timezone, timedelta
+
+import pytest
+
+import buffer_codec
+from benchmarks.bench_buffer_codec import make_chat
+from buffer_codec import (get_codec, decode_payload, CompactCodec, CHAT_SCHEMA, GIFT_SCHEMA, COMPACT_SCHEMAS,
+                          CODEC_JSON, CODEC_MSGPACK, CODEC_COMPACT)
+
+
+def make_gift():
+    doc = {field: str(random.getrandbits(40)) for field in GIFT_SCHEMA}
+    doc.update(gender=1, pay_grade=30, fans_club_level=12, gift_id=463, diamond_count=1, combo_count=5,
+               group_count=1, repeat_end=1, total_diamond_count=5, user_name="用户", gift_name="小心心",
+               created_at=datetime(2024, 5, 1, 12, 30, 0, 123456))
+    return doc
+
+
+@pytest.mark.parametrize("name", [CODEC_JSON, CODEC_COMPACT, CODEC_MSGPACK])
+@pytest.mark.parametrize("make", [make_chat, make_gift])
+def test_round_trip(name, make):
+    if name == CODEC_MSGPACK:
+        pytest.importorskip("msgpack")
+    random.seed(3)
+    codec = get_codec(name)
+    assert codec.name == name
+    for _ in range(50):
+        doc = make()
+        assert decode_payload(codec.encode(doc)) == doc
+
+
+def test_every_compact_schema_is_used_without_fallback():
+    codec = CompactCodec()
+    random.seed(4)
+    for doc in (make_chat(), make_gift()):
+        payload = codec.encode(doc)
+        assert payload[:1] == b'C'
+        assert decode_payload(payload) == doc
+    assert codec.fallbacks == 0
+    assert set(COMPACT_SCHEMAS.values()) == {CHAT_SCHEMA, GIFT_SCHEMA}
+
+
+def test_compact_falls_back_to_json_for_unknown_fields():
+    codec = CompactCodec()
+    doc = dict(make_chat(), extra="x")
+    payload = codec.encode(doc)
+    assert payload[:1] == b'{'
+    assert codec.fallbacks == 1
+    assert decode_payload(payload) == doc
+
+
+def test_aware_datetimes_are_stored_as_utc():
+    codec = CompactCodec()
+    doc = make_chat()
+    doc['created_at'] = datetime(2024, 1, 1, 8, 0, tzinfo=timezone(timedelta(hours=8)))
+    assert decode_payload(codec.encode(doc))['created_at'] == datetime(2024, 1, 1, 0, 0)
+
+
+def test_legacy_str_entries_decode_as_json():
+    doc = make_chat()
+    assert decode_payload(get_codec(CODEC_JSON).encode(doc).decode()) == doc
+
+
+def test_compact_rejects_unknown_schema():
+    with pytest.raises(ValueError):
+        decode_payload(b'C[99,"a"]')
+
+
+def test_missing_msgpack_falls_back_to_json_and_fails_clearly_on_decode(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'msgpack', None)
+    monkeypatch.setattr(buffer_codec, '_codecs', {})
+    assert get_codec(CODEC_MSGPACK).name == CODEC_JSON
+    with pytest.raises(ImportError, match="pip install msgpack"):
+        decode_payload(b'M\x80')
@@ -0,0 +1,39 @@
+# tests/test_fast_decoder.py
+import random
+
+import pytest
+
+from benchmarks.check_fast_decoder import make_chat, make_gift
+from fast_decoder import DECODERS, BACKEND_BETTERPROTO, encode_varint, read_varint
+
+
+@pytest.mark.parametrize("method, make", [('WebcastChatMessage', make_chat), ('WebcastGiftMessage', make_gift)])
+def test_fast_decoder_matches_betterproto(method, make):
+    random.seed(5)
+    fast = DECODERS[method]['fast']
+    slow = DECODERS[method][BACKEND_BETTERPROTO]
+    for _ in range(100):
+        payload = make()
+        assert fast(payload) == slow(payload)
+
+
+@pytest.mark.parametrize("method, make", [('WebcastChatMessage', make_chat), ('WebcastGiftMessage', make_gift)])
+def test_fast_decoder_matches_betterproto_on_truncated_payloads(method, make):
+    """betterproto 能解出的截断数据，投影解码器结果一致 (betterproto 报错的不比较，handler 本来就会丢弃)"""
+    random.seed(6)
+    fast = DECODERS[method]['fast']
+    slow = DECODERS[method][BACKEND_BETTERPROTO]
+    for _ in range(100):
+        payload = make()
+        payload = payload[:random.randint(0, len(payload))]
+        try:
+            expected = slow(payload)
+        except Exception:
+            continue
+        assert fast(payload) == expected
+
+
+def test_varint_round_trip():
+    for value in (0, 1, 127, 128, 300, 2 ** 31, 2 ** 63 - 1):
+        buf = encode_varint(value)
+        assert read_varint(buf, 0) == (value, len(buf))
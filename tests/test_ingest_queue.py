@@ -0,0 +1,58 @@
+# tests/test_ingest_queue.py
+import asyncio
+
+from ingest_queue import IngestQueue, POLICY_BLOCK, POLICY_DROP_CHAT, POLICY_SAMPLE
+
+CHAT = ('WebcastChatMessage', b'c')
+GIFT = ('WebcastGiftMessage', b'g')
+
+
+def put_all(queue, frames, timeout=1):
+    async def go():
+        for frame in frames:
+            await asyncio.wait_for(queue.put(frame), timeout)
+    asyncio.run(go())
+
+
+def drain(queue):
+    frames = []
+    while queue.depth():
+        frames.append(queue._queue.get_nowait()[1])
+    return frames
+
+
+def test_drop_chat_never_blocks_and_keeps_gifts_in_order():
+    queue = IngestQueue('r', maxsize=2, policy=POLICY_DROP_CHAT)
+    put_all(queue, [[CHAT], [CHAT], [CHAT, GIFT], [CHAT], [GIFT, CHAT]])
+    assert drain(queue) == [[CHAT], [CHAT], [GIFT], [GIFT]]
+    assert queue.dropped['WebcastChatMessage'] == 3
+    assert queue.blocked == 0
+
+
+def test_sample_keeps_every_nth_chat():
+    queue = IngestQueue('r', maxsize=2, policy=POLICY_SAMPLE, sample_every=3)
+    put_all(queue, [[GIFT]] * 2 + [[CHAT]] * 6)
+    assert drain(queue) == [[GIFT], [GIFT], [CHAT], [CHAT]]
+    assert queue.dropped['WebcastChatMessage'] == 4
+
+
+def test_hard_limit_drops_whole_frames():
+    queue = IngestQueue('r', maxsize=2, policy=POLICY_DROP_CHAT)
+    put_all(queue, [[GIFT]] * 6)
+    assert queue.depth() == queue.hard_limit == 4
+    assert queue.dropped['WebcastGiftMessage'] == 2
+
+
+def test_block_waits_for_room_and_counts_real_waits():
+    async def go():
+        queue = IngestQueue('r', maxsize=1, policy=POLICY_BLOCK)
+        await queue.put([CHAT])
+        assert queue.blocked == 0
+        put = asyncio.create_task(queue.put([GIFT]))
+        await asyncio.sleep(0.01)
+        assert not put.done() and queue.blocked == 1
+        assert await queue.get() == [CHAT]
+        queue.task_done()
+        await asyncio.wait_for(put, 1)
+        assert await queue.get() == [GIFT]
+    asyncio.run(go())
@@ -0,0 +1,78 @@
+# tests/test_message_handler.py
+import asyncio
+
+from message_handler import MessageHandler
+
+
+class RecordingHandler(MessageHandler):
+    """记录写出顺序，不做真实解码"""
+
+    def __init__(self):
+        super().__init__('web_rid', 'room_id', db=None, gift_processor=None)
+        self.calls = []
+
+    async def _write_chats(self, payloads):
+        self.calls.append(('chats', list(payloads)))
+
+    async def _write_gifts(self, payloads):
+        self.calls.append(('gifts', list(payloads)))
+
+    async def handle(self, method, payload):
+        self.calls.append((method, payload))
+        return False
+
+    def _is_stop_signal(self, payload):
+        return payload == b'stop'
+
+    async def _on_stop_signal(self):
+        self.calls.append(('stop', None))
+
+
+def run(messages):
+    handler = RecordingHandler()
+    stopped = asyncio.run(handler.handle_batch(messages))
+    return handler.calls, stopped
+
+
+def test_batch_keeps_frame_order():
+    calls, stopped = run([
+        ('WebcastChatMessage', b'c1'),
+        ('WebcastChatMessage', b'c2'),
+        ('WebcastRoomUserSeqMessage', b's1'),
+        ('WebcastGiftMessage', b'g1'),
+        ('WebcastChatMessage', b'c3'),
+        ('WebcastGiftMessage', b'g2'),
+        ('WebcastGiftMessage', b'g3'),
+    ])
+    assert not stopped
+    assert calls == [
+        ('chats', [b'c1', b'c2']),
+        ('WebcastRoomUserSeqMessage', b's1'),
+        ('gifts', [b'g1']),
+        ('chats', [b'c3']),
+        ('gifts', [b'g2', b'g3']),
+    ]
+
+
+def test_only_last_like_is_handled_in_place():
+    calls, _ = run([
+        ('WebcastLikeMessage', b'l1'),
+        ('WebcastChatMessage', b'c1'),
+        ('WebcastLikeMessage', b'l2'),
+        ('WebcastChatMessage', b'c2'),
+    ])
+    assert calls == [
+        ('chats', [b'c1']),
+        ('WebcastLikeMessage', b'l2'),
+        ('chats', [b'c2']),
+    ]
+
+
+def test_messages_after_stop_signal_are_dropped():
+    calls, stopped = run([
+        ('WebcastChatMessage', b'c1'),
+        ('WebcastControlMessage', b'stop'),
+        ('WebcastChatMessage', b'c2'),
+    ])
+    assert stopped
+    assert calls == [('chats', [b'c1']), ('stop', None)]
@@ -0,0 +1,25 @@
+# tests/test_proto_backend.py
+import proto_backend
+from proto_backend import get_backend, BACKEND_BETTERPROTO, BACKEND_UPB
+
+
+class VersionError(Exception):
+    """与 google.protobuf.runtime_version.VersionError 一样直接继承 Exception"""
+
+
+class BrokenUpbBackend:
+    name = BACKEND_UPB
+
+    def __init__(self):
+        raise VersionError("Detected mismatched Protobuf Gencode/Runtime major versions")
+
+
+def test_upb_version_mismatch_falls_back_to_betterproto(monkeypatch):
+    monkeypatch.setitem(proto_backend._BACKEND_CLASSES, BACKEND_UPB, BrokenUpbBackend)
+    monkeypatch.setattr(proto_backend, '_backends', {})
+    assert get_backend(BACKEND_UPB).name == BACKEND_BETTERPROTO
+
+
+def test_unknown_backend_falls_back_to_betterproto(monkeypatch):
+    monkeypatch.setattr(proto_backend, '_backends', {})
+    assert get_backend('nope').name == BACKEND_BETTERPROTO
@@ -0,0 +1,32 @@
+# tests/test_redis_batcher.py
+import asyncio
+
+from redis_batcher import RedisStreamBatcher
+
+
+def test_depth_resyncs_from_xlen_after_foreign_acks(redis_binary):
+    async def go():
+        batcher = RedisStreamBatcher(max_items=100, max_delay=0.001, resync_interval=3600)
+        assert await batcher.push('s', [b'1', b'2', b'3']) == 3
+        await batcher.flush()
+
+        # 其他进程的消费者确认并删除了全部条目，本地计数不会扣减
+        ids = [entry_id for entry_id, _ in await redis_binary.xrange('s')]
+        await redis_binary.xdel('s', *ids)
+        assert await batcher.push('s', [b'4']) == 4
+
+        batcher._synced_at['s'] = 0
+        await batcher.push('s', [b'5'])
+        await batcher.flush()
+        assert batcher.depth['s'] == 2
+    asyncio.run(go())
+
+
+def test_no_depth_tracking_without_local_consumers(redis_binary):
+    async def go():
+        batcher = RedisStreamBatcher(max_items=100, max_delay=0.001, track_depth=False)
+        assert await batcher.push('s', [b'1', b'2']) == 0
+        await batcher.flush()
+        assert batcher.depth == {}
+        assert await redis_binary.xlen('s') == 2
+    asyncio.run(go())
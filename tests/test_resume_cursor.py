@@ -0,0 +1,54 @@
+# tests/test_resume_cursor.py
+import asyncio
+
+import pytest
+
+from resume_cursor import MsgIdWindow, ResumeStore, RESUME_PREFIX
+
+
+class FailingPipeline:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    async def execute(self):
+        raise ConnectionError("redis down")
+
+
+def test_msg_id_window_evicts_oldest():
+    window = MsgIdWindow(2)
+    assert not window.seen(1) and not window.seen(2)
+    assert window.seen(1)
+    assert not window.seen(3)      # 淘汰 1
+    assert not window.seen(1)
+    assert not window.seen(0) and not window.seen(0)
+
+
+def test_failed_save_stays_dirty_and_is_retried(redis, monkeypatch):
+    async def go():
+        store = ResumeStore(ttl=60, window_size=10)
+        state = await store.load('w', 1)
+        state.update('cursor-1', 'ext')
+
+        monkeypatch.setattr(redis, 'pipeline', lambda transaction=False: FailingPipeline())
+        with pytest.raises(ConnectionError):
+            await store.save(state)
+        assert state.dirty
+        monkeypatch.undo()
+
+        await store.save(state)
+        assert not state.dirty
+        assert (await redis.hgetall(RESUME_PREFIX + 'w'))['cursor'] == 'cursor-1'
+    asyncio.run(go())
+
+
+def test_discard_frees_state_and_reload_uses_redis(redis):
+    async def go():
+        store = ResumeStore(ttl=60, window_size=10)
+        state = await store.load('w', 1)
+        state.update('cursor-1', 'ext')
+        await store.save(state)
+        store.discard('w')
+        assert store.stats()['rooms'] == 0
+        again = await store.load('w', 1)
+        assert again is not state and again.cursor == 'cursor-1'
+    asyncio.run(go())
@@ -0,0 +1,52 @@
+# tests/test_room_counters.py
+import asyncio
+
+from room_counters import RoomCounterWriter
+
+
+class FakeRooms:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.counts = {}
+        self.calls = 0
+
+    async def bulk_write(self, ops, ordered=True):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("mongo down")
+        for op in ops:
+            room = self.counts.setdefault(op._filter['room_id'], {})
+            for field, inc in op._doc['$inc'].items():
+                room[field] = room.get(field, 0) + inc
+
+
+def test_failed_increments_merge_and_retry_on_timer():
+    async def go():
+        rooms = FakeRooms(failures=1)
+        writer = RoomCounterWriter(lambda: rooms, retry_delay=0.01)
+        await writer.add('total_chat_count', {'r1': 2, 'r2': 1})
+        assert rooms.counts == {} and writer.errors == 1
+
+        # 重试之前到达的增量与失败的增量合并成一次写入
+        writer._pending['r1']['total_chat_count'] += 3
+        await asyncio.sleep(0.05)
+        assert rooms.counts == {'r1': {'total_chat_count': 5}, 'r2': {'total_chat_count': 1}}
+        assert rooms.calls == 2 and writer.stats()['pending_rooms'] == 0
+    asyncio.run(go())
+
+
+def test_flush_writes_pending_increments():
+    async def go():
+        rooms = FakeRooms(failures=1)
+        writer = RoomCounterWriter(lambda: rooms, retry_delay=3600)
+        await writer.add('total_diamond_count', {'r1': 10})
+        await writer.add('total_diamond_count', {'r1': 5})
+        assert rooms.counts == {'r1': {'total_diamond_count': 15}}
+
+        rooms.failures = 1
+        await writer.add('total_chat_count', {'r1': 1})
+        await writer.flush()
+        assert rooms.counts['r1'] == {'total_diamond_count': 15, 'total_chat_count': 1}
+        assert writer._retry is None
+    asyncio.run(go())
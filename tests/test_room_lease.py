@@ -0,0 +1,39 @@
+# tests/test_room_lease.py
+import asyncio
+import time
+
+from room_lease import RoomLeaseManager, fill_level, LEASE_PREFIX, NODES_KEY, LOAD_KEY
+
+
+def test_fill_level_fills_lowest_nodes_first():
+    assert fill_level([0, 0, 6], 6) == 3
+    assert fill_level([0, 10], 4) == 4
+    assert fill_level([2, 2], 4) == 4
+    assert fill_level([5], 0) == 5
+
+
+def test_claim_budget_uses_published_loads(redis):
+    async def go():
+        # 另一个节点已持有 6 个，第三个节点空闲；12 个在线，待分配 6 个 -> 水位 3
+        await redis.zadd(NODES_KEY, {'a': time.time(), 'b': time.time(), 'c': time.time()})
+        await redis.hset(LOAD_KEY, mapping={'a': 6, 'c': 0})
+        for i in range(6):
+            await redis.set(f"{LEASE_PREFIX}held{i}", 'a')
+        manager = RoomLeaseManager(node_id='b', capacity=100, ttl=30)
+        candidates = [f"room{i}" for i in range(6)]
+        claimed = await manager.claim_many(candidates, total_live=12)
+        assert len(claimed) == 3
+        # 下一轮仍无人认领的房间 (孤儿) 只受容量限制
+        claimed_again = await manager.claim_many([r for r in candidates if r not in claimed], total_live=12)
+        assert len(claimed_again) == 3
+        assert manager.held == set(candidates)
+    asyncio.run(go())
+
+
+def test_claim_respects_capacity_and_foreign_leases(redis):
+    async def go():
+        await redis.set(f"{LEASE_PREFIX}taken", 'other')
+        manager = RoomLeaseManager(node_id='me', capacity=2, ttl=30)
+        claimed = await manager.claim_many(['taken', 'r1', 'r2', 'r3'], total_live=4)
+        assert claimed == ['r1', 'r2']
+    asyncio.run(go())
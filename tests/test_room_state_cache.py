@@ -0,0 +1,48 @@
+# tests/test_room_state_cache.py
+import asyncio
+
+from db import AsyncMongoDBHandler
+from room_state_cache import RoomStateCache
+
+
+class FakeRooms:
+    def __init__(self, docs):
+        self.docs = docs
+        self.reads = 0
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return self.docs.get(query['room_id'])
+
+
+def make_db(rooms):
+    db = AsyncMongoDBHandler.__new__(AsyncMongoDBHandler)
+    db.db = {'rooms': rooms}
+    db.room_cache = RoomStateCache(ttl=300)
+    return db
+
+
+def test_fresh_read_bypasses_stale_cache():
+    async def go():
+        rooms = FakeRooms({'r1': {'room_id': 'r1', 'live_status': 1}})
+        db = make_db(rooms)
+        assert await db.get_room_live_status('r1') == 1
+
+        # 其他节点结算了该场
+        rooms.docs['r1']['live_status'] = 4
+        assert await db.get_room_live_status('r1') == 1
+        assert rooms.reads == 1
+        assert await db.get_room_live_status('r1', fresh=True) == 4
+        assert await db.get_room_live_status('r1') == 4
+        assert rooms.reads == 2
+    asyncio.run(go())
+
+
+def test_missing_rooms_are_cached_with_short_ttl():
+    cache = RoomStateCache(ttl=300)
+    assert cache.put('r2', None) == {}
+    assert cache.get('r2') == {}
+    cache.update('r2', live_status=1)
+    assert cache.get('r2') == {}
+    cache.invalidate('r2')
+    assert cache.get('r2') is None
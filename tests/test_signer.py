@@ -0,0 +1,36 @@
+# tests/test_signer.py
+import asyncio
+import shutil
+
+import pytest
+
+from signer import ABogusEngine
+
+pytestmark = pytest.mark.skipif(shutil.which('node') is None, reason="需要 node")
+
+
+def test_worker_that_exits_on_load_falls_back_to_execjs(tmp_path):
+    worker = tmp_path / "worker.js"
+    worker.write_text("process.exit(1);\n")
+
+    async def go():
+        engine = ABogusEngine(worker_file=str(worker), batch_window=0, timeout=2, max_early_exits=2)
+
+        async def legacy_sign(params, ua):
+            return "legacy:" + params
+        engine._legacy_sign = legacy_sign
+
+        results = []
+        try:
+            for _ in range(5):
+                try:
+                    results.append(await engine.sign("a=1", "ua"))
+                except (RuntimeError, OSError):
+                    results.append(None)
+                await asyncio.sleep(0.05)
+        finally:
+            await engine.close()
+        assert engine.stats()['backend'] == 'execjs'
+        assert results[-1] == "legacy:a=1"
+        assert results.count(None) <= 2
+    asyncio.run(go())
@@ -0,0 +1,116 @@
+# tests/test_stream_buffer.py
+import asyncio
+import json
+
+import pytest
+
+from stream_buffer import StreamConsumer, PartialWriteError, ensure_group, GROUP, FIELD, DEAD_SUFFIX
+
+KEY = 'stream:test'
+
+
+@pytest.fixture
+def redis(redis_binary, monkeypatch):
+    monkeypatch.setenv('BUFFER_RECLAIM_IDLE', '0')
+    monkeypatch.setenv('BUFFER_MAX_DELIVERIES', '2')
+    return redis_binary
+
+
+class Handler:
+    """按 fail 指定的行为写入：None 全部成功，'all' 整批失败，集合为部分失败的下标"""
+
+    def __init__(self):
+        self.written = []
+        self.fail = None
+
+    async def __call__(self, docs):
+        if self.fail == 'all':
+            raise ConnectionError("mongo down")
+        failed = self.fail or set()
+        self.written += [doc['n'] for i, doc in enumerate(docs) if i not in failed]
+        if failed:
+            raise PartialWriteError(failed)
+
+
+async def setup(redis, count, handler):
+    await ensure_group(KEY)
+    for n in range(count):
+        await redis.xadd(KEY, {FIELD: json.dumps({'n': n})})
+    drained = []
+    consumer = StreamConsumer(KEY, 0, handler, json.loads, batch_size=10, interval=1,
+                              on_drained=lambda key, count: drained.append(count))
+    return consumer, drained
+
+
+def test_partial_write_acks_inserted_entries(redis):
+    async def go():
+        handler = Handler()
+        handler.fail = {1}
+        consumer, drained = await setup(redis, 3, handler)
+        await consumer.drain()
+        assert handler.written == [0, 2]
+        assert drained == [2]
+        assert await redis.xlen(KEY) == 1
+        assert (await redis.xpending(KEY, GROUP))['pending'] == 1
+
+        # 重新领取后只重放失败的那条
+        handler.fail = None
+        await consumer.drain()
+        assert handler.written == [0, 2, 1]
+        assert await redis.xlen(KEY) == 0
+    asyncio.run(go())
+
+
+def test_failed_reclaim_keeps_reading_new_entries(redis):
+    async def go():
+        handler = Handler()
+        handler.fail = 'all'
+        consumer, _ = await setup(redis, 2, handler)
+        await consumer.drain()
+        await redis.xadd(KEY, {FIELD: json.dumps({'n': 2})})
+
+        # 重新领取的两条仍然失败，新条目照常读取
+        calls = []
+        original = handler.__call__
+
+        async def record(docs):
+            calls.append([doc['n'] for doc in docs])
+            handler.fail = 'all' if len(calls) == 1 else None
+            await original(docs)
+        consumer.handler = record
+        await consumer.drain()
+        assert calls == [[0, 1], [2]]
+        assert handler.written == [2]
+    asyncio.run(go())
+
+
+def test_poison_and_exhausted_entries_go_to_dead_letter(redis):
+    async def go():
+        handler = Handler()
+        handler.fail = 'all'
+        consumer, _ = await setup(redis, 1, handler)
+        await redis.xadd(KEY, {FIELD: b'not json'})
+
+        await consumer.drain()                      # 第 1 次投递；无法解析的条目直接进死信
+        assert consumer.poison == 1
+        await consumer.drain()                      # 第 2 次
+        await consumer.drain()                      # 第 3 次 > BUFFER_MAX_DELIVERIES
+        dead = await redis.xrange(KEY + DEAD_SUFFIX)
+        assert [fields[FIELD] for _, fields in dead] == [b'not json', json.dumps({'n': 0}).encode()]
+        assert await redis.xlen(KEY) == 0
+        assert (await redis.xpending(KEY, GROUP))['pending'] == 0
+        assert consumer.stats()['dead'] == 2
+    asyncio.run(go())
+
+
+def test_decode_import_error_is_dead_lettered(redis):
+    async def go():
+        def decode(raw):
+            raise ImportError("No module named 'msgpack'")
+        await ensure_group(KEY)
+        await redis.xadd(KEY, {FIELD: b'M...'})
+        consumer = StreamConsumer(KEY, 0, Handler(), decode, batch_size=10, interval=1)
+        await consumer.drain()
+        assert await redis.xlen(KEY + DEAD_SUFFIX) == 1
+        assert await redis.xlen(KEY) == 0
+    asyncio.run(go())
@@ -0,0 +1,49 @@
+# tests/test_supervisor.py
+import os
+import subprocess
+import sys
+
+from supervisor import HashRing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KEYS = [f"web_rid_{i}" for i in range(2000)]
+
+
+def test_ring_is_deterministic_and_covers_all_nodes():
+    ring = HashRing(range(4))
+    owners = [ring.get(key) for key in KEYS]
+    assert owners == [HashRing(range(4)).get(key) for key in KEYS]
+    assert set(owners) == {0, 1, 2, 3}
+
+
+def test_removing_a_node_only_moves_its_keys():
+    ring = HashRing(range(4))
+    before = {key: ring.get(key) for key in KEYS}
+    ring.remove(2)
+    assert 2 not in ring
+    for key, owner in before.items():
+        if owner != 2:
+            assert ring.get(key) == owner
+        else:
+            assert ring.get(key) in (0, 1, 3)
+
+
+def test_readding_a_node_restores_the_original_assignment():
+    ring = HashRing(range(4))
+    before = {key: ring.get(key) for key in KEYS}
+    ring.remove(1)
+    ring.add(1)
+    assert {key: ring.get(key) for key in KEYS} == before
+
+
+def test_empty_ring_returns_none():
+    assert HashRing().get('x') is None
+
+
+def test_entry_modules_have_no_import_side_effects(tmp_path):
+    # 导入入口模块不应配置日志 / 创建 logs 目录 (每个进程写各自的日志文件)
+    code = ("import sys; sys.path.insert(0, %r)\n"
+            "import logging, main, recorder, supervisor, sink\n"
+            "assert not logging.getLogger().handlers, logging.getLogger().handlers\n") % ROOT
+    subprocess.run([sys.executable, '-c', code], cwd=tmp_path, check=True, timeout=60)
+    assert not (tmp_path / 'logs').exists()
@@ -0,0 +1,75 @@
+# tests/test_user_profiles.py
+import asyncio
+
+import pytest
+
+from user_profiles import UserProfileStore, PROFILE_FIELDS
+
+
+class FakeUsers:
+    def __init__(self):
+        self.docs = {}
+        self.writes = 0
+        self.fail = False
+
+    async def bulk_write(self, ops, ordered=True):
+        if self.fail:
+            raise ConnectionError("mongo down")
+        self.writes += 1
+        for op in ops:
+            self.docs[op._filter['user_id']] = dict(op._doc['$set'])
+
+
+def event(user_id, name="甲", content="hi"):
+    return {'user_id': user_id, 'user_name': name, 'sec_uid': 'sec' + user_id, 'gender': 1,
+            'avatar_url': 'https://a/' + user_id, 'pay_grade': 10, 'pay_grade_icon': '', 'fans_club_icon': '',
+            'fans_club_level': 3, 'content': content}
+
+
+def test_profile_fields_move_to_users_and_unchanged_profiles_are_skipped():
+    async def go():
+        users = FakeUsers()
+        store = UserProfileStore(lambda: users, max_size=10)
+        docs = [event('1'), event('2'), event('1', content="again")]
+        await store.normalize(docs)
+        assert all(not set(PROFILE_FIELDS) & set(doc) for doc in docs)
+        assert docs[0] == {'user_id': '1', 'pay_grade': 10, 'fans_club_level': 3, 'content': 'hi'}
+        assert set(users.docs) == {'1', '2'} and users.docs['1']['user_name'] == "甲"
+
+        # 资料未变化：命中 LRU，不写 users
+        await store.normalize([event('1'), event('2')])
+        assert users.writes == 1 and store.hits == 2
+
+        # 改名后重新 upsert
+        await store.normalize([event('1', name="乙")])
+        assert users.writes == 2 and users.docs['1']['user_name'] == "乙"
+    asyncio.run(go())
+
+
+def test_failed_upsert_raises_and_keeps_lru_unchanged():
+    async def go():
+        users = FakeUsers()
+        users.fail = True
+        store = UserProfileStore(lambda: users, max_size=10)
+        with pytest.raises(ConnectionError):
+            await store.normalize([event('1')])
+        assert store.stats()['cached'] == 0 and store.errors == 1
+
+        users.fail = False
+        await store.normalize([event('1')])
+        assert users.docs['1']['user_name'] == "甲"
+    asyncio.run(go())
+
+
+def test_lru_evicts_and_anonymous_users_are_left_alone():
+    async def go():
+        users = FakeUsers()
+        store = UserProfileStore(lambda: users, max_size=1)
+        await store.normalize([event('1'), event('2')])
+        assert store.stats()['cached'] == 1
+
+        anonymous = event('0')
+        await store.normalize([anonymous])
+        assert anonymous['user_name'] == "甲"
+        assert '0' not in users.docs
+    asyncio.run(go())
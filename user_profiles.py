@@ -0,0 +1,106 @@
+# user_profiles.py
+"""
+用户维度表 (users)：把弹幕 / 礼物里重复的用户资料拆出去
+
+每条 live_chats / live_gifts 都带着 user_name、sec_uid、gender 和几条很长的 CDN 链接
+(avatar_url / pay_grade_icon / fans_club_icon)，同一个用户每发一条消息就重复写一遍。
+开启 NORMALIZE_USERS=1 后，落库前把这些字段从事件文档中移出：
+- 事件文档只保留 user_id 与随事件变化的字段 (pay_grade / fans_club_level 等)
+- 用户资料写入 users 集合 (按 user_id upsert)
+- 进程内 LRU 记录最近见过的用户的资料摘要，只有资料变化 (或被 LRU 淘汰后再次出现) 时才 upsert
+
+查询端需要用户名 / 头像时按 user_id 关联 users ($lookup)。未开启时文档结构不变。
+
+配置: NORMALIZE_USERS=1 开启、USER_CACHE_SIZE (LRU 容量，默认 200000)
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger("UserProfiles")
+
+COL_USERS = "users"
+# 从事件文档移到 users 的字段
+PROFILE_FIELDS = ('user_name', 'sec_uid', 'gender', 'avatar_url', 'pay_grade_icon', 'fans_club_icon')
+
+
+def normalize_users() -> bool:
+    return os.environ.get('NORMALIZE_USERS') == '1'
+
+
+class UserProfileStore:
+    """
+    :param collection: 返回 users 集合的函数 (延迟获取)
+    :param max_size: LRU 容量
+    """
+
+    def __init__(self, collection, max_size=None):
+        self.collection = collection
+        self.max_size = max_size or int(os.environ.get('USER_CACHE_SIZE', 200000))
+        self._seen = OrderedDict()   # user_id -> 资料摘要
+
+        # --- 统计 ---
+        self.events = 0
+        self.hits = 0
+        self.upserts = 0
+        self.errors = 0
+        self.last_ms = 0.0
+
+    async def normalize(self, docs):
+        """
+        原地移除 docs 中的用户资料字段，并 upsert 资料有变化的用户
+        users 写入失败时抛出 (此时 LRU 未更新)，由调用方整批重试
+        """
+        changed = {}
+        for doc in docs:
+            user_id = doc.get('user_id')
+            if not user_id or user_id == '0':
+                continue
+            profile = {field: doc.pop(field) for field in PROFILE_FIELDS if field in doc}
+            if not profile:
+                continue
+            self.events += 1
+            digest = hash(tuple(profile.get(field) for field in PROFILE_FIELDS))
+            if self._seen.get(user_id) == digest and user_id not in changed:
+                self._seen.move_to_end(user_id)
+                self.hits += 1
+                continue
+            # 同一批内资料变化时以最后一条为准
+            changed[user_id] = (profile, digest)
+
+        if not changed:
+            return
+        now = datetime.now()
+        ops = [UpdateOne({"user_id": user_id},
+                         {"$set": dict(profile, updated_at=now), "$setOnInsert": {"created_at": now}},
+                         upsert=True)
+               for user_id, (profile, _) in changed.items()]
+        start = time.perf_counter()
+        try:
+            await self.collection().bulk_write(ops, ordered=False)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"❌ [Users] upsert {len(ops)} 个用户资料失败: {e}")
+            raise
+        self.last_ms = (time.perf_counter() - start) * 1000
+        self.upserts += len(ops)
+
+        for user_id, (_, digest) in changed.items():
+            self._seen[user_id] = digest
+            self._seen.move_to_end(user_id)
+        while len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            'events': self.events,
+            'hits': self.hits,
+            'upserts': self.upserts,
+            'errors': self.errors,
+            'cached': len(self._seen),
+            'ms': round(self.last_ms, 1),
+        }